@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Inference capacity exhausted ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# Admission control for model inference. Each request costs its token count, and requests
+# run only while the tokens in flight stay within max_tokens. Others wait in a FIFO queue
+# of at most max_queue requests for up to max_wait seconds. A full queue or an expired
+# wait raises AdmissionRejected, so overload turns into fast 429s instead of every request
+# timing out. A request costing more than the whole budget is charged the budget, so it
+# still runs, alone.
+class TokenBudget:
+    def __init__(self, max_tokens, max_queue=64, max_wait=2.0, name='admission'):
+        self.max_tokens = max(1, int(max_tokens))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = max(0.0, float(max_wait))
+        self.name = name
+        self._cond = threading.Condition()
+        self._waiters = deque()
+        self._in_flight = 0
+        self._active = 0
+        self._hold_seconds = 0.0  # moving average of how long admitted requests hold their tokens
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = {'queue_full': 0, 'timeout': 0}
+        self._wait_seconds = 0.0
+
+    def _fits(self, cost):
+        return self._in_flight + cost <= self.max_tokens
+
+    def acquire(self, cost):
+        # Returns the tokens charged; pass them back to release()
+        cost = min(max(1, int(cost)), self.max_tokens)
+        with self._cond:
+            if not self._waiters and self._fits(cost):
+                self._take(cost)
+                return cost
+            if len(self._waiters) >= self.max_queue:
+                self._rejected['queue_full'] += 1
+                raise AdmissionRejected('queue_full', self._retry_after_locked())
+
+            ticket = object()
+            self._waiters.append(ticket)
+            self._queued += 1
+            started = time.monotonic()
+            deadline = started + self.max_wait
+            try:
+                # Strict FIFO: a large request at the head is not starved by smaller ones behind it
+                while not (self._waiters[0] is ticket and self._fits(cost)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected['timeout'] += 1
+                        raise AdmissionRejected('timeout', self._retry_after_locked())
+                    self._cond.wait(remaining)
+                self._take(cost)
+                return cost
+            finally:
+                self._wait_seconds += time.monotonic() - started
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def _retry_after_locked(self):
+        # Seconds until the queue ahead has likely drained, for the Retry-After header
+        return min(60, max(1, math.ceil(self._hold_seconds * (len(self._waiters) + 1))))
+
+    def _take(self, cost):
+        self._in_flight += cost
+        self._active += 1
+        self._admitted += 1
+
+    def release(self, cost, held_seconds=None):
+        with self._cond:
+            self._in_flight -= cost
+            self._active -= 1
+            if held_seconds is not None:
+                self._hold_seconds = held_seconds if not self._hold_seconds else 0.9 * self._hold_seconds + 0.1 * held_seconds
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, cost):
+        charged = self.acquire(cost)
+        started = time.monotonic()
+        try:
+            yield charged
+        finally:
+            self.release(charged, time.monotonic() - started)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'enabled': True,
+                'max_tokens': self.max_tokens,
+                'max_queue': self.max_queue,
+                'max_wait_seconds': self.max_wait,
+                'tokens_in_flight': self._in_flight,
+                'active_requests': self._active,
+                'queue_depth': len(self._waiters),
+                'admitted': self._admitted,
+                'queued': self._queued,
+                'rejected': dict(self._rejected),
+                'avg_queue_wait_ms': round(self._wait_seconds / self._queued * 1000, 2) if self._queued else 0.0,
+                'avg_hold_ms': round(self._hold_seconds * 1000, 2)
+            }
@@ -1,56 +1,210 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
 from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
+import transformers
+from packaging import version
 import logging
 import os
 import torch
+import numpy as np
 import time
 import json
-import sqlite3
-from datetime import datetime
+import base64
+import csv
+import io
+import queue
+import hashlib
+import importlib.util
+import threading
+import atexit
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from admission import AdmissionRejected, TokenBudget
+from batcher import MicroBatcher
+from cache import ResultCache
+import db
+import review_stats
+import rollups
+import rescoring
+import http_cache
+import serialization
+import fulltext
+import jobs
+import embeddings
+import metrics
+import model_registry
+from model_registry import ModelRegistry
+from events import StatsBroadcaster
 
 # Settings and Database Configuration
 SETTINGS_FILE = 'settings.json'
-DATABASE_FILE = 'reviews.db'
+DATABASE_FILE = os.environ.get('DATABASE_FILE', 'reviews.db')
+SEED_SAMPLE_REVIEWS = os.environ.get('SEED_SAMPLE_REVIEWS', '1') == '1'  # demo reviews in a new database
+
+# Batch inference configuration
+BATCH_SIZE = int(os.environ.get('BATCH_SIZE', 32))
+MAX_BATCH_TEXTS = int(os.environ.get('MAX_BATCH_TEXTS', 1000))
+
+# Model loading: 'background' (default) serves immediately and loads on a thread, 'eager' blocks
+# import until loaded, 'preload' loads without warm-up for gunicorn preload_app, 'off' waits for
+# the first request or an explicit load_models() call
+MODEL_LOAD_MODE = os.environ.get('MODEL_LOAD_MODE', 'background')
+SENTIMENT_MODEL_NAME = os.environ.get('SENTIMENT_MODEL_NAME', 'cardiffnlp/twitter-roberta-base-sentiment')
+SARCASM_MODEL_NAME = os.environ.get('SARCASM_MODEL_NAME', 'microsoft/deberta-v3-base')
+MODEL_LOCAL_FILES_ONLY = os.environ.get('MODEL_LOCAL_FILES_ONLY', '0') == '1'
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR')
+MODEL_RETRY_SECONDS = float(os.environ.get('MODEL_RETRY_SECONDS', 30))
+
+# Sentiment models for other languages, loaded in the background on first use (the default
+# model scores them meanwhile) and evicted least recently used once they exceed MODEL_MEMORY_BUDGET_MB. Every listed non-English language maps to
+# MULTILINGUAL_SENTIMENT_MODEL_NAME (empty to disable) unless SENTIMENT_LANGUAGE_MODELS
+# ("hi=org/model,ta=org/model") names its own checkpoint. English and unmapped languages
+# use SENTIMENT_MODEL_NAME. MODEL_PINNED_LANGUAGES ("hi,ta") load with the default models and are never evicted.
+MULTILINGUAL_SENTIMENT_MODEL_NAME = os.environ.get(
+    'MULTILINGUAL_SENTIMENT_MODEL_NAME', 'cardiffnlp/twitter-xlm-roberta-base-sentiment'
+)
+SENTIMENT_LANGUAGE_MODELS = os.environ.get('SENTIMENT_LANGUAGE_MODELS', '')
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('MODEL_MEMORY_BUDGET_MB', 2048))
+MODEL_PINNED_LANGUAGES = [code for code in os.environ.get('MODEL_PINNED_LANGUAGES', '').split(',') if code]
+
+# CPU inference precision: 'none' (fp32) or 'dynamic-int8'
+MODEL_QUANTIZATION = os.environ.get('MODEL_QUANTIZATION', 'none')
+
+# Review listing pagination
+REVIEWS_PAGE_SIZE = int(os.environ.get('REVIEWS_PAGE_SIZE', 50))
+REVIEWS_MAX_PAGE_SIZE = int(os.environ.get('REVIEWS_MAX_PAGE_SIZE', 500))
+REVIEW_COLUMNS = ['id', 'text', 'sentiment', 'sentiment_score', 'star_rating', 'language',
+                  'username', 'helpful_count', 'created_at']
+EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE', 1000))
+
+# Requests slower than this are logged with their per-stage timings (0 disables)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+
+# Read endpoints answer If-None-Match with a bodyless 304 while the reviews table is unchanged
+HTTP_CONDITIONAL = os.environ.get('HTTP_CONDITIONAL', '1') == '1'
+CONDITIONAL_ENDPOINTS = {'get_reviews', 'get_stats', 'get_trends'}
+
+# Response compression (brotli if installed, else gzip) and the orjson encoder when available
+COMPRESSION = os.environ.get('COMPRESSION', '1') == '1'
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+FAST_JSON = os.environ.get('FAST_JSON', '1') == '1'
+
+# Live stats stream
+STATS_COALESCE_MS = float(os.environ.get('STATS_COALESCE_MS', 250))
+STATS_STREAM_KEEPALIVE = float(os.environ.get('STATS_STREAM_KEEPALIVE', 15))
+
+# Dynamic micro-batching of concurrent /api/analyze requests
+MICRO_BATCHING = os.environ.get('MICRO_BATCHING', '1') == '1'
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 16))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', 5))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 30))
+
+# Admission control: /api/analyze requests are costed by token count and run only while the
+# tokens in flight fit ADMISSION_MAX_TOKENS (0 disables); the rest queue, then get a 429
+ADMISSION_MAX_TOKENS = int(os.environ.get('ADMISSION_MAX_TOKENS', 8192))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', 64))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 2.0))  # seconds
+
+# Sarcasm cascade: skip the sarcasm pass when its score cannot change the result. Negative
+# sentiment is never adjusted by sarcasm, so skipping it is exact; the per-label gates also
+# skip confident positive/neutral results (approximate, off unless set below 1)
+CASCADE = os.environ.get('CASCADE', '0') == '1'
+CASCADE_POSITIVE_CONFIDENCE = float(os.environ.get('CASCADE_POSITIVE_CONFIDENCE', 1.1))
+CASCADE_NEUTRAL_CONFIDENCE = float(os.environ.get('CASCADE_NEUTRAL_CONFIDENCE', 1.1))
+
+# Run the sentiment and sarcasm forward passes concurrently on a dedicated pool. Each pool
+# thread gets its own intra-op thread count so the two models split the cores instead of
+# oversubscribing them. Ignored when CASCADE is on (sarcasm then depends on sentiment).
+PARALLEL_MODELS = os.environ.get('PARALLEL_MODELS', '0') == '1'
+INFERENCE_POOL_SIZE = int(os.environ.get('INFERENCE_POOL_SIZE', 2))
+INFERENCE_THREADS_PER_MODEL = int(os.environ.get('INFERENCE_THREADS_PER_MODEL', max(1, (os.cpu_count() or 2) // 2)))
+INFERENCE_INTEROP_THREADS = int(os.environ.get('INFERENCE_INTEROP_THREADS', 0))  # 0 keeps torch's default
+
+# Result cache for repeated review texts (RESULT_CACHE_DB enables the persistent tier)
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 10000))
+RESULT_CACHE_DB = os.environ.get('RESULT_CACHE_DB')
+RESULT_CACHE_DB_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_DB_MAX_ENTRIES', 100000))
+ANALYSIS_VERSION = 3  # Bump when analyze_sentiment/detect_sarcasm pre- or post-processing changes
+
+# Review embeddings (pooled sentiment-model hidden state) for similar-review search
+EMBEDDINGS = os.environ.get('EMBEDDINGS', '1') == '1'
+EMBEDDINGS_FILE = os.environ.get('EMBEDDINGS_FILE') or embeddings.index_path(DATABASE_FILE)
+SIMILAR_MAX_K = int(os.environ.get('SIMILAR_MAX_K', 100))
+
+# /api/trends windows: default and maximum number of days per bucket size
+TRENDS_DEFAULT_DAYS = {'hour': 2, 'day': 90}
+TRENDS_MAX_DAYS = {'hour': 31, 'day': 3660}
+
+# Asynchronous analysis jobs, persisted in the reviews database
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))  # worker threads per process; 0 disables processing
+JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', 64))
+JOB_MAX_TEXTS = int(os.environ.get('JOB_MAX_TEXTS', 100000))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 300))
+JOB_STREAM_INTERVAL = float(os.environ.get('JOB_STREAM_INTERVAL', 1.0))
+
+# Optional write-behind buffering of analysis results
+WRITE_BEHIND = os.environ.get('WRITE_BEHIND', '0') == '1'
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', 256))
+WRITE_BEHIND_FLUSH_MS = float(os.environ.get('WRITE_BEHIND_FLUSH_MS', 200))
+WRITE_BEHIND_MAX_QUEUE = int(os.environ.get('WRITE_BEHIND_MAX_QUEUE', 10000))
+
+# Set by init_db once the FTS5 index is known to exist
+fulltext_available = False
 
 # Initialize database
 def init_db():
-    conn = sqlite3.connect(DATABASE_FILE)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS reviews (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            text TEXT NOT NULL,
-            sentiment TEXT NOT NULL,
-            sentiment_score REAL,
-            star_rating INTEGER DEFAULT 0,
-            language TEXT DEFAULT 'English',
-            username TEXT DEFAULT 'Anonymous',
-            helpful_count INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    global fulltext_available
+    with db.transaction(DATABASE_FILE) as conn:
+        c = conn.cursor()
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS reviews (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                sentiment_score REAL,
+                star_rating INTEGER DEFAULT 0,
+                language TEXT DEFAULT 'English',
+                username TEXT DEFAULT 'Anonymous',
+                helpful_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Raw model outputs, kept so `manage.py rescore` can re-label without re-inference
+        rescoring.ensure_columns(conn)
+
+        # Composite indexes matching the get_reviews filters; SQLite appends the rowid (id)
+        # to every index entry, so each one also serves ORDER BY created_at, id
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reviews_created ON reviews (created_at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reviews_sentiment_created ON reviews (sentiment, created_at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reviews_language_created ON reviews (language, created_at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reviews_sentiment_language_created ON reviews (sentiment, language, created_at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reviews_rating_created ON reviews (star_rating, created_at)')
+
+        review_stats.ensure_schema(conn)
+        rollups.ensure_schema(conn)
+        http_cache.ensure_schema(conn)
+        fulltext_available = fulltext.ensure_schema(conn)
+        jobs.ensure_schema(conn)
     
-    # Check if we need to add sample data
-    c.execute('SELECT COUNT(*) FROM reviews')
-    count = c.fetchone()[0]
+        # Check if we need to add sample data
+        c.execute('SELECT COUNT(*) FROM reviews')
+        count = c.fetchone()[0]
     
-    if count == 0:
-        # Add sample reviews
-        sample_reviews = [
-            ('Great product! Exactly what I needed.', 'Positive', 0.95, 5, 'English', 'John', 3),
-            ('Not worth the money.', 'Negative', 0.2, 2, 'English', 'Alice', 1),
-            ('It works as expected.', 'Neutral', 0.5, 3, 'English', 'Bob', 0),
-            ('Could be better.', 'Neutral', 0.4, 3, 'English', 'Emma', 2)
-        ]
+        if count == 0 and SEED_SAMPLE_REVIEWS:
+            # Add sample reviews
+            sample_reviews = [
+                ('Great product! Exactly what I needed.', 'Positive', 0.95, 5, 'English', 'John', 3),
+                ('Not worth the money.', 'Negative', 0.2, 2, 'English', 'Alice', 1),
+                ('It works as expected.', 'Neutral', 0.5, 3, 'English', 'Bob', 0),
+                ('Could be better.', 'Neutral', 0.4, 3, 'English', 'Emma', 2)
+            ]
         
-        c.executemany('''
-            INSERT INTO reviews (text, sentiment, sentiment_score, star_rating, language, username, helpful_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', sample_reviews)
-    
-    conn.commit()
-    conn.close()
+            c.executemany('''
+                INSERT INTO reviews (text, sentiment, sentiment_score, star_rating, language, username, helpful_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', sample_reviews)
 
 # Initialize database on startup
 init_db()
@@ -70,10 +224,112 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+if FAST_JSON and serialization.orjson is not None:
+    app.json = serialization.OrjsonProvider(app)
 
 HOST = '0.0.0.0'
 PORT = 5000
 
+# Request metrics, labelled by route pattern (not raw path) to keep cardinality bounded
+http_requests = metrics.registry.counter(
+    'http_requests', 'HTTP requests by endpoint, method and status', labelnames=('endpoint', 'method', 'status')
+)
+http_errors = metrics.registry.counter(
+    'http_request_errors', 'HTTP requests that returned a 5xx status', labelnames=('endpoint', 'method')
+)
+http_latency = metrics.registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by endpoint', labelnames=('endpoint', 'method')
+)
+
+admission_rejections = metrics.registry.counter(
+    'admission_rejections', 'Inference requests rejected by admission control', labelnames=('reason',)
+)
+
+# after_request hooks run in reverse order of registration: compression is registered first
+# so it runs last, on the final body and headers
+@app.after_request
+def compress_response(response):
+    if not COMPRESSION or response.is_streamed or response.direct_passthrough:
+        return response
+    if response.status_code == 304 or response.mimetype in serialization.COMPRESSIBLE_MIMETYPES:
+        # Every response of these endpoints depends on Accept-Encoding, 304s and bodies too small
+        # to compress included, so shared caches keep (and revalidate) one copy per encoding
+        response.vary.add('Accept-Encoding')
+    if response.status_code != 200 or response.mimetype not in serialization.COMPRESSIBLE_MIMETYPES:
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+    encoding = serialization.choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None or response.content_length is None or response.content_length < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(serialization.compress(response.get_data(), encoding, COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.after_request
+def add_cache_validators(response):
+    etag = g.pop('etag', None)
+    if etag is not None and response.status_code == 200:
+        response.headers['ETag'] = etag
+        # Cache, but revalidate every time: unchanged data costs a 304 instead of the full body
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    metrics.start_breakdown()
+
+@app.before_request
+def start_job_workers():
+    # Job workers start with the first request a process serves (a readiness probe is enough),
+    # which resumes jobs left over from a restart without starting threads in scripts or before fork
+    job_queue.start()
+
+@app.before_request
+def check_not_modified():
+    if not HTTP_CONDITIONAL or request.method != 'GET' or request.endpoint not in CONDITIONAL_ENDPOINTS:
+        return None
+    try:
+        version = http_cache.read_version(db.get_connection(DATABASE_FILE))
+    except Exception as e:
+        logger.error(f"Error reading data version: {str(e)}")
+        return None
+    parts = [request.endpoint, request.full_path, version]
+    if request.endpoint == 'get_trends' and 'end' not in request.args:
+        # The window ends now, so it moves with the clock even when no review is written
+        parts.append(datetime.utcnow().strftime(trends_bucket_format(request.args.get('granularity', 'day'))))
+    if COMPRESSION:
+        # Each encoding is a different representation, so it gets its own ETag
+        parts.append(serialization.choose_encoding(request.headers.get('Accept-Encoding')) or 'identity')
+    etag = http_cache.make_etag(*parts)
+    if http_cache.etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+    g.etag = etag
+    return None
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    breakdown = metrics.finish_breakdown()
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    http_latency.observe(elapsed, endpoint=endpoint, method=request.method)
+    if response.status_code >= 500:
+        http_errors.inc(endpoint=endpoint, method=request.method)
+
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        stages = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in breakdown.items())
+        logger.warning(
+            f"Slow request: {request.method} {request.path} -> {response.status_code} "
+            f"in {elapsed * 1000:.1f}ms ({stages or 'no stages recorded'})"
+        )
+    return response
+
 # Settings management
 def load_settings():
     try:
@@ -108,68 +364,226 @@ def rate_review():
         if not review_id or not isinstance(rating, (int, float)) or not (0 <= rating <= 5):
             return jsonify({'success': False, 'error': 'Invalid rating data'}), 400
 
-        conn = sqlite3.connect(DATABASE_FILE)
-        c = conn.cursor()
-        c.execute('UPDATE reviews SET star_rating = ? WHERE id = ?', (rating, review_id))
-        conn.commit()
-        conn.close()
+        with db.transaction(DATABASE_FILE) as conn:
+            conn.execute('UPDATE reviews SET star_rating = ? WHERE id = ?', (rating, review_id))
+        stats_broadcaster.notify({'id': review_id, 'star_rating': rating})
 
         return jsonify({'success': True})
     except Exception as e:
         logger.error(f"Error updating rating: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+
+def build_review_filters(args):
+    # FROM/WHERE clause shared by the review listing endpoints, plus its params and FTS match expression
+    sentiment = args.get('sentiment', 'all')
+    rating = int(args.get('rating', 0))
+    language = args.get('language', 'all')
+    search = args.get('search', '')
+    match_query = fulltext.build_match_query(search) if search and fulltext_available else ''
+
+    query = ' FROM reviews'
+    params = []
+
+    if match_query:
+        query += ' JOIN reviews_fts ON reviews_fts.rowid = reviews.id WHERE reviews_fts MATCH ?'
+        params.append(match_query)
+    else:
+        query += ' WHERE 1=1'
+
+    if sentiment != 'all':
+        query += ' AND reviews.sentiment = ?'
+        params.append(sentiment)
+
+    if rating > 0:
+        query += ' AND reviews.star_rating >= ?'
+        params.append(rating)
+
+    if language != 'all':
+        query += ' AND reviews.language = ?'
+        params.append(language)
+
+    if search and not match_query:
+        query += ' AND reviews.text LIKE ?'
+        params.append(f'%{search}%')
+
+    return query, params, match_query
+
 @app.route('/api/reviews', methods=['GET'])
 def get_reviews():
     try:
-        sentiment = request.args.get('sentiment', 'all')
-        rating = int(request.args.get('rating', 0))
-        language = request.args.get('language', 'all')
         search = request.args.get('search', '')
+        sort = request.args.get('sort', 'relevance' if search else 'recent')
+        cursor = request.args.get('cursor')
 
-        conn = sqlite3.connect(DATABASE_FILE)
-        c = conn.cursor()
+        try:
+            limit = min(max(int(request.args.get('limit', REVIEWS_PAGE_SIZE)), 1), REVIEWS_MAX_PAGE_SIZE)
+            position = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid limit or cursor'}), 400
 
-        query = 'SELECT * FROM reviews WHERE 1=1'
-        params = []
+        fields = [field for field in request.args.get('fields', '').split(',') if field] or REVIEW_COLUMNS
+        unknown = [field for field in fields if field not in REVIEW_COLUMNS]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown fields: {', '.join(unknown)}"}), 400
 
-        if sentiment != 'all':
-            query += ' AND sentiment = ?'
-            params.append(sentiment)
+        filters, params, match_query = build_review_filters(request.args)
+        relevance = bool(match_query) and sort == 'relevance'
 
-        if rating > 0:
-            query += ' AND star_rating >= ?'
-            params.append(rating)
+        # id and created_at are always read so the next cursor can be built, but only returned if asked for
+        selected = fields + [column for column in ('id', 'created_at') if column not in fields]
+        query = 'SELECT ' + ', '.join(f'reviews.{column}' for column in selected) + filters
+        offset = 0
 
-        if language != 'all':
-            query += ' AND language = ?'
-            params.append(language)
+        try:
+            if relevance:
+                # bm25 rank has no stable key to seek on, so relevance pages use an offset cursor
+                offset = int(position['offset']) if position else 0
+                query += ' ORDER BY reviews_fts.rank LIMIT ? OFFSET ?'
+                params += [limit + 1, offset]
+            else:
+                # Keyset pagination on (created_at, id): each page is an index seek, not a scan past earlier pages
+                if position:
+                    query += ' AND (reviews.created_at, reviews.id) < (?, ?)'
+                    params += [position['created_at'], int(position['id'])]
+                query += ' ORDER BY reviews.created_at DESC, reviews.id DESC LIMIT ?'
+                params.append(limit + 1)
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+
+        rows = db.get_connection(DATABASE_FILE).execute(query, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        reviews = [dict(zip(fields, row)) for row in rows]
+
+        next_cursor = None
+        if has_more:
+            if relevance:
+                next_cursor = encode_cursor({'offset': offset + limit})
+            else:
+                last = rows[-1]
+                next_cursor = encode_cursor({
+                    'created_at': last[selected.index('created_at')],
+                    'id': last[selected.index('id')]
+                })
 
-        if search:
-            query += ' AND text LIKE ?'
-            params.append(f'%{search}%')
+        return jsonify({'success': True, 'reviews': reviews, 'next_cursor': next_cursor})
 
-        query += ' ORDER BY created_at DESC'
+    except Exception as e:
+        logger.error(f'Error fetching reviews: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        c.execute(query, params)
-        # Get column names from cursor description
-        columns = [description[0] for description in c.description]
-        
-        # Map row data to column names safely
-        reviews = []
-        for row in c.fetchall():
-            review_dict = {}
-            for i, column in enumerate(columns):
-                review_dict[column] = row[i] if i < len(row) else None
-            reviews.append(review_dict)
+@app.route('/api/reviews/export', methods=['GET'])
+def export_reviews():
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'success': False, 'error': 'format must be ndjson or csv'}), 400
 
-        conn.close()
-        return jsonify({'success': True, 'reviews': reviews})
+        fields = [field for field in request.args.get('fields', '').split(',') if field] or REVIEW_COLUMNS
+        unknown = [field for field in fields if field not in REVIEW_COLUMNS]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown fields: {', '.join(unknown)}"}), 400
 
+        try:
+            filters, params, _ = build_review_filters(request.args)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid filter value'}), 400
+
+        # Rowid order needs no sort step, so rows stream straight off the table/index
+        query = 'SELECT ' + ', '.join(f'reviews.{field}' for field in fields) + filters + ' ORDER BY reviews.id'
     except Exception as e:
-        logger.error(f'Error fetching reviews: {str(e)}')
+        logger.error(f'Error preparing review export: {str(e)}')
         return jsonify({'success': False, 'error': str(e)}), 500
 
+    def generate():
+        # A dedicated connection keeps one consistent WAL snapshot for the whole stream
+        # without tying up this thread's pooled connection
+        conn = db.connect(DATABASE_FILE)
+        try:
+            cursor = conn.execute(query, params)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if export_format == 'csv':
+                writer.writerow(fields)
+
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                if export_format == 'csv':
+                    writer.writerows(rows)
+                else:
+                    for row in rows:
+                        buffer.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()
+        except Exception as e:
+            logger.error(f'Error streaming review export: {str(e)}')
+            raise
+        finally:
+            conn.close()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=reviews.{export_format}'
+    })
+
+@app.route('/api/reviews/<int:review_id>/similar', methods=['GET'])
+def get_similar_reviews(review_id):
+    try:
+        if not embedding_index_ok:
+            return jsonify({
+                'success': False,
+                'error': 'Similarity search unavailable',
+                'details': 'Embeddings are disabled, the models are not loaded, or the index needs a rebuild'
+            }), 503
+
+        try:
+            k = min(max(int(request.args.get('k', 10)), 1), SIMILAR_MAX_K)
+            min_score = float(request.args['min_score']) if 'min_score' in request.args else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid k or min_score'}), 400
+
+        conn = db.get_connection(DATABASE_FILE)
+        if conn.execute('SELECT 1 FROM reviews WHERE id = ?', (review_id,)).fetchone() is None:
+            return jsonify({'success': False, 'error': 'Review not found'}), 404
+
+        matches = embedding_index.similar(review_id, k=k, min_score=min_score)
+        if matches is None:
+            return jsonify({
+                'success': False,
+                'error': 'No embedding for this review',
+                'details': "Run 'python manage.py embeddings rebuild' to embed older reviews"
+            }), 404
+
+        # Rows deleted since they were embedded simply drop out here
+        placeholders = ','.join('?' * len(matches))
+        rows = conn.execute(
+            f"SELECT {', '.join(REVIEW_COLUMNS)} FROM reviews WHERE id IN ({placeholders})",
+            [review_id for review_id, _ in matches]
+        ).fetchall() if matches else []
+        by_id = {row[0]: dict(zip(REVIEW_COLUMNS, row)) for row in rows}
+        similar = [
+            {**by_id[match_id], 'similarity': score}
+            for match_id, score in matches if match_id in by_id
+        ]
+        return jsonify({'success': True, 'review_id': review_id, 'similar': similar})
+    except Exception as e:
+        logger.error(f"Error finding reviews similar to {review_id}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to find similar reviews', 'details': str(e)}), 500
+
 @app.route('/api/reviews/helpful', methods=['POST'])
 def update_helpful_count():
     try:
@@ -180,16 +594,15 @@ def update_helpful_count():
         if not review_id:
             return jsonify({'success': False, 'error': 'Review ID is required'}), 400
 
-        conn = sqlite3.connect(DATABASE_FILE)
-        c = conn.cursor()
-        
-        if increment:
-            c.execute('UPDATE reviews SET helpful_count = helpful_count + 1 WHERE id = ?', (review_id,))
-        else:
-            c.execute('UPDATE reviews SET helpful_count = CASE WHEN helpful_count > 0 THEN helpful_count - 1 ELSE 0 END WHERE id = ?', (review_id,))
+        with db.transaction(DATABASE_FILE) as conn:
+            if increment:
+                conn.execute('UPDATE reviews SET helpful_count = helpful_count + 1 WHERE id = ?', (review_id,))
+            else:
+                conn.execute('UPDATE reviews SET helpful_count = CASE WHEN helpful_count > 0 THEN helpful_count - 1 ELSE 0 END WHERE id = ?', (review_id,))
+            row = conn.execute('SELECT helpful_count FROM reviews WHERE id = ?', (review_id,)).fetchone()
 
-        conn.commit()
-        conn.close()
+        if row:
+            stats_broadcaster.notify({'id': review_id, 'helpful_count': row[0]})
 
         return jsonify({'success': True})
     except Exception as e:
@@ -214,165 +627,766 @@ sentiment_tokenizer = None
 sentiment_model = None
 sarcasm_model = None
 sarcasm_tokenizer = None
-sentiment_labels = ['negative', 'neutral', 'positive']
+sentiment_labels = list(rescoring.SENTIMENT_LABELS)
+negation_words = list(rescoring.NEGATION_WORDS)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+torch_default_threads = torch.get_num_threads()  # restored after each PARALLEL_MODELS pool call
+if INFERENCE_INTEROP_THREADS:
+    # Only settable once, before any inter-op work has started
+    try:
+        torch.set_num_interop_threads(INFERENCE_INTEROP_THREADS)
+    except RuntimeError as e:
+        logger.warning(f"Could not set inter-op threads: {str(e)}")
+model_state = 'not_loaded'  # not_loaded -> loading -> ready | failed
+model_error = None
+model_failed_at = 0.0
+model_load_lock = threading.Lock()
+model_thread_lock = threading.Lock()
+model_loader_thread = None
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    db_path=RESULT_CACHE_DB,
+    max_persistent_entries=RESULT_CACHE_DB_MAX_ENTRIES
+)
 
 # Initialize models
-def store_review(text, sentiment_result):
-    conn = sqlite3.connect(DATABASE_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO reviews (text, sentiment, sentiment_score)
-        VALUES (?, ?, ?)
-    ''', (text, sentiment_result['label'], sentiment_result['score']))
-    conn.commit()
-    conn.close()
+embedding_index = embeddings.EmbeddingIndex(EMBEDDINGS_FILE) if EMBEDDINGS else None
+embedding_index_ok = False  # set once the index matches the loaded sentiment model
+
+def prepare_embedding_index():
+    global embedding_index_ok
+    if embedding_index is not None:
+        config = sentiment_model.config
+        embedding_index_ok = embedding_index.ensure(config.hidden_size, config._name_or_path)
+
+def store_embeddings(ids, vectors):
+    if not embedding_index_ok:
+        return
+    pairs = [(review_id, vector) for review_id, vector in zip(ids, vectors) if vector is not None]
+    if pairs:
+        try:
+            embedding_index.put([review_id for review_id, _ in pairs], np.stack([vector for _, vector in pairs]))
+        except Exception as e:
+            # The review itself is stored; `manage.py embeddings rebuild` fills any gaps
+            logger.error(f"Failed to store review embeddings: {str(e)}")
+
+def review_row(text, result, sarcasm_score=None, embedding=None, language=None):
+    # (text, sentiment, score, sentiment_probs, sarcasm_score, has_negation, language, embedding)
+    # for insert_reviews; results without raw outputs store NULLs and are skipped by rescoring
+    probs = result.get('_probs')
+    negated = result.get('_negation')
+    return (
+        text,
+        result['label'],
+        result['score'],
+        None if probs is None else rescoring.pack_probs(probs),
+        sarcasm_score,
+        None if negated is None else int(negated),
+        model_registry.language_name(language),
+        embedding
+    )
+
+def public_sentiment(result):
+    # The sentiment result without the private raw outputs kept for storage
+    return {key: value for key, value in result.items() if not key.startswith('_')}
+
+def write_reviews(rows):
+    # rows come from review_row(). Joins the caller's transaction if there is one, so the
+    # embeddings and the stats notification are left to reviews_stored() once it commits;
+    # returns its arguments
+    with db.transaction(DATABASE_FILE) as conn:
+        conn.executemany('''
+            INSERT INTO reviews (text, sentiment, sentiment_score, sentiment_probs, sarcasm_score, has_negation, language)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [row[:7] for row in rows])
+        # The write lock is held, so one executemany assigns consecutive ids
+        last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    return range(last_id - len(rows) + 1, last_id + 1), [row[7] for row in rows]
+
+def reviews_stored(ids, vectors):
+    # Only after commit: a rolled-back insert must not leave vectors under ids that get reused
+    store_embeddings(ids, vectors)
+    stats_broadcaster.notify()
+
+def insert_reviews(rows):
+    reviews_stored(*write_reviews(rows))
+
+review_writer = db.WriteBehindBuffer(
+    insert_reviews,
+    max_batch=WRITE_BEHIND_MAX_BATCH,
+    flush_interval_ms=WRITE_BEHIND_FLUSH_MS,
+    max_queue=WRITE_BEHIND_MAX_QUEUE,
+    name='review-writer'
+)
+atexit.register(review_writer.close)
+
+def store_review(text, sentiment_result, embedding=None, sarcasm_score=None, language=None):
+    with metrics.stage('store'):
+        store_reviews([(text, sentiment_result, embedding, sarcasm_score, language)])
+
+def store_reviews(items):
+    # Bulk variant of store_review: one transaction for the whole batch. items are
+    # (text, sentiment result, embedding or None, sarcasm score or None, language code or name)
+    rows = [
+        review_row(text, result, sarcasm_score, embedding, language)
+        for text, result, embedding, sarcasm_score, language in items
+    ]
+    if WRITE_BEHIND:
+        # Rows the bounded queue cannot take in time are written inline (backpressure)
+        rows = [row for row in rows if not review_writer.put(row)]
+        if not rows:
+            return
+    insert_reviews(rows)
 
 def get_review_stats():
-    conn = sqlite3.connect(DATABASE_FILE)
-    c = conn.cursor()
-    
-    # Get total reviews count
-    c.execute('SELECT COUNT(*) FROM reviews')
-    total_reviews = c.fetchone()[0]
-    
-    # Get sentiment distribution
-    c.execute('''
-        SELECT sentiment, COUNT(*) 
-        FROM reviews 
-        GROUP BY sentiment
-    ''')
-    sentiment_counts = dict(c.fetchall())
-    
-    conn.close()
-    return {
-        'total_reviews': total_reviews,
-        'sentiment_distribution': sentiment_counts
-    }
-
-def analyze_sentiment(text):
+    # Reads the trigger-maintained counters instead of scanning the reviews table
+    with metrics.stage('stats'):
+        return review_stats.read(db.get_connection(DATABASE_FILE))
+
+def database_version():
+    # Changes whenever another connection (any thread or process) commits to the database
+    return db.get_connection(DATABASE_FILE).execute('PRAGMA data_version').fetchone()[0]
+
+stats_broadcaster = StatsBroadcaster(
+    get_review_stats,
+    data_version=database_version,
+    coalesce_ms=STATS_COALESCE_MS,
+    name='stats-broadcaster'
+)
+
+def preprocess_sentiment_text(text):
     # Enhanced preprocessing for better negative sentiment detection
     text = text.lower().replace("not ", "not_").replace("n't ", "n't_")  # Preserve negations
     
     # Additional negation handling for improved accuracy
-    negation_words = ['never', 'no', 'nothing', 'nowhere', 'none', 'nobody', 'neither', 'nor']
     for word in negation_words:
         text = text.replace(f"{word} ", f"{word}_")
-    
-    inputs = sentiment_tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(device)
-    with torch.no_grad():
-        outputs = sentiment_model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-    
+    return text
+
+def build_sentiment_result(probs, text):
+    # probs is the softmax distribution of a single text (1-D tensor)
+    return sentiment_from_outputs(probs.tolist(), rescoring.has_negation(text))
+
+def sentiment_from_outputs(raw_probs, negated):
+    # Sentiment result from the raw model outputs, at inference time or from the result cache.
+    # The raw outputs are kept (privately) so the rules can be re-applied later, see rescoring.py.
+    # float32 arithmetic like the model output, so it agrees exactly with rescoring.relabel()
+    probs = np.array(raw_probs, dtype=np.float32)
+
     # Enhanced negative sentiment detection with dynamic weighting
-    if sentiment_labels[torch.argmax(probs)] == 'negative':
-        boost_factor = 1.2 if any(word in text for word in negation_words) else 1.15
-        probs[0][torch.argmax(probs)] *= boost_factor
+    if sentiment_labels[int(np.argmax(probs))] == 'negative':
+        boost_factor = rescoring.NEGATION_BOOST if negated else rescoring.NEGATIVE_BOOST
+        probs[int(np.argmax(probs))] *= np.float32(boost_factor)
     
     result = {
-        'label': sentiment_labels[torch.argmax(probs)],
-        'score': round(torch.max(probs).item(), 4),
+        'label': sentiment_labels[int(np.argmax(probs))],
+        'score': round(float(np.max(probs)), 4),
         'full_distribution': {
-            sentiment_labels[i]: round(probs[0][i].item() * 100, 2)
+            sentiment_labels[i]: round(float(probs[i]) * 100, 2)
             for i in range(len(sentiment_labels))
-        }
+        },
+        '_probs': list(raw_probs),
+        '_negation': negated
     }
     return result
 
+def pooled_embeddings(outputs):
+    # First-token (<s>/[CLS]) hidden state of the last layer, which is what the classification
+    # head pools; None when the model does not expose hidden states
+    hidden_states = getattr(outputs, 'hidden_states', None)
+    if not hidden_states:
+        return None
+    return embeddings.normalize(hidden_states[-1][:, 0, :].float().cpu().numpy()).astype(embeddings.DTYPE)
+
+def analyze_sentiment(text, model=None, tokenizer=None, return_embedding=False):
+    model = model or sentiment_model
+    tokenizer = tokenizer or sentiment_tokenizer
+    text = preprocess_sentiment_text(text)
+    
+    with metrics.stage('tokenize'):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(device)
+    with metrics.stage('sentiment_forward'), torch.no_grad():
+        outputs = model(**inputs, output_hidden_states=return_embedding)
+        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+    
+    result = build_sentiment_result(probs[0], text)
+    if return_embedding:
+        pooled = pooled_embeddings(outputs)
+        return result, None if pooled is None else pooled[0]
+    return result
+
 def detect_sarcasm(text, model=None, tokenizer=None):
     model = model or sarcasm_model
     tokenizer = tokenizer or sarcasm_tokenizer
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512).to(device)
-    outputs = model(**inputs)
-    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+    with metrics.stage('tokenize'):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512).to(device)
+    with metrics.stage('sarcasm_forward'):
+        outputs = model(**inputs)
+        predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
     sarcasm_score = predictions[0][1].item()
     return max(0.0, min(1.0, sarcasm_score))
 
-def load_models():
-    global sentiment_model, sentiment_tokenizer, sarcasm_model, sarcasm_tokenizer
-
+def length_bucketed_batches(tokenizer, texts, batch_size, max_length=None):
+    # Group texts of similar token length so each padded batch stays small
+    with metrics.stage('tokenize'):
+        lengths = [len(ids) for ids in tokenizer(texts, truncation=True, max_length=max_length)['input_ids']]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        with metrics.stage('tokenize'):
+            inputs = tokenizer([texts[i] for i in indices], return_tensors="pt", truncation=True,
+                               padding=True, max_length=max_length).to(device)
+        yield indices, inputs
+
+def analyze_sentiment_batch(texts, model=None, tokenizer=None, batch_size=BATCH_SIZE, return_embeddings=False):
+    model = model or sentiment_model
+    tokenizer = tokenizer or sentiment_tokenizer
+    texts = [preprocess_sentiment_text(text) for text in texts]
+    results = [None] * len(texts)
+    vectors = [None] * len(texts)
+    for indices, inputs in length_bucketed_batches(tokenizer, texts, batch_size):
+        with metrics.stage('sentiment_forward'), torch.no_grad():
+            outputs = model(**inputs, output_hidden_states=return_embeddings)
+            probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        pooled = pooled_embeddings(outputs) if return_embeddings else None
+        for row, i in enumerate(indices):
+            results[i] = build_sentiment_result(probs[row], texts[i])
+            if pooled is not None:
+                vectors[i] = pooled[row]
+    if return_embeddings:
+        return results, vectors
+    return results
+
+def detect_sarcasm_batch(texts, model=None, tokenizer=None, batch_size=BATCH_SIZE):
+    model = model or sarcasm_model
+    tokenizer = tokenizer or sarcasm_tokenizer
+    scores = [None] * len(texts)
+    for indices, inputs in length_bucketed_batches(tokenizer, texts, batch_size, max_length=512):
+        with metrics.stage('sarcasm_forward'), torch.no_grad():
+            outputs = model(**inputs)
+            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        for row, i in enumerate(indices):
+            scores[i] = max(0.0, min(1.0, predictions[row][1].item()))
+    return scores
+
+def quantize_model(model, mode=None):
+    # Dynamic int8 quantization of the Linear layers: weights are stored as int8 and
+    # activations are quantized on the fly, which is where transformer CPU time goes
+    mode = mode or MODEL_QUANTIZATION
+    if mode == 'none':
+        return model
+    if mode != 'dynamic-int8':
+        raise ValueError(f"Unknown MODEL_QUANTIZATION mode: {mode}")
+    if device.type != 'cpu':
+        logger.warning("Dynamic int8 quantization only applies on CPU; keeping fp32 weights")
+        return model
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def model_fingerprint():
+    # Identifies the loaded checkpoints so cached results never outlive the models that produced them
+    parts = [f"v{ANALYSIS_VERSION}", MODEL_QUANTIZATION]
+    if CASCADE:
+        # Cascaded entries may lack a sarcasm score, so they are not valid for other gate settings
+        parts.append(f"cascade:{CASCADE_POSITIVE_CONFIDENCE}:{CASCADE_NEUTRAL_CONFIDENCE}")
+    for model in (sentiment_model, sarcasm_model):
+        config = model.config
+        revision = getattr(config, '_commit_hash', None) or 'local'
+        parts.append(f"{config._name_or_path}@{revision}:{sum(p.numel() for p in model.parameters())}")
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+def warm_up_models():
+    # First forward passes allocate kernels and caches; do them before real traffic arrives
     try:
-        # Check if CUDA is available and set device accordingly
-        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        logger.info(f"Using device: {device}")
+        with torch.no_grad():
+            _ = analyze_sentiment("Hello world")
+            _ = detect_sarcasm("This is so great I could cry.")
+        return True
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {str(e)}")
+        return False
 
-        # Load sentiment model with error handling
-        logger.info("Loading sentiment model (Twitter-RoBERTa)...")
-        try:
-            sentiment_tokenizer = AutoTokenizer.from_pretrained(
-                "cardiffnlp/twitter-roberta-base-sentiment",
-                local_files_only=False
-            )
-            sentiment_model = AutoModelForSequenceClassification.from_pretrained(
-                "cardiffnlp/twitter-roberta-base-sentiment",
-                local_files_only=False
-            )
-            sentiment_model.to(device)
-            sentiment_model.eval()  # Set to evaluation mode
-        except Exception as e:
-            logger.error(f"Failed to load sentiment model: {str(e)}")
-            raise
+def weights_memory_mapped():
+    # From these versions on, from_pretrained memory-maps safetensors and (zip) .bin checkpoints
+    # and assigns the mapped tensors as parameters instead of copying them, so a restart reads
+    # the weights from the page cache and every worker shares the same pages
+    return (version.parse(torch.__version__) >= version.parse('2.1')
+            and version.parse(transformers.__version__) >= version.parse('4.45'))
+
+def pretrained_options():
+    # local_files_only skips all hub requests (offline / pre-populated cache). low_cpu_mem_usage
+    # builds each model straight from the checkpoint instead of allocating random weights
+    # first, which roughly halves peak memory and load time.
+    load_options = {'local_files_only': MODEL_LOCAL_FILES_ONLY, 'cache_dir': MODEL_CACHE_DIR}
+    # transformers needs accelerate for low_cpu_mem_usage; fall back to a plain load without it
+    model_options = {'low_cpu_mem_usage': True} if importlib.util.find_spec('accelerate') else {}
+    return load_options, model_options
+
+def load_models(warm_up=True):
+    global sentiment_model, sentiment_tokenizer, sarcasm_model, sarcasm_tokenizer, model_state, model_error, model_failed_at
+
+    with model_load_lock:
+        if model_state == 'ready':
+            return True
+        model_state = 'loading'
 
-        # Load sarcasm model with error handling
-        logger.info("Loading sarcasm model...")
         try:
-            sarcasm_tokenizer = AutoTokenizer.from_pretrained(
-                "microsoft/deberta-v3-base",
-                local_files_only=False
-            )
-            sarcasm_model = AutoModelForSequenceClassification.from_pretrained(
-                "microsoft/deberta-v3-base",
-                num_labels=2,
-                local_files_only=False
-            )
-            sarcasm_model.to(device)
-            sarcasm_model.eval()  # Set to evaluation mode
-        except Exception as e:
-            logger.error(f"Failed to load sarcasm model: {str(e)}")
-            raise
+            # Check if CUDA is available and set device accordingly
+            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            logger.info(f"Using device: {device}")
+
+            load_options, model_options = pretrained_options()
+            if not weights_memory_mapped():
+                logger.warning(
+                    f"torch {torch.__version__} / transformers {transformers.__version__} copy checkpoint weights "
+                    "into memory; torch>=2.1 and transformers>=4.45 memory-map them"
+                )
+
+            # Load sentiment model with error handling
+            logger.info(f"Loading sentiment model ({SENTIMENT_MODEL_NAME})...")
+            try:
+                sentiment_tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME, **load_options)
+                sentiment_model = AutoModelForSequenceClassification.from_pretrained(
+                    SENTIMENT_MODEL_NAME,
+                    **model_options,
+                    **load_options
+                )
+                sentiment_model.to(device)
+                sentiment_model.eval()  # Set to evaluation mode
+                sentiment_model = quantize_model(sentiment_model)
+            except Exception as e:
+                logger.error(f"Failed to load sentiment model: {str(e)}")
+                raise
+
+            # Load sarcasm model with error handling
+            logger.info(f"Loading sarcasm model ({SARCASM_MODEL_NAME})...")
+            try:
+                sarcasm_tokenizer = AutoTokenizer.from_pretrained(SARCASM_MODEL_NAME, **load_options)
+                sarcasm_model = AutoModelForSequenceClassification.from_pretrained(
+                    SARCASM_MODEL_NAME,
+                    num_labels=2,
+                    **model_options,
+                    **load_options
+                )
+                sarcasm_model.to(device)
+                sarcasm_model.eval()  # Set to evaluation mode
+                sarcasm_model = quantize_model(sarcasm_model)
+            except Exception as e:
+                logger.error(f"Failed to load sarcasm model: {str(e)}")
+                raise
+
+            # Pinned language checkpoints load now, so their first requests never fall back
+            sentiment_models.preload(MODEL_PINNED_LANGUAGES)
+
+            # Warm up both models with proper error handling (skipped in a preloading parent process)
+            if warm_up and not warm_up_models():
+                raise RuntimeError("Model warm-up failed")
+
+            result_cache.set_fingerprint(model_fingerprint())
+            prepare_embedding_index()
+            model_state = 'ready'
+            model_error = None
+            logger.info("Models loaded and warmed up successfully." if warm_up else "Models loaded.")
+            return True
 
-        # Warm up both models with proper error handling
-        try:
-            with torch.no_grad():
-                _ = analyze_sentiment("Hello world")
-                _ = detect_sarcasm("This is so great I could cry.")
         except Exception as e:
-            logger.error(f"Model warm-up failed: {str(e)}")
-            raise
-
-        logger.info("Models loaded and warmed up successfully.")
-        return True
-
-    except Exception as e:
-        logger.error(f"Model loading failed: {str(e)}")
-        sentiment_model = sentiment_tokenizer = sarcasm_model = sarcasm_tokenizer = None
-        return False
+            logger.error(f"Model loading failed: {str(e)}")
+            sentiment_model = sentiment_tokenizer = sarcasm_model = sarcasm_tokenizer = None
+            model_state = 'failed'
+            model_error = str(e)
+            model_failed_at = time.monotonic()
+            return False
+
+def start_model_loading():
+    # Kicks off load_models on a background thread; a no-op while loading or once ready.
+    # After a failure, retries at most every MODEL_RETRY_SECONDS.
+    global model_loader_thread
+    with model_thread_lock:
+        if model_state in ('loading', 'ready'):
+            return
+        if model_loader_thread is not None and model_loader_thread.is_alive():
+            return
+        if model_state == 'failed' and time.monotonic() - model_failed_at < MODEL_RETRY_SECONDS:
+            return
+        model_loader_thread = threading.Thread(target=load_models, name='model-loader', daemon=True)
+        model_loader_thread.start()
+
+def models_ready():
+    return model_state == 'ready'
+
+def load_sentiment_checkpoint(checkpoint):
+    # Loader for the per-language registry; same options and quantization as load_models
+    load_options, model_options = pretrained_options()
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint, **load_options)
+    model = AutoModelForSequenceClassification.from_pretrained(checkpoint, **model_options, **load_options)
+    model.to(device)
+    model.eval()
+    return tokenizer, quantize_model(model)
+
+def language_checkpoints():
+    checkpoints = {}
+    if MULTILINGUAL_SENTIMENT_MODEL_NAME:
+        checkpoints = {
+            language['code']: MULTILINGUAL_SENTIMENT_MODEL_NAME
+            for language in model_registry.LANGUAGES if language['code'] != 'en'
+        }
+    checkpoints.update(model_registry.parse_checkpoints(SENTIMENT_LANGUAGE_MODELS))
+    return {code: checkpoint for code, checkpoint in checkpoints.items() if checkpoint}
+
+sentiment_models = ModelRegistry(
+    load_sentiment_checkpoint,
+    language_checkpoints(),
+    memory_budget=MODEL_MEMORY_BUDGET_MB * 2 ** 20,
+    pinned=MODEL_PINNED_LANGUAGES,
+    retry_seconds=MODEL_RETRY_SECONDS,
+    name='sentiment-models'
+)
+
+def sentiment_model_for(language, wait=False):
+    # (cache namespace, tokenizer, model); the default model has the empty namespace. Without
+    # wait, a language whose checkpoint is still loading gets the default model.
+    entry = sentiment_models.get(language, wait=wait) if language else None
+    if entry is None:
+        return '', sentiment_tokenizer, sentiment_model
+    return entry
+
+def sentiment_namespace(language):
+    # Cache namespace of the model that should score this language: its checkpoint even while
+    # that is still loading (asking queues the load), '' for the default model
+    return (sentiment_models.resolve(language) or '') if language else ''
+
+def scored_namespace(sentiment_result):
+    return sentiment_result.get('_namespace', '')
 
 # Load models on startup
-if not load_models():
-    logger.error("Failed to initialize models at startup")
+if MODEL_LOAD_MODE == 'eager':
+    if not load_models():
+        logger.error("Failed to initialize models at startup")
+elif MODEL_LOAD_MODE == 'preload':
+    # gunicorn preload_app: load once in the master so forked workers share the weights
+    # copy-on-write; each worker warms up in the post_fork hook (gunicorn.conf.py)
+    if not load_models(warm_up=False):
+        logger.error("Failed to initialize models at startup")
+elif MODEL_LOAD_MODE == 'background':
+    start_model_loading()
 
 def adjust_sentiment_for_sarcasm(sentiment, sarcasm_score):
-    if sarcasm_score > 0.6:
+    # sarcasm_score is None when the cascade skipped the sarcasm pass
+    # rescoring.relabel() applies the same rules to stored outputs; keep the two in step
+    if sarcasm_score is not None and sarcasm_score > rescoring.SARCASM_THRESHOLD:
         if sentiment['label'] == 'positive':
-            sentiment['label'] = 'sarcastically positive (actually negative)'
+            sentiment['label'] = rescoring.SARCASTIC_POSITIVE
             sentiment['score'] = 1 - sentiment['score']  # Invert confidence for sarcastic positives
         elif sentiment['label'] == 'neutral':
-            sentiment['label'] = 'potentially negative'
-            sentiment['score'] = min(sentiment['score'] + 0.25, 1.0)  # Stronger boost for neutral-to-negative
+            sentiment['label'] = rescoring.POTENTIALLY_NEGATIVE
+            sentiment['score'] = min(sentiment['score'] + rescoring.NEUTRAL_SARCASM_BOOST, 1.0)  # Stronger boost for neutral-to-negative
     
     # More nuanced negative sentiment handling
     if sentiment['label'] == 'negative':
-        if sentiment['score'] < 0.7:
-            sentiment['score'] = min(sentiment['score'] + 0.2, 1.0)  # Increased boost for weak negatives
-        elif sentiment['score'] < 0.85:
-            sentiment['score'] = min(sentiment['score'] + 0.1, 1.0)  # Moderate boost for medium negatives
+        if sentiment['score'] < rescoring.WEAK_NEGATIVE_BELOW:
+            sentiment['score'] = min(sentiment['score'] + rescoring.WEAK_NEGATIVE_BOOST, 1.0)  # Increased boost for weak negatives
+        elif sentiment['score'] < rescoring.MEDIUM_NEGATIVE_BELOW:
+            sentiment['score'] = min(sentiment['score'] + rescoring.MEDIUM_NEGATIVE_BOOST, 1.0)  # Moderate boost for medium negatives
     
     return sentiment
 
+cascade_lock = threading.Lock()
+cascade_counts = {'sarcasm_run': 0, 'sarcasm_skipped': 0}
 
+def needs_sarcasm(sentiment_result):
+    if not CASCADE:
+        return True
+    label, score = sentiment_result['label'], sentiment_result['score']
+    if label == 'positive':
+        return score < CASCADE_POSITIVE_CONFIDENCE
+    if label == 'neutral':
+        return score < CASCADE_NEUTRAL_CONFIDENCE
+    return False
+
+def count_sarcasm_passes(run, skipped):
+    with cascade_lock:
+        cascade_counts['sarcasm_run'] += run
+        cascade_counts['sarcasm_skipped'] += skipped
+
+def analyze_sentiment_by_language(texts, languages=None, batch_size=BATCH_SIZE, return_embeddings=False,
+                                  wait_for_models=False):
+    # Runs each language group through its own checkpoint; returns (results, vectors). Only the
+    # default model's texts get embeddings, since the index holds that model's vector space.
+    # Each result records the cache namespace of the model that actually scored it.
+    groups = {}
+    for i, language in enumerate(languages or [None] * len(texts)):
+        groups.setdefault(sentiment_models.checkpoint_for(language) if language else None, []).append(i)
+    results = [None] * len(texts)
+    vectors = [None] * len(texts)
+    for indices in groups.values():
+        namespace, tokenizer, model = sentiment_model_for(languages[indices[0]] if languages else None, wait_for_models)
+        embed = return_embeddings and not namespace
+        scored = analyze_sentiment_batch(
+            [texts[i] for i in indices], model, tokenizer, batch_size=batch_size, return_embeddings=embed
+        )
+        group_results, group_vectors = scored if embed else (scored, [None] * len(indices))
+        for i, result, vector in zip(indices, group_results, group_vectors):
+            result['_namespace'] = namespace
+            results[i] = result
+            vectors[i] = vector
+    return results, vectors
+
+def analyze_texts(texts, batch_size=BATCH_SIZE, languages=None, wait_for_models=False):
+    # (sentiment, sarcasm score, embedding) per text; sarcasm only where the cascade says it can matter.
+    # wait_for_models loads missing language checkpoints first instead of falling back (offline tools).
+    sentiment_results, vectors = analyze_sentiment_by_language(
+        texts, languages, batch_size=batch_size, return_embeddings=EMBEDDINGS, wait_for_models=wait_for_models
+    )
+    sarcasm_scores = [None] * len(texts)
+    pending = [i for i, result in enumerate(sentiment_results) if needs_sarcasm(result)]
+    if pending:
+        scored = detect_sarcasm_batch([texts[i] for i in pending], batch_size=batch_size)
+        for i, score in zip(pending, scored):
+            sarcasm_scores[i] = score
+    count_sarcasm_passes(len(pending), len(texts) - len(pending))
+    return list(zip(sentiment_results, sarcasm_scores, vectors))
+
+def sarcasm_payload(sarcasm_score):
+    if sarcasm_score is None:
+        return {'score': None, 'is_sarcastic': None, 'skipped': True}
+    return {'score': round(sarcasm_score, 4), 'is_sarcastic': sarcasm_score > 0.5}
+
+def cascade_stats():
+    with cascade_lock:
+        counts = dict(cascade_counts)
+    total = counts['sarcasm_run'] + counts['sarcasm_skipped']
+    return {
+        'enabled': CASCADE,
+        'positive_confidence_gate': CASCADE_POSITIVE_CONFIDENCE,
+        'neutral_confidence_gate': CASCADE_NEUTRAL_CONFIDENCE,
+        **counts,
+        'skip_rate': round(counts['sarcasm_skipped'] / total, 4) if total else 0.0
+    }
 
+def make_inference_pool(size=INFERENCE_POOL_SIZE):
+    return ThreadPoolExecutor(max_workers=max(2, size), thread_name_prefix='inference')
 
+def with_model_threads(fn, *args, threads=INFERENCE_THREADS_PER_MODEL, **kwargs):
+    # Runs fn on a pool thread with its own intra-op thread count. torch.set_num_threads also
+    # becomes the default for every thread started afterwards (request threads, job workers,
+    # the model loader), so the count is set per call and put back to the process default after
+    previous = torch_default_threads
+    torch.set_num_threads(max(1, threads))
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        torch.set_num_threads(previous)
+
+inference_pool = None
+inference_pool_lock = threading.Lock()
+
+def get_inference_pool():
+    # Created on first use so a preloading gunicorn master never starts threads before fork
+    global inference_pool
+    with inference_pool_lock:
+        if inference_pool is None:
+            inference_pool = make_inference_pool()
+        return inference_pool
+
+def parallel_models_enabled():
+    return PARALLEL_MODELS and not CASCADE
+
+def run_models_parallel(texts, pool, batch_size=BATCH_SIZE, languages=None,
+                        threads_per_model=INFERENCE_THREADS_PER_MODEL):
+    sentiment_future = pool.submit(
+        with_model_threads, analyze_sentiment_by_language, texts, languages,
+        threads=threads_per_model, batch_size=batch_size, return_embeddings=EMBEDDINGS
+    )
+    sarcasm_future = pool.submit(
+        with_model_threads, detect_sarcasm_batch, texts, threads=threads_per_model, batch_size=batch_size
+    )
+    sentiment_results, vectors = sentiment_future.result()
+    results = list(zip(sentiment_results, sarcasm_future.result(), vectors))
+    count_sarcasm_passes(len(texts), 0)
+    return results
+
+def embed_texts(texts, batch_size=BATCH_SIZE):
+    # Embeddings only (manage.py embeddings rebuild); the sentiment labels are discarded
+    _, vectors = analyze_sentiment_batch(texts, batch_size=batch_size, return_embeddings=True)
+    return np.stack(vectors)
+
+def run_inference_batch(texts, languages=None):
+    if parallel_models_enabled():
+        return run_models_parallel(texts, get_inference_pool(), languages=languages)
+    return analyze_texts(texts, languages=languages)
+
+def run_inference_items(items):
+    # Micro-batcher items are (text, language)
+    return run_inference_batch([text for text, _ in items], [language for _, language in items])
+
+inference_batcher = MicroBatcher(
+    run_inference_items,
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    name='inference-batcher'
+)
+
+def to_cache_entry(sentiment_result, sarcasm_score, embedding):
+    # Raw outputs only: the boosts are re-applied on every hit, so the cache stays valid when they change
+    entry = {
+        'probs': sentiment_result['_probs'],
+        'negation': sentiment_result['_negation'],
+        'sarcasm_score': sarcasm_score
+    }
+    if embedding is not None:
+        entry['embedding'] = base64.b64encode(embedding.astype(embeddings.DTYPE).tobytes()).decode('ascii')
+    return entry
+
+def from_cache_entry(entry):
+    embedding = entry.get('embedding')
+    if embedding is not None:
+        embedding = np.frombuffer(base64.b64decode(embedding), dtype=embeddings.DTYPE)
+    return sentiment_from_outputs(entry['probs'], entry['negation']), entry['sarcasm_score'], embedding
+
+def run_inference(text, language=None, admit=None):
+    # Returns (sentiment result, sarcasm score or None, embedding or None). admit(texts) returns
+    # a context manager held around the model work, so cache hits are never charged for it
+    namespace = sentiment_namespace(language) if result_cache.enabled else ''
+    cached = result_cache.get(text, namespace) if result_cache.enabled else None
+    if cached is not None:
+        return from_cache_entry(cached)
+
+    with admit([text]) if admit else nullcontext():
+        sentiment_result, sarcasm_score, embedding = score_text(text, language)
+
+    # Default-model fallbacks (the language's checkpoint was still loading) are not cached
+    if result_cache.enabled and scored_namespace(sentiment_result) == namespace:
+        result_cache.put(text, to_cache_entry(sentiment_result, sarcasm_score, embedding), namespace)
+    return sentiment_result, sarcasm_score, embedding
+
+def score_text(text, language=None):
+    if MICRO_BATCHING:
+        sentiment_result, sarcasm_score, embedding = inference_batcher.submit((text, language)).result(
+            timeout=INFERENCE_TIMEOUT
+        )
+    elif parallel_models_enabled():
+        sentiment_result, sarcasm_score, embedding = run_models_parallel(
+            [text], get_inference_pool(), languages=[language]
+        )[0]
+    else:
+        namespace, tokenizer, model = sentiment_model_for(language)
+        if EMBEDDINGS and not namespace:
+            sentiment_result, embedding = analyze_sentiment(text, model, tokenizer, return_embedding=True)
+        else:
+            sentiment_result, embedding = analyze_sentiment(text, model, tokenizer), None
+        sentiment_result['_namespace'] = namespace
+        if needs_sarcasm(sentiment_result):
+            sarcasm_score = detect_sarcasm(text, sarcasm_model, sarcasm_tokenizer)
+            count_sarcasm_passes(1, 0)
+        else:
+            sarcasm_score = None
+            count_sarcasm_passes(0, 1)
+    return sentiment_result, sarcasm_score, embedding
+
+def run_inference_many(texts, languages=None, admit=None):
+    # languages: one per text, or None for the default model; admit as in run_inference
+    languages = languages or [None] * len(texts)
+    if not result_cache.enabled:
+        with admit(texts) if admit else nullcontext():
+            return run_inference_batch(texts, languages)
+
+    results = [None] * len(texts)
+    namespaces = [sentiment_namespace(language) for language in languages]
+    pending = {}
+    for i, (text, namespace) in enumerate(zip(texts, namespaces)):
+        cached = result_cache.get(text, namespace)
+        if cached is not None:
+            results[i] = from_cache_entry(cached)
+        else:
+            # Duplicates within the submission are scored once
+            pending.setdefault(result_cache.key(text, namespace), []).append(i)
+
+    if pending:
+        firsts = [indices[0] for indices in pending.values()]
+        miss_texts = [texts[i] for i in firsts]
+        with admit(miss_texts) if admit else nullcontext():
+            scored = run_inference_batch(miss_texts, [languages[i] for i in firsts])
+        for indices, result in zip(pending.values(), scored):
+            for i in indices:
+                results[i] = result
+        # As in run_inference, default-model fallbacks are not cached under the language's key
+        result_cache.put_many([
+            (texts[i], to_cache_entry(*result), namespaces[i])
+            for i, result in zip(firsts, scored)
+            if scored_namespace(result[0]) == namespaces[i]
+        ])
+    return results
+
+
+
+def score_job_batch(texts, languages=None):
+    results = []
+    languages = languages or [None] * len(texts)
+    for language, (sentiment_result, sarcasm_score, embedding) in zip(languages, run_inference_many(texts, languages)):
+        adjusted_sentiment = adjust_sentiment_for_sarcasm(sentiment_result.copy(), sarcasm_score)
+        results.append({
+            'sentiment': public_sentiment(adjusted_sentiment),
+            'sarcasm': sarcasm_payload(sarcasm_score),
+            # private: stored with the review, not in the job result
+            '_review': review_row(None, adjusted_sentiment, sarcasm_score, embedding, language)
+        })
+    return results
+
+def store_job_results(texts, results):
+    # Runs inside the transaction that marks the job items done, so a batch is stored exactly once;
+    # the queue calls the returned function after that transaction commits
+    ids, vectors = write_reviews([(text,) + result['_review'][1:] for text, result in zip(texts, results)])
+    return lambda: reviews_stored(ids, vectors)
+
+job_queue = jobs.JobQueue(
+    DATABASE_FILE,
+    score_job_batch,
+    store_results=store_job_results,
+    ready=models_ready,
+    batch_size=JOB_BATCH_SIZE,
+    workers=JOB_WORKERS,
+    lease_seconds=JOB_LEASE_SECONDS,
+    name='analysis-jobs'
+)
+
+admission_budget = TokenBudget(
+    ADMISSION_MAX_TOKENS,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_wait=ADMISSION_MAX_WAIT,
+    name='inference-admission'
+) if ADMISSION_MAX_TOKENS > 0 else None
+
+def count_tokens(texts):
+    # Admission cost: the tokens each text feeds the models (truncated to 512 like the models)
+    return sum(len(ids) for ids in sentiment_tokenizer(texts, truncation=True, max_length=512)['input_ids'])
+
+def admit_inference(texts):
+    # Called with the texts that missed the result cache, right before they go to the models
+    if admission_budget is None:
+        return nullcontext()
+    return admission_budget.admit(count_tokens(texts))
+
+def capacity_exceeded(response, error):
+    admission_rejections.inc(reason=error.reason)
+    response.update({
+        'error': 'Server busy',
+        'details': 'Too much analysis work is in progress. Please retry shortly.'
+    })
+    return jsonify(response), 429, {'Retry-After': str(error.retry_after)}  # Too Many Requests
+
+def models_unavailable(response):
+    # Models load in the background; never block a request on loading them
+    start_model_loading()
+    if model_state == 'failed':
+        response.update({
+            'error': 'Model initialization failed',
+            'details': 'Failed to load required models. Please try again later.'
+        })
+    else:
+        response.update({
+            'error': 'Models loading',
+            'details': 'Models are still loading. Please try again shortly.'
+        })
+    return jsonify(response), 503, {'Retry-After': '5'}  # Service Unavailable
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
@@ -385,21 +1399,8 @@ def analyze_text():
     }
 
     # Check if models are initialized
-    if not (sentiment_model and sarcasm_model):
-        try:
-            if not load_models():
-                response.update({
-                    'error': 'Model initialization failed',
-                    'details': 'Failed to load required models. Please try again later.'
-                })
-                return jsonify(response), 503  # Service Unavailable
-        except Exception as e:
-            logger.error(f"Model loading error: {e}")
-            response.update({
-                'error': 'Model initialization error',
-                'details': 'An error occurred while loading the models'
-            })
-            return jsonify(response), 500
+    if not models_ready():
+        return models_unavailable(response)
 
     try:
         # Validate request data
@@ -431,28 +1432,28 @@ def analyze_text():
 
         try:
             # Perform analysis
-            sentiment_result = analyze_sentiment(text)
-            sarcasm_score = detect_sarcasm(text, sarcasm_model, sarcasm_tokenizer)
+            with metrics.stage('inference'):
+                sentiment_result, sarcasm_score, embedding = run_inference(text, language, admit=admit_inference)
             adjusted_sentiment = adjust_sentiment_for_sarcasm(sentiment_result.copy(), sarcasm_score)
 
             # Store results
-            store_review(text, adjusted_sentiment)
+            store_review(text, adjusted_sentiment, embedding, sarcasm_score, language)
 
             # Prepare success response
             response.update({
                 'success': True,
                 'data': {
-                    'sentiment': adjusted_sentiment,
-                    'sarcasm': {
-                        'score': round(sarcasm_score, 4),
-                        'is_sarcastic': sarcasm_score > 0.5
-                    },
+                    'sentiment': public_sentiment(adjusted_sentiment),
+                    'sarcasm': sarcasm_payload(sarcasm_score),
                     'language': language,
                     'stats': get_review_stats()
                 }
             })
             return jsonify(response), 200
 
+        except AdmissionRejected as e:
+            return capacity_exceeded(response, e)
+
         except RuntimeError as e:
             logger.error(f"Analysis runtime error: {e}")
             response.update({
@@ -469,6 +1470,174 @@ def analyze_text():
         })
         return jsonify(response), 500
 
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    response = {
+        'success': False,
+        'error': None,
+        'details': None,
+        'data': None
+    }
+
+    if not models_ready():
+        return models_unavailable(response)
+
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('texts'), list):
+            response.update({
+                'error': 'Invalid request format',
+                'details': 'Request must contain a JSON list in the texts field'
+            })
+            return jsonify(response), 400
+
+        texts = data['texts']
+        language = data.get('language', 'en')
+
+        if not texts or len(texts) > MAX_BATCH_TEXTS:
+            response.update({
+                'error': 'Invalid input',
+                'details': f'texts must contain between 1 and {MAX_BATCH_TEXTS} items'
+            })
+            return jsonify(response), 400
+
+        if not all(isinstance(text, str) and text.strip() for text in texts):
+            response.update({
+                'error': 'Invalid input',
+                'details': 'Every text must be a non-empty string'
+            })
+            return jsonify(response), 400
+
+        texts = [text.strip() for text in texts]
+
+        try:
+            results = []
+            stored = []
+            with metrics.stage('inference'):
+                scored = run_inference_many(texts, [language] * len(texts), admit=admit_inference)
+            for text, (sentiment_result, sarcasm_score, embedding) in zip(texts, scored):
+                adjusted_sentiment = adjust_sentiment_for_sarcasm(sentiment_result.copy(), sarcasm_score)
+                stored.append((text, adjusted_sentiment, embedding, sarcasm_score, language))
+                results.append({
+                    'sentiment': public_sentiment(adjusted_sentiment),
+                    'sarcasm': sarcasm_payload(sarcasm_score)
+                })
+
+            with metrics.stage('store'):
+                store_reviews(stored)
+
+            response.update({
+                'success': True,
+                'data': {
+                    'results': results,
+                    'language': language,
+                    'stats': get_review_stats()
+                }
+            })
+            return jsonify(response), 200
+
+        except AdmissionRejected as e:
+            return capacity_exceeded(response, e)
+
+        except RuntimeError as e:
+            logger.error(f"Batch analysis runtime error: {e}")
+            response.update({
+                'error': 'Analysis execution failed',
+                'details': 'An error occurred while processing the texts'
+            })
+            return jsonify(response), 500
+
+    except Exception as e:
+        logger.error(f"Batch endpoint error: {e}")
+        response.update({
+            'error': 'Server error',
+            'details': 'An internal server error occurred'
+        })
+        return jsonify(response), 500
+
+@app.route('/api/inference/stats', methods=['GET'])
+def get_inference_stats():
+    return jsonify({
+        'micro_batching': inference_batcher.stats() if MICRO_BATCHING else {'enabled': False},
+        'cascade': cascade_stats(),
+        'sentiment_models': sentiment_models.stats(),
+        'admission': admission_budget.stats() if admission_budget else {'enabled': False},
+        'parallel_models': {
+            'enabled': parallel_models_enabled(),
+            'pool_size': max(2, INFERENCE_POOL_SIZE),
+            'threads_per_model': INFERENCE_THREADS_PER_MODEL
+        },
+        'result_cache': result_cache.stats(),
+        'write_behind': review_writer.stats() if WRITE_BEHIND else {'enabled': False},
+        'jobs': job_queue.stats(),
+        'embeddings': {'enabled': embedding_index_ok, **embedding_index.stats()} if embedding_index else {'enabled': False},
+        'stats_stream': stats_broadcaster.stats()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+def trends_bucket_format(granularity):
+    return '%Y-%m-%d %H:00:00' if granularity == 'hour' else '%Y-%m-%d'
+
+@app.route('/api/trends', methods=['GET'])
+def get_trends():
+    # Sentiment over time from the trigger-maintained rollups; never touches the reviews table
+    try:
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in rollups.GRANULARITIES:
+            return jsonify({'success': False, 'error': f"granularity must be one of {', '.join(rollups.GRANULARITIES)}"}), 400
+
+        group_by = [dimension for dimension in request.args.get('group_by', 'sentiment').split(',') if dimension]
+        unknown = [dimension for dimension in group_by if dimension not in rollups.DIMENSIONS]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown group_by: {', '.join(unknown)}"}), 400
+
+        try:
+            days = int(request.args.get('days', TRENDS_DEFAULT_DAYS[granularity]))
+            end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else datetime.utcnow()
+            rating = int(request.args.get('rating', 0))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid days, end or rating'}), 400
+        if not 1 <= days <= TRENDS_MAX_DAYS[granularity]:
+            return jsonify({
+                'success': False,
+                'error': f"days must be between 1 and {TRENDS_MAX_DAYS[granularity]} for {granularity} buckets"
+            }), 400
+
+        bucket_format = trends_bucket_format(granularity)
+        start = end - timedelta(days=days)
+        filters = {
+            dimension: request.args[dimension]
+            for dimension in ('sentiment', 'language') if request.args.get(dimension, 'all') != 'all'
+        }
+        # rating is a minimum, as in /api/reviews
+        minimums = {'star_rating': rating} if rating > 0 else {}
+
+        points = rollups.read(
+            db.get_connection(DATABASE_FILE),
+            granularity,
+            start.strftime(bucket_format),
+            end.strftime(bucket_format),
+            group_by=group_by,
+            filters=filters,
+            minimums=minimums
+        )
+        return jsonify({
+            'success': True,
+            'data': {
+                'granularity': granularity,
+                'start': start.strftime(bucket_format),
+                'end': end.strftime(bucket_format),
+                'group_by': group_by,
+                'points': points
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error fetching trends: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to fetch trends', 'details': str(e)}), 500
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     try:
@@ -541,13 +1710,13 @@ def get_stats():
             sentiment_result = adjust_sentiment_for_sarcasm(sentiment_result, sarcasm_score)
 
             # Store results
-            store_review(text, sentiment_result)
+            store_review(text, sentiment_result, sarcasm_score=sarcasm_score, language=language)
 
             # Prepare success response
             response.update({
                 'success': True,
                 'data': {
-                    'sentiment': sentiment_result,
+                    'sentiment': public_sentiment(sentiment_result),
                     'sarcasm': {
                         'score': round(sarcasm_score, 4),
                         'is_sarcastic': sarcasm_score > 0.5
@@ -582,31 +1751,193 @@ def get_stats():
         })
         return jsonify(response), 500
 
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.route('/api/stats/stream', methods=['GET'])
+def stream_stats():
+    try:
+        subscription = stats_broadcaster.subscribe()
+    except Exception as e:
+        logger.error(f"Error opening stats stream: {str(e)}")
+        return jsonify({'error': 'Failed to open stats stream', 'details': str(e)}), 500
+
+    def generate():
+        try:
+            yield format_sse('snapshot', subscription.snapshot)
+            while True:
+                try:
+                    event, payload = subscription.get(timeout=STATS_STREAM_KEEPALIVE)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream and surfaces disconnects
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(event, payload)
+        finally:
+            stats_broadcaster.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    response = {
+        'success': False,
+        'error': None,
+        'details': None,
+        'data': None
+    }
+
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('texts'), list):
+            response.update({
+                'error': 'Invalid request format',
+                'details': 'Request must contain a JSON list in the texts field'
+            })
+            return jsonify(response), 400
+
+        texts = data['texts']
+        if not texts or len(texts) > JOB_MAX_TEXTS:
+            response.update({
+                'error': 'Invalid input',
+                'details': f'texts must contain between 1 and {JOB_MAX_TEXTS} items'
+            })
+            return jsonify(response), 400
+
+        if not all(isinstance(text, str) and text.strip() for text in texts):
+            response.update({
+                'error': 'Invalid input',
+                'details': 'Every text must be a non-empty string'
+            })
+            return jsonify(response), 400
+
+        try:
+            priority = jobs.parse_priority(data.get('priority'))
+        except ValueError as e:
+            response.update({'error': 'Invalid priority', 'details': str(e)})
+            return jsonify(response), 400
+
+        job_id = job_queue.submit([text.strip() for text in texts], priority=priority, language=data.get('language', 'en'))
+        if not models_ready():
+            # Jobs are accepted while the models load; workers pick them up once ready
+            start_model_loading()
+
+        response.update({'success': True, 'data': job_queue.get(job_id)})
+        return jsonify(response), 202, {'Location': f'/api/jobs/{job_id}'}
+
+    except Exception as e:
+        logger.error(f"Job submission error: {str(e)}")
+        response.update({
+            'error': 'Job submission failed',
+            'details': 'An error occurred while queueing the texts'
+        })
+        return jsonify(response), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'data': job})
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to fetch job', 'details': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    try:
+        if job_queue.get(job_id) is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+        cursor = request.args.get('cursor')
+        try:
+            limit = min(max(int(request.args.get('limit', REVIEWS_PAGE_SIZE)), 1), REVIEWS_MAX_PAGE_SIZE)
+            after = decode_cursor(cursor)['position'] if cursor else -1
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'success': False, 'error': 'Invalid limit or cursor'}), 400
+
+        # Finished items in submission order; items still pending are skipped until they complete
+        results = job_queue.results(job_id, after=after, limit=limit)
+        next_cursor = encode_cursor({'position': results[-1]['position']}) if len(results) == limit else None
+        return jsonify({'success': True, 'results': results, 'next_cursor': next_cursor})
+    except Exception as e:
+        logger.error(f"Error fetching results for job {job_id}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to fetch job results', 'details': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def generate():
+        # Polls the job row rather than subscribing to workers, so progress made by
+        # other processes sharing the database is streamed too
+        last, idle = None, 0.0
+        current = job
+        while True:
+            progress = (current['status'], current['processed'], current['failed'])
+            if progress != last:
+                last, idle = progress, 0.0
+                yield format_sse('progress', current)
+            elif idle >= STATS_STREAM_KEEPALIVE:
+                idle = 0.0
+                yield ': keepalive\n\n'
+            if current['status'] == 'completed':
+                yield format_sse('completed', current)
+                return
+            time.sleep(JOB_STREAM_INTERVAL)
+            idle += JOB_STREAM_INTERVAL
+            try:
+                current = job_queue.get(job_id)
+            except Exception as e:
+                logger.error(f"Error polling job {job_id}: {str(e)}")
+                yield format_sse('error', {'job_id': job_id, 'error': 'Failed to fetch job', 'details': str(e)})
+                return
+            if current is None:
+                # Purged while the stream was open
+                yield format_sse('error', {'job_id': job_id, 'error': 'Job not found'})
+                return
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    try:
+        db.get_connection(DATABASE_FILE).execute('SELECT 1').fetchone()
+        database_ok = True
+    except Exception as e:
+        logger.error(f"Readiness database check failed: {str(e)}")
+        database_ok = False
+
+    ready = models_ready() and database_ok
+    body = {
+        'status': 'ready' if ready else 'not_ready',
+        'models': model_state,
+        'database': 'ok' if database_ok else 'error'
+    }
+    if model_error:
+        body['error'] = model_error
+    return jsonify(body), 200 if ready else 503
+
 @app.route('/api/languages', methods=['GET'])
 def get_supported_languages():
     # List of supported languages including Indian regional languages
-    languages = [
-        {'code': 'en', 'name': 'English'},
-        {'code': 'hi', 'name': 'Hindi'},
-        {'code': 'bn', 'name': 'Bengali'},
-        {'code': 'ta', 'name': 'Tamil'},
-        {'code': 'te', 'name': 'Telugu'},
-        {'code': 'mr', 'name': 'Marathi'},
-        {'code': 'gu', 'name': 'Gujarati'},
-        {'code': 'kn', 'name': 'Kannada'},
-        {'code': 'ml', 'name': 'Malayalam'},
-        {'code': 'pa', 'name': 'Punjabi'},
-        {'code': 'it', 'name': 'Italian'},
-        {'code': 'pt', 'name': 'Portuguese'},
-        {'code': 'nl', 'name': 'Dutch'},
-        {'code': 'pl', 'name': 'Polish'},
-        {'code': 'zh', 'name': 'Chinese'},
-        {'code': 'ja', 'name': 'Japanese'}
-    ]
-    return jsonify(languages)
+    return jsonify(model_registry.LANGUAGES)
 
 if __name__ == '__main__':
-    if sentiment_model is None or sarcasm_model is None:
+    if model_state == 'failed':
         logger.error("Models not loaded. Aborting.")
         exit(1)
 
@@ -0,0 +1,94 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+# Collects concurrently submitted items and hands them to process_batch in groups.
+# The worker takes the first queued item, then keeps collecting until max_batch_size
+# items are gathered or max_wait_ms has elapsed. process_batch must return one result
+# per item, in order; each caller only blocks on the future returned by submit().
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=16, max_wait_ms=5, name='micro-batcher'):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._items = 0
+
+    def submit(self, item):
+        future = Future()
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_started(self):
+        # Started lazily so forked workers (gunicorn) get their own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(item, future) for item, future in self._collect()
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(batch)] += 1
+
+            try:
+                results = list(self.process_batch([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    # Results cannot be matched to items any more; fail them all rather than guess
+                    raise RuntimeError(f"process_batch returned {len(results)} results for {len(batch)} items")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {str(e)}")
+                # Every caller is blocked on its future, so none may be left pending
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'batches': self._batches,
+                'items': self._items,
+                'mean_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items()))
+            }
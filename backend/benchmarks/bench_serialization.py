@@ -0,0 +1,106 @@
+import argparse
+import sys
+import time
+
+import common
+
+
+def measure(fn, iterations):
+    fn()  # warm-up
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return common.summarize(latencies, time.perf_counter() - started)
+
+
+def encoder_benchmarks(app, payload, iterations):
+    # Same payload through Flask's stdlib provider and the orjson provider
+    from flask.json.provider import DefaultJSONProvider
+    import serialization
+
+    providers = {'stdlib': DefaultJSONProvider(app.app)}
+    if serialization.orjson is not None:
+        providers['orjson'] = serialization.OrjsonProvider(app.app)
+
+    results = {}
+    with app.app.app_context():
+        for name, provider in providers.items():
+            body = provider.response(payload).get_data()
+            results[name] = {'bytes': len(body), **measure(lambda: provider.response(payload), iterations)}
+    return results, body
+
+
+def compression_benchmarks(body, iterations, level):
+    import serialization
+
+    results = {'identity': {'bytes': len(body)}}
+    encodings = ['gzip'] + (['br'] if serialization.brotli is not None else [])
+    for encoding in encodings:
+        compressed = serialization.compress(body, encoding, level)
+        results[encoding] = {
+            'bytes': len(compressed),
+            'ratio': round(len(body) / len(compressed), 2),
+            **measure(lambda: serialization.compress(body, encoding, level), iterations)
+        }
+    return results
+
+
+def conditional_benchmarks(app, page_size, iterations):
+    # Full page vs revalidation of an unchanged page, through the whole request path
+    client = app.app.test_client()
+    url = f'/api/reviews?limit={page_size}'
+    first = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers.get('ETag')
+    revalidated = client.get(url, headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    if revalidated.status_code != 304:
+        raise RuntimeError(f"Expected 304 for an unchanged page, got {revalidated.status_code}")
+    return {
+        'full': {
+            'bytes': len(first.data),
+            **measure(lambda: client.get(url, headers={'Accept-Encoding': 'gzip'}), iterations)
+        },
+        'not_modified': {
+            'bytes': len(revalidated.data),
+            **measure(lambda: client.get(url, headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'}), iterations)
+        }
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure JSON encoding, compression and conditional GET savings.')
+    parser.add_argument('--db', default='bench_reviews.db', help='Database filled by generate_reviews.py')
+    parser.add_argument('--rows', type=int, default=100000, help='Review rows serialized in one payload')
+    parser.add_argument('--iterations', type=int, default=5, help='Repetitions of each full-table measurement')
+    parser.add_argument('--page-size', type=int, default=500, help='limit passed to /api/reviews')
+    parser.add_argument('--level', type=int, default=6, help='Compression level (1-9)')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/serialization-<time>.json)')
+    args = parser.parse_args(argv)
+
+    common.configure(args.db)
+    app = common.load_app()
+    import db
+
+    rows = db.get_connection(app.DATABASE_FILE).execute(
+        f"SELECT {', '.join(app.REVIEW_COLUMNS)} FROM reviews ORDER BY id DESC LIMIT ?", (args.rows,)
+    ).fetchall()
+    if not rows:
+        raise SystemExit(f"{args.db} has no reviews; run generate_reviews.py first")
+    payload = {'success': True, 'reviews': [dict(zip(app.REVIEW_COLUMNS, row)) for row in rows]}
+
+    encoders, body = encoder_benchmarks(app, payload, args.iterations)
+    results = {
+        'encoder': encoders,
+        'compression': compression_benchmarks(body, args.iterations, args.level),
+        'conditional_get': conditional_benchmarks(app, args.page_size, args.iterations * 20)
+    }
+    config = {'db': args.db, 'rows': len(rows), 'iterations': args.iterations,
+              'page_size': args.page_size, 'level': args.level}
+    common.write_results('serialization', config, results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
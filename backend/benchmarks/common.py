@@ -0,0 +1,105 @@
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def configure(db=None, models='stub'):
+    # Must run before `import app`: points the app at the benchmark database and keeps it
+    # from loading Hugging Face checkpoints unless real or tiny models were asked for
+    if db:
+        os.environ['DATABASE_FILE'] = os.path.abspath(db)
+    os.environ.setdefault('MODEL_LOAD_MODE', 'off' if models == 'stub' else 'eager')
+
+
+def load_app(models='stub', delay_ms=0.0):
+    import app
+
+    if models == 'stub':
+        import stub_models
+        stub_models.install(app, delay_ms=delay_ms)
+    elif not app.models_ready():
+        raise SystemExit("Models failed to load; set SENTIMENT_MODEL_NAME/SARCASM_MODEL_NAME to tiny local checkpoints")
+    return app
+
+
+def add_model_arguments(parser):
+    parser.add_argument('--models', choices=['stub', 'hf'], default='stub',
+                        help="'stub' uses in-process stub classifiers; 'hf' loads SENTIMENT_MODEL_NAME/SARCASM_MODEL_NAME")
+    parser.add_argument('--stub-delay-ms', type=float, default=0.0,
+                        help='Simulated forward-pass cost per batch for stub models')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed=None):
+    # Latencies in seconds; reported in milliseconds
+    summary = {
+        'count': len(latencies),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3)
+    }
+    if elapsed:
+        summary['throughput_per_s'] = round(len(latencies) / elapsed, 2)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    try:
+        import torch
+        torch_version = torch.__version__
+    except ImportError:
+        torch_version = None
+
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'torch': torch_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def write_results(benchmark, config, results, output=None):
+    report = {
+        'benchmark': benchmark,
+        'metadata': metadata(),
+        'config': config,
+        'results': results
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'{benchmark}-{stamp}.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+    return output
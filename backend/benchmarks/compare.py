@@ -0,0 +1,76 @@
+import argparse
+import json
+import sys
+
+# Lower is better for latencies; higher is better for throughput
+METRICS = {
+    'p50_ms': 'lower',
+    'p95_ms': 'lower',
+    'p99_ms': 'lower',
+    'mean_ms': 'lower',
+    'throughput_per_s': 'higher',
+}
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def flatten(results, prefix=''):
+    # Yields (case, summary) for every dict holding benchmark metrics, however deeply nested
+    for name, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        case = f'{prefix}/{name}' if prefix else name
+        if any(metric in value for metric in METRICS):
+            yield case, value
+        yield from flatten(value, case)
+
+
+def compare(baseline, candidate, threshold, metrics):
+    rows = []
+    candidates = dict(flatten(candidate['results']))
+    for case, before in flatten(baseline['results']):
+        after = candidates.get(case)
+        if after is None:
+            continue
+        for metric in metrics:
+            if metric not in before or metric not in after or not before[metric]:
+                continue
+            change = (after[metric] - before[metric]) / before[metric] * 100
+            worse = change > threshold if METRICS[metric] == 'lower' else change < -threshold
+            rows.append((case, metric, before[metric], after[metric], change, worse))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files and flag regressions.')
+    parser.add_argument('baseline', help='Results JSON from the reference run')
+    parser.add_argument('candidate', help='Results JSON from the run under test')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent change that counts as a regression')
+    parser.add_argument('--metrics', default='p50_ms,p95_ms,p99_ms,throughput_per_s',
+                        help=f"Comma-separated metrics to compare ({', '.join(METRICS)})")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get('benchmark') != candidate.get('benchmark'):
+        print(f"Warning: comparing {baseline.get('benchmark')} against {candidate.get('benchmark')}", file=sys.stderr)
+    if baseline.get('config') != candidate.get('config'):
+        print("Warning: the two runs used different configurations", file=sys.stderr)
+
+    metrics = [metric for metric in args.metrics.split(',') if metric in METRICS]
+    rows = compare(baseline, candidate, args.threshold, metrics)
+    width = max((len(case) for case, *_ in rows), default=10)
+    print(f"{'case':<{width}}  {'metric':<16} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for case, metric, before, after, change, worse in rows:
+        flag = '  REGRESSION' if worse else ''
+        print(f"{case:<{width}}  {metric:<16} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%{flag}")
+
+    regressions = sum(1 for *_, worse in rows if worse)
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import argparse
+import datetime
+import logging
+import random
+import sys
+import time
+
+import numpy as np
+
+import common
+import rescoring  # importable once common has put backend/ on sys.path
+
+logger = logging.getLogger('generate_reviews')
+
+LANGUAGES = ['English'] * 12 + ['Hindi', 'Bengali', 'Tamil', 'Telugu', 'Marathi', 'Italian',
+                                'Portuguese', 'Dutch', 'Polish', 'Chinese', 'Japanese']
+PRODUCTS = ['blender', 'headphones', 'laptop', 'phone case', 'coffee maker', 'backpack', 'monitor',
+            'keyboard', 'vacuum', 'kettle', 'charger', 'router', 'camera', 'desk lamp', 'water bottle']
+OPENERS = {
+    'positive': ['Absolutely love this {p}.', 'Great {p}, works exactly as described.',
+                 'Best {p} I have owned.', 'Really happy with this {p}.'],
+    'neutral': ['The {p} is okay.', 'It is an average {p}.', 'This {p} does the job.',
+                'Nothing special about this {p}.'],
+    'negative': ['Terrible {p}, would not recommend.', 'The {p} broke after a week.',
+                 'Very disappointed with this {p}.', 'Do not buy this {p}.']
+}
+DETAILS = ['Shipping was fast.', 'Delivery took three weeks.', 'Customer service never replied.',
+           'The battery lasts all day.', 'Build quality feels cheap.', 'Setup took five minutes.',
+           'The instructions were confusing.', 'Price is fair for what you get.', 'It is quite noisy.',
+           'Looks great on my desk.', 'Returned it for a refund.', 'Oh great, another one that stopped working.']
+SENTIMENT_WEIGHTS = {'positive': 0.45, 'neutral': 0.2, 'negative': 0.35}
+STARS = {'positive': (4, 5), 'neutral': (2, 4), 'negative': (1, 2)}
+
+
+def model_outputs(sentiment, text, rng):
+    # Plausible raw outputs: a softmax leaning towards the sentiment, and a sarcasm score
+    # that is missing (cascade skipped) for a third of the reviews
+    weights = [rng.uniform(0.0, 0.3) for _ in rescoring.SENTIMENT_LABELS]
+    weights[rescoring.SENTIMENT_LABELS.index(sentiment)] += rng.uniform(0.3, 1.5)
+    probs = [weight / sum(weights) for weight in weights]
+    sarcasm = None if rng.random() < 0.33 else round(rng.betavariate(1, 4), 4)
+    return rescoring.pack_probs(probs), sarcasm, int(rescoring.has_negation(text.lower()))
+
+
+def label_chunk(chunk):
+    # Labels and scores come from the stored outputs, as the analysis pipeline would produce them
+    labels, scores = rescoring.relabel(
+        rescoring.unpack_probs([row[3] for row in chunk]),
+        np.array([bool(row[5]) for row in chunk]),
+        np.array([row[4] for row in chunk], dtype=np.float64)
+    )
+    return [
+        (row[0], rescoring.LABELS[label], float(score)) + row[3:]
+        for row, label, score in zip(chunk, labels, scores)
+    ]
+
+
+def make_rows(count, rng, start, span_seconds):
+    sentiments = list(SENTIMENT_WEIGHTS)
+    weights = list(SENTIMENT_WEIGHTS.values())
+    for _ in range(count):
+        sentiment = rng.choices(sentiments, weights)[0]
+        product = rng.choice(PRODUCTS)
+        text = ' '.join([rng.choice(OPENERS[sentiment]).format(p=product)] + rng.sample(DETAILS, rng.randint(0, 3)))
+        created = start + datetime.timedelta(seconds=rng.randrange(span_seconds))
+        yield (
+            text,
+            sentiment,
+            None,  # sentiment and score are replaced by label_chunk()
+            *model_outputs(sentiment, text, rng),
+            rng.randint(*STARS[sentiment]),
+            rng.choice(LANGUAGES),
+            f'user{rng.randrange(50000)}',
+            int(rng.expovariate(0.3)),
+            created.strftime('%Y-%m-%d %H:%M:%S')
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fill a reviews database with synthetic reviews for benchmarking.')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows to insert, e.g. 10000, 100000 or 1000000')
+    parser.add_argument('--db', default='bench_reviews.db', help='SQLite database to fill (created if missing)')
+    parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many past days')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed, so runs are reproducible')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per transaction')
+    parser.add_argument('--truncate', action='store_true', help='Delete existing reviews first')
+    args = parser.parse_args(argv)
+
+    common.configure(db=args.db)
+    import app  # creates the schema, indexes and triggers
+    import db
+
+    if args.truncate:
+        with db.transaction(app.DATABASE_FILE) as conn:
+            conn.execute('DELETE FROM reviews')
+
+    rng = random.Random(args.seed)
+    start = datetime.datetime.now() - datetime.timedelta(days=args.days)
+    rows = make_rows(args.rows, rng, start, args.days * 86400)
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < args.rows:
+        chunk = label_chunk([row for _, row in zip(range(args.chunk_size), rows)])
+        with db.transaction(app.DATABASE_FILE) as conn:
+            conn.executemany(
+                '''INSERT INTO reviews (text, sentiment, sentiment_score, sentiment_probs, sarcasm_score,
+                                        has_negation, star_rating, language, username, helpful_count, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                chunk
+            )
+        inserted += len(chunk)
+        logger.info(f"Inserted {inserted}/{args.rows} rows")
+
+    conn = db.get_connection(app.DATABASE_FILE)
+    conn.execute('ANALYZE')
+    total = conn.execute('SELECT COUNT(*) FROM reviews').fetchone()[0]
+    logger.info(f"{args.db}: {total} reviews ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import argparse
+import collections
+import random
+import sys
+import threading
+import time
+
+import requests
+
+import common
+from microbench import REVIEW_QUERIES, SAMPLE_TEXTS
+
+# Each scenario is a list of (weight, request builder); a builder returns (method, path, kwargs)
+SCENARIOS = {
+    'analyze': [
+        (1, lambda rng: ('POST', '/api/analyze', {'json': {'text': rng.choice(SAMPLE_TEXTS)}})),
+    ],
+    'batch': [
+        (1, lambda rng: ('POST', '/api/analyze/batch', {'json': {'texts': rng.sample(SAMPLE_TEXTS, 4)}})),
+    ],
+    'reviews': [
+        (1, lambda rng: ('GET', '/api/reviews', {'params': rng.choice(list(REVIEW_QUERIES.values()))})),
+    ],
+    'stats': [
+        (1, lambda rng: ('GET', '/api/stats', {})),
+    ],
+    'mixed': [
+        (2, lambda rng: ('POST', '/api/analyze', {'json': {'text': rng.choice(SAMPLE_TEXTS)}})),
+        (5, lambda rng: ('GET', '/api/reviews', {'params': rng.choice(list(REVIEW_QUERIES.values()))})),
+        (3, lambda rng: ('GET', '/api/stats', {})),
+    ],
+}
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = collections.defaultdict(list)
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+
+    def record(self, name, latency, status=None, error=None):
+        with self._lock:
+            self.latencies[name].append(latency)
+            if status is not None:
+                self.statuses[str(status)] += 1
+            if error is not None:
+                self.errors[error] += 1
+
+
+def worker(base_url, scenario, deadline, remaining, recorder, seed, timeout):
+    rng = random.Random(seed)
+    builders = [builder for _, builder in scenario]
+    weights = [weight for weight, _ in scenario]
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        if remaining is not None:
+            with remaining['lock']:
+                if remaining['count'] <= 0:
+                    return
+                remaining['count'] -= 1
+
+        method, path, kwargs = rng.choices(builders, weights)[0](rng)
+        name = f'{method} {path}'
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, timeout=timeout, **kwargs)
+            latency = time.perf_counter() - started
+            error = f'HTTP {response.status_code}' if response.status_code >= 400 else None
+            recorder.record(name, latency, status=response.status_code, error=error)
+        except requests.RequestException as e:
+            recorder.record(name, time.perf_counter() - started, error=type(e).__name__)
+
+
+def run(args):
+    scenario = SCENARIOS[args.scenario]
+    recorder = Recorder()
+    remaining = {'count': args.requests, 'lock': threading.Lock()} if args.requests else None
+    deadline = time.monotonic() + (args.duration if not args.requests else float('inf'))
+
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(args.url.rstrip('/'), scenario, deadline, remaining, recorder, args.seed + i, args.timeout),
+            daemon=True
+        )
+        for i in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    results = {'overall': common.summarize(all_latencies, elapsed)}
+    for name, latencies in sorted(recorder.latencies.items()):
+        results[name] = common.summarize(latencies, elapsed)
+    results['overall']['elapsed_s'] = round(elapsed, 2)
+    results['overall']['errors'] = sum(recorder.errors.values())
+    results['statuses'] = dict(recorder.statuses)
+    results['errors'] = dict(recorder.errors)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Concurrent HTTP load generator reporting latency percentiles and throughput.'
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of a running API (see serve.py)')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (ignored with --requests)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests instead of a duration')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/loadgen-<time>.json)')
+    args = parser.parse_args(argv)
+
+    try:
+        requests.get(args.url.rstrip('/') + '/api/health/ready', timeout=args.timeout).raise_for_status()
+    except requests.RequestException as e:
+        print(f"API at {args.url} is not ready: {e}", file=sys.stderr)
+        return 1
+
+    results = run(args)
+    config = {
+        'url': args.url,
+        'scenario': args.scenario,
+        'concurrency': args.concurrency,
+        'duration_s': None if args.requests else args.duration,
+        'requests': args.requests
+    }
+    common.write_results('loadgen', config, results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
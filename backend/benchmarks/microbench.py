@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+
+import common
+
+SAMPLE_TEXTS = [
+    "Great product, works exactly as described.",
+    "Oh wonderful, it broke on the second day. Just what I needed.",
+    "It's fine. Nothing special, but it does the job and arrived on time.",
+    "Terrible customer service, I waited three weeks for a reply and never got a refund.",
+    "I have been using this blender every morning for six months now and it still crushes ice "
+    "without any trouble, although the lid has started to crack near the handle.",
+]
+
+REVIEW_QUERIES = {
+    'recent': {},
+    'sentiment': {'sentiment': 'negative'},
+    'rating': {'rating': 4},
+    'language': {'language': 'Hindi'},
+    'combined': {'sentiment': 'positive', 'language': 'English', 'rating': 5},
+    'search': {'search': 'battery'},
+    'search_recent': {'search': 'refund', 'sort': 'recent'},
+    'search_filtered': {'search': 'blender', 'sentiment': 'negative'},
+}
+
+
+def measure(fn, iterations, warmup=3):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return common.summarize(latencies, time.perf_counter() - started)
+
+
+def cycle(values):
+    state = {'i': 0}
+
+    def next_value():
+        value = values[state['i'] % len(values)]
+        state['i'] += 1
+        return value
+    return next_value
+
+
+def model_benchmarks(app, iterations, batch_size):
+    next_text = cycle(SAMPLE_TEXTS)
+    batch = (SAMPLE_TEXTS * (batch_size // len(SAMPLE_TEXTS) + 1))[:batch_size]
+    return {
+        'analyze_sentiment': measure(lambda: app.analyze_sentiment(next_text()), iterations),
+        'detect_sarcasm': measure(lambda: app.detect_sarcasm(next_text()), iterations),
+        f'analyze_sentiment_batch[{batch_size}]': measure(lambda: app.analyze_sentiment_batch(batch), max(1, iterations // 10)),
+        f'detect_sarcasm_batch[{batch_size}]': measure(lambda: app.detect_sarcasm_batch(batch), max(1, iterations // 10)),
+    }
+
+
+def database_benchmarks(app, iterations, page_size):
+    client = app.app.test_client()
+
+    def get_reviews(params):
+        def run():
+            response = client.get('/api/reviews', query_string={'limit': page_size, **params})
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/reviews {params} returned {response.status_code}")
+        return run
+
+    results = {'get_review_stats': measure(app.get_review_stats, iterations)}
+    for name, params in REVIEW_QUERIES.items():
+        results[f'get_reviews[{name}]'] = measure(get_reviews(params), iterations)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Microbenchmarks for model inference and review queries.')
+    parser.add_argument('--db', default='bench_reviews.db', help='Database filled by generate_reviews.py')
+    parser.add_argument('--iterations', type=int, default=200, help='Calls per benchmark')
+    parser.add_argument('--batch-size', type=int, default=32, help='Texts per batched model call')
+    parser.add_argument('--page-size', type=int, default=50, help='limit passed to /api/reviews')
+    parser.add_argument('--only', choices=['models', 'database'], help='Run one group of benchmarks')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/microbench-<time>.json)')
+    common.add_model_arguments(parser)
+    args = parser.parse_args(argv)
+
+    common.configure(db=args.db, models=args.models)
+    app = common.load_app(args.models, args.stub_delay_ms)
+    row_count = app.db.get_connection(app.DATABASE_FILE).execute('SELECT COUNT(*) FROM reviews').fetchone()[0]
+
+    results = {}
+    if args.only != 'database':
+        results.update(model_benchmarks(app, args.iterations, args.batch_size))
+    if args.only != 'models':
+        results.update(database_benchmarks(app, args.iterations, args.page_size))
+
+    config = {
+        'db': args.db,
+        'rows': row_count,
+        'models': args.models,
+        'stub_delay_ms': args.stub_delay_ms,
+        'iterations': args.iterations,
+        'batch_size': args.batch_size,
+        'page_size': args.page_size,
+        'quantization': app.MODEL_QUANTIZATION,
+        'fulltext': app.fulltext_available
+    }
+    common.write_results('microbench', config, results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+
+import common
+
+# Both passes must run for every text
+os.environ['CASCADE'] = '0'
+
+import torch
+
+from microbench import SAMPLE_TEXTS
+
+
+def measure(run, texts, requests):
+    run(texts[0])  # warm-up
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        run(texts[i % len(texts)])
+        latencies.append(time.perf_counter() - started)
+    return common.summarize(latencies)
+
+
+# CPUs the process may use at startup; every configuration is pinned to a subset of these
+ORIGINAL_AFFINITY = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None
+
+
+def limit_cores(cores):
+    # Pin the process to the first `cores` startup CPUs where the platform allows it; returns them
+    if ORIGINAL_AFFINITY is None:
+        return None
+    pinned = ORIGINAL_AFFINITY[:cores]
+    os.sched_setaffinity(0, pinned)
+    return pinned
+
+
+def restore_cores():
+    if ORIGINAL_AFFINITY is not None:
+        os.sched_setaffinity(0, ORIGINAL_AFFINITY)
+
+
+def default_core_counts():
+    available = len(ORIGINAL_AFFINITY) if ORIGINAL_AFFINITY is not None else (os.cpu_count() or 1)
+    counts, cores = [], 1
+    while cores < available:
+        counts.append(cores)
+        cores *= 2
+    return counts + [available]
+
+
+def compare(app, cores, requests, texts):
+    threads = torch.get_num_threads()
+    pinned = limit_cores(cores)
+    try:
+        torch.set_num_threads(cores)
+        sequential = measure(lambda text: app.analyze_texts([text]), texts, requests)
+
+        pool = app.make_inference_pool(size=2)
+        try:
+            parallel = measure(
+                lambda text: app.run_models_parallel([text], pool, threads_per_model=max(1, cores // 2)),
+                texts, requests
+            )
+        finally:
+            pool.shutdown()
+    finally:
+        restore_cores()
+        torch.set_num_threads(threads)
+
+    return {
+        'pinned_cpus': pinned,
+        'sequential': sequential,
+        'parallel': parallel,
+        'speedup_p50': round(sequential['p50_ms'] / max(parallel['p50_ms'], 1e-9), 2)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare per-request latency of sequential vs concurrent sentiment/sarcasm passes.'
+    )
+    parser.add_argument('--cores', help='Comma-separated core counts to test (default: powers of two up to all cores)')
+    parser.add_argument('--requests', type=int, default=50, help='Single-text requests per configuration')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/parallel_models-<time>.json)')
+    common.add_model_arguments(parser)
+    args = parser.parse_args(argv)
+
+    common.configure(models=args.models)
+    app = common.load_app(args.models, args.stub_delay_ms)
+
+    core_counts = [int(c) for c in args.cores.split(',')] if args.cores else default_core_counts()
+    results = {f'cores={cores}': compare(app, cores, args.requests, SAMPLE_TEXTS) for cores in core_counts}
+    config = {
+        'models': args.models,
+        'device': str(app.device),
+        'quantization': app.MODEL_QUANTIZATION,
+        'requests': args.requests
+    }
+    common.write_results('parallel_models', config, results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
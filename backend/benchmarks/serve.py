@@ -0,0 +1,23 @@
+import argparse
+import sys
+
+import common
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the API against a benchmark database, offline, for loadgen.py.')
+    parser.add_argument('--db', default='bench_reviews.db', help='Database filled by generate_reviews.py')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    common.add_model_arguments(parser)
+    args = parser.parse_args(argv)
+
+    common.configure(db=args.db, models=args.models)
+    app = common.load_app(args.models, args.stub_delay_ms)
+    # Threaded development server: fine for relative comparisons between runs, not for absolute numbers
+    app.app.run(host=args.host, port=args.port, threaded=True, debug=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import time
+import types
+import zlib
+
+import torch
+from transformers import BatchEncoding
+
+# Offline stand-ins for the Hugging Face checkpoints. They honour the same call
+# signatures app.py uses (tokenizer(texts, return_tensors=..., truncation=...,
+# padding=..., max_length=...) and model(**inputs).logits), run a real (tiny) forward
+# pass so batching and padding costs still show up, and are deterministic.
+
+VOCAB_SIZE = 4096
+MAX_LENGTH = 512
+
+
+class StubTokenizer:
+    pad_token_id = 0
+
+    def __init__(self, vocab_size=VOCAB_SIZE, model_max_length=MAX_LENGTH):
+        self.vocab_size = vocab_size
+        self.model_max_length = model_max_length
+
+    def encode(self, text, truncation=False, max_length=None):
+        ids = [1 + zlib.crc32(word.encode('utf-8')) % (self.vocab_size - 1) for word in text.split()] or [1]
+        if truncation:
+            ids = ids[:max_length or self.model_max_length]
+        return ids
+
+    def __call__(self, texts, return_tensors=None, truncation=False, padding=False, max_length=None, **kwargs):
+        single = isinstance(texts, str)
+        encoded = [self.encode(text, truncation, max_length) for text in ([texts] if single else texts)]
+        if padding or return_tensors:
+            width = max(len(ids) for ids in encoded)
+            masks = [[1] * len(ids) + [0] * (width - len(ids)) for ids in encoded]
+            encoded = [ids + [self.pad_token_id] * (width - len(ids)) for ids in encoded]
+        else:
+            masks = [[1] * len(ids) for ids in encoded]
+        data = {'input_ids': encoded, 'attention_mask': masks}
+        if single and not return_tensors:
+            data = {key: value[0] for key, value in data.items()}
+        return BatchEncoding(data, tensor_type=return_tensors)
+
+
+class StubClassifier(torch.nn.Module):
+    # Mean-pooled embeddings plus a linear head: microseconds per text, but shaped like the real thing
+    def __init__(self, num_labels, name, hidden_size=64, vocab_size=VOCAB_SIZE, delay_ms=0.0, seed=0):
+        super().__init__()
+        generator = torch.Generator().manual_seed(seed)
+        self.embeddings = torch.nn.Embedding(vocab_size, hidden_size, padding_idx=0)
+        self.classifier = torch.nn.Linear(hidden_size, num_labels)
+        with torch.no_grad():
+            self.embeddings.weight.copy_(torch.randn(vocab_size, hidden_size, generator=generator))
+            self.embeddings.weight[0].zero_()
+            self.classifier.weight.copy_(torch.randn(num_labels, hidden_size, generator=generator) * 0.5)
+            self.classifier.bias.zero_()
+        self.delay = delay_ms / 1000
+        self.config = types.SimpleNamespace(
+            _name_or_path=name, _commit_hash='stub', num_labels=num_labels, hidden_size=hidden_size
+        )
+
+    def forward(self, input_ids, attention_mask=None, output_hidden_states=False, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        if attention_mask is None:
+            attention_mask = (input_ids != 0).long()
+        mask = attention_mask.unsqueeze(-1).float()
+        hidden = self.embeddings(input_ids) * mask
+        pooled = hidden.sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+        return types.SimpleNamespace(
+            logits=self.classifier(pooled),
+            hidden_states=(hidden,) if output_hidden_states else None
+        )
+
+
+def install(app, delay_ms=0.0):
+    # Replaces the app's models with stubs and marks them ready, as load_models() would
+    app.sentiment_tokenizer = StubTokenizer()
+    app.sentiment_model = StubClassifier(3, 'stub-sentiment', delay_ms=delay_ms, seed=1).eval()
+    app.sarcasm_tokenizer = StubTokenizer()
+    app.sarcasm_model = StubClassifier(2, 'stub-sarcasm', delay_ms=delay_ms, seed=2).eval()
+    app.result_cache.set_fingerprint(app.model_fingerprint())
+    app.prepare_embedding_index()
+    app.model_state = 'ready'
+    app.model_error = None
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text):
+    # Unicode-normalize and collapse whitespace so trivially different copies share a key
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def ensure_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            key TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_created ON analysis_cache (created_at)')
+
+
+def trim(conn, max_entries):
+    # Deletes the oldest persistent entries beyond max_entries; returns how many were deleted
+    excess = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0] - max(0, int(max_entries))
+    if excess <= 0:
+        return 0
+    return conn.execute(
+        'DELETE FROM analysis_cache WHERE key IN (SELECT key FROM analysis_cache ORDER BY created_at LIMIT ?)',
+        (excess,)
+    ).rowcount
+
+
+# Two-tier cache of analysis results keyed on sha256(fingerprint + normalized text).
+# The memory tier is a bounded LRU; the optional SQLite tier survives restarts and is
+# trimmed to the newest 90% of max_persistent_entries whenever writes take it past the cap.
+# The lock only guards the memory tier, so a slow disk never stalls in-memory lookups.
+# Changing the fingerprint (i.e. the loaded models) drops every entry made under the old one.
+class ResultCache:
+    def __init__(self, max_entries=10000, db_path=None, max_persistent_entries=100000):
+        self.max_entries = max(0, int(max_entries))
+        self.db_path = db_path
+        self.max_persistent_entries = max(1, int(max_persistent_entries))
+        self.fingerprint = ''
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._persistent_rows = 0  # estimate; replacements overcount until the next trim recounts
+        self._persistent_evictions = 0
+
+        if db_path:
+            with db.transaction(db_path) as conn:
+                ensure_schema(conn)
+                self._persistent_rows = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 or bool(self.db_path)
+
+    def key(self, text, namespace=''):
+        # namespace separates results of other models for the same text (e.g. per-language checkpoints)
+        prefix = f'{self.fingerprint}\0{namespace}' if namespace else self.fingerprint
+        return hashlib.sha256(f'{prefix}\0{normalize_text(text)}'.encode('utf-8')).hexdigest()
+
+    def set_fingerprint(self, fingerprint):
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            logger.info(f"Result cache fingerprint changed to {fingerprint}; invalidating entries")
+            self.fingerprint = fingerprint
+            self._entries.clear()
+        if self.db_path:
+            with db.transaction(self.db_path) as conn:
+                conn.execute('DELETE FROM analysis_cache WHERE fingerprint != ?', (fingerprint,))
+                rows = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+            with self._lock:
+                self._persistent_rows = rows
+
+    def get(self, text, namespace=''):
+        key = self.key(text, namespace)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return json.loads(value)
+            if not self.db_path:
+                self._misses += 1
+                return None
+
+        row = db.get_connection(self.db_path).execute(
+            'SELECT value FROM analysis_cache WHERE key = ?', (key,)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return None
+            self._persistent_hits += 1
+            self._remember(key, row[0])
+        return json.loads(row[0])
+
+    def put(self, text, value, namespace=''):
+        self.put_many([(text, value, namespace)])
+
+    def put_many(self, items):
+        # items are (text, value, namespace)
+        rows = [
+            (self.key(text, namespace), json.dumps(value, separators=(',', ':')))
+            for text, value, namespace in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            for key, encoded in rows:
+                self._remember(key, encoded)
+            if self.db_path:
+                self._persistent_rows += len(rows)
+                over_cap = self._persistent_rows > self.max_persistent_entries
+        if self.db_path:
+            now = time.time()
+            with db.transaction(self.db_path) as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO analysis_cache (key, fingerprint, value, created_at) VALUES (?, ?, ?, ?)',
+                    [(key, self.fingerprint, encoded, now) for key, encoded in rows]
+                )
+                if over_cap:
+                    # Down to 90% so the next writes do not trim again right away
+                    trimmed = trim(conn, self.max_persistent_entries * 9 // 10)
+                    remaining = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+            if over_cap:
+                with self._lock:
+                    self._persistent_rows = remaining
+                    self._persistent_evictions += trimmed
+
+    def _remember(self, key, encoded):
+        if self.max_entries == 0:
+            return
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._persistent_rows = 0
+        if self.db_path:
+            with db.transaction(self.db_path) as conn:
+                conn.execute('DELETE FROM analysis_cache')
+
+    def stats(self):
+        with self._lock:
+            lookups = self._memory_hits + self._persistent_hits + self._misses
+            hits = self._memory_hits + self._persistent_hits
+            return {
+                'enabled': self.enabled,
+                'fingerprint': self.fingerprint,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'persistent': bool(self.db_path),
+                'persistent_entries': self._persistent_rows,
+                'max_persistent_entries': self.max_persistent_entries,
+                'persistent_evictions': self._persistent_evictions,
+                'memory_hits': self._memory_hits,
+                'persistent_hits': self._persistent_hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0
+            }
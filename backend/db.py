@@ -0,0 +1,190 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 16384))
+MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+_local = threading.local()
+
+
+def connect(path):
+    # Autocommit mode: reads never hold a transaction open, writes use transaction() below
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    # WAL lets dashboard readers run alongside the analysis writer instead of blocking on it
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+def get_connection(path):
+    # One connection per (thread, database), reused across requests. Connections inherited
+    # through fork() are never touched by the child; it opens its own.
+    connections = getattr(_local, 'connections', None)
+    if connections is None or _local.pid != os.getpid():
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = connect(path)
+    return conn
+
+
+@contextmanager
+def transaction(path):
+    conn = get_connection(path)
+    if conn.in_transaction:
+        # Nested use joins the enclosing transaction
+        yield conn
+        return
+
+    # IMMEDIATE takes the write lock up front, so busy_timeout applies instead of a mid-transaction deadlock
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+def close_connections():
+    connections = getattr(_local, 'connections', None) or {}
+    for conn in connections.values():
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error closing database connection: {str(e)}")
+    connections.clear()
+
+
+# Write-behind buffer: producers enqueue rows and return immediately, a background
+# thread hands them to flush_batch in groups once max_batch rows are waiting or
+# flush_interval_ms has passed. The queue is bounded; put() blocks up to put_timeout
+# seconds and returns False if there is still no room so the caller can write inline.
+class WriteBehindBuffer:
+    _STOP = object()
+
+    def __init__(self, flush_batch, max_batch=256, flush_interval_ms=200, max_queue=10000,
+                 put_timeout=1.0, retries=3, name='write-behind'):
+        self.flush_batch = flush_batch
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = max(0.0, float(flush_interval_ms)) / 1000
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.name = name
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._enqueued = 0
+        self._flushed = 0
+        self._batches = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def put(self, item):
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch):
+        for attempt in range(1, self.retries + 1):
+            try:
+                self.flush_batch(batch)
+                with self._lock:
+                    self._flushed += len(batch)
+                    self._batches += 1
+                return
+            except Exception as e:
+                logger.error(f"{self.name}: flush of {len(batch)} rows failed (attempt {attempt}): {str(e)}")
+                time.sleep(0.1 * attempt)
+        with self._lock:
+            self._failed += len(batch)
+        logger.error(f"{self.name}: dropped {len(batch)} rows after {self.retries} attempts")
+
+    def flush(self):
+        # Blocks until everything enqueued so far has been written
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+            logger.info(f"{self.name}: flushed and stopped")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'max_batch': self.max_batch,
+                'flush_interval_ms': self.flush_interval * 1000,
+                'enqueued': self._enqueued,
+                'flushed': self._flushed,
+                'batches': self._batches,
+                'failed': self._failed,
+                'rejected': self._rejected
+            }
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DTYPE = np.float16
+SEARCH_CHUNK_ROWS = 65536
+
+
+def index_path(db_path):
+    # reviews.db -> reviews.embeddings.f16
+    return os.path.splitext(db_path)[0] + '.embeddings.f16'
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+# Unit-length review embeddings in a flat float16 file, one row per reviews.id (row 0 and
+# ids without an embedding are all zeros). The file only ever grows, under an exclusive
+# flock, so several processes can append to it; readers remap when it grows or is replaced
+# by a rebuild. Dimension and model name live in a JSON sidecar.
+class EmbeddingIndex:
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = path + '.json'
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._mapped = None  # (inode, size) of the mapped file
+        self._meta = self._read_meta()
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def dim(self):
+        return self._meta['dim'] if self._meta else None
+
+    @property
+    def model(self):
+        return self._meta.get('model') if self._meta else None
+
+    def ensure(self, dim, model):
+        # Creates the index for this model; returns False if it holds another model's vectors
+        with self._lock:
+            self._meta = self._read_meta() or self._meta
+            if self._meta is None:
+                self._meta = {'dim': int(dim), 'model': model}
+                with open(self.meta_path, 'w') as f:
+                    json.dump(self._meta, f)
+                open(self.path, 'ab').close()
+                return True
+            if self._meta['dim'] != dim or self._meta.get('model') != model:
+                logger.warning(
+                    f"Embedding index {self.path} was built for {self._meta.get('model')} "
+                    f"(dim {self._meta['dim']}); run 'python manage.py embeddings rebuild'"
+                )
+                return False
+            return True
+
+    def _row_bytes(self):
+        return self.dim * np.dtype(DTYPE).itemsize
+
+    def _map(self):
+        # Remap when the file has grown or been swapped out by a rebuild
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._matrix, self._mapped = None, None
+            return None
+        if self._mapped != (stat.st_ino, stat.st_size):
+            if self._mapped is None or self._mapped[0] != stat.st_ino:
+                self._meta = self._read_meta() or self._meta
+            rows = stat.st_size // self._row_bytes()
+            self._matrix = np.memmap(self.path, dtype=DTYPE, mode='r', shape=(rows, self.dim)) if rows else None
+            self._mapped = (stat.st_ino, stat.st_size)
+        return self._matrix
+
+    def put(self, ids, vectors):
+        if not len(ids) or self.dim is None:
+            return
+        vectors = normalize(vectors).astype(DTYPE)
+        ids = np.asarray(ids, dtype=np.int64)
+        row_bytes = self._row_bytes()
+        with self._lock, open(self.path, 'r+b') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                needed = (int(ids.max()) + 1) * row_bytes
+                if os.fstat(f.fileno()).st_size < needed:
+                    f.truncate(needed)
+                # Consecutive ids (the common case: one insert batch) are a single write
+                if len(ids) == int(ids[-1] - ids[0]) + 1 and np.all(np.diff(ids) == 1):
+                    f.seek(int(ids[0]) * row_bytes)
+                    f.write(vectors.tobytes())
+                else:
+                    for review_id, vector in zip(ids, vectors):
+                        f.seek(int(review_id) * row_bytes)
+                        f.write(vector.tobytes())
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get(self, review_id):
+        with self._lock:
+            matrix = self._map() if self.dim else None
+        if matrix is None or review_id >= len(matrix):
+            return None
+        vector = np.asarray(matrix[review_id], dtype=np.float32)
+        return vector if vector.any() else None
+
+    def similar(self, review_id, k=10, min_score=None):
+        # Cosine top-k over every stored row; vectors are unit length so this is a dot product.
+        # Scans in chunks to bound the float32 working set; returns [(id, score)] best first.
+        query = self.get(review_id)
+        if query is None:
+            return None
+        with self._lock:
+            matrix = self._map()
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SEARCH_CHUNK_ROWS):
+            chunk = np.asarray(matrix[start:start + SEARCH_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + len(chunk)] = chunk @ query
+        # Rows without an embedding score exactly 0; exclude them and the query itself
+        scores[review_id] = -np.inf
+        scores[scores == 0] = -np.inf
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (int(i), round(float(scores[i]), 4)) for i in top
+            if np.isfinite(scores[i]) and (min_score is None or scores[i] >= min_score)
+        ]
+
+    def stats(self):
+        with self._lock:
+            matrix = self._map() if self.dim else None
+        return {
+            'path': self.path,
+            'model': self.model,
+            'dim': self.dim,
+            'rows': 0 if matrix is None else len(matrix),
+            'bytes': 0 if matrix is None else matrix.nbytes
+        }
+
+
+def rebuild(db_path, path, embed_batch, model, chunk_size=1000):
+    # Recomputes every review's embedding into a fresh file, then swaps it in atomically.
+    # embed_batch(texts) returns an (n, dim) array. Reviews inserted while this runs are
+    # appended to the old file and lost with it, so run it while ingestion is paused.
+    tmp_path = path + '.rebuild'
+    for stale in (tmp_path, tmp_path + '.json'):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    index = None
+    cursor = db.connect(db_path).execute('SELECT id, text FROM reviews ORDER BY id')
+    total = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        vectors = np.asarray(embed_batch([text for _, text in rows]))
+        if index is None:
+            index = EmbeddingIndex(tmp_path)
+            index.ensure(vectors.shape[1], model)
+        index.put([review_id for review_id, _ in rows], vectors)
+        total += len(rows)
+        logger.info(f"Embedded {total} reviews")
+
+    if index is None:
+        logger.info("No reviews to embed")
+        return 0
+    os.replace(tmp_path + '.json', path + '.json')
+    os.replace(tmp_path, path)
+    return total
@@ -0,0 +1,183 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, snapshot, max_pending=16):
+        self.snapshot = snapshot
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def put(self, event, snapshot):
+        # A slow client does not grow its queue without bound. Deltas only carry the keys that
+        # changed, so rather than dropping one, a full queue is replaced by a snapshot of the
+        # current stats (which already includes this event); pending `reviews` row updates are
+        # dropped with the backlog. Returns False when that happened.
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        # Only the broadcaster thread puts, so the drained queue has room
+        self._queue.put_nowait(('snapshot', snapshot))
+        return False
+
+
+def stats_delta(old, new):
+    delta = {}
+    if old is None or old['total_reviews'] != new['total_reviews']:
+        delta['total_reviews'] = new['total_reviews']
+    old_distribution = old['sentiment_distribution'] if old else {}
+    new_distribution = new['sentiment_distribution']
+    changed = {
+        sentiment: new_distribution.get(sentiment, 0)
+        for sentiment in set(old_distribution) | set(new_distribution)
+        if old_distribution.get(sentiment, 0) != new_distribution.get(sentiment, 0)
+    }
+    if changed:
+        delta['sentiment_distribution'] = changed
+    return delta
+
+
+# Fans stats changes out to every SSE subscriber from a single background thread.
+# Writers call notify(); notifications arriving within coalesce_ms of each other
+# produce one stats query and one event, however many viewers are connected.
+# Commits made by other processes are picked up by polling data_version(), which
+# only reads a counter rather than touching the reviews table.
+class StatsBroadcaster:
+    def __init__(self, load_stats, data_version=None, coalesce_ms=250, poll_interval=1.0, name='stats-broadcaster'):
+        self.load_stats = load_stats
+        self.data_version = data_version
+        self.coalesce = max(0.0, float(coalesce_ms)) / 1000
+        self.poll_interval = poll_interval
+        self.name = name
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._review_updates = {}
+        self._snapshot = None
+        self._version = None
+        self._thread = None
+        self._queries = 0
+        self._events = 0
+        self._resyncs = 0
+
+    def subscribe(self):
+        self._ensure_started()
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.load_stats()
+            with self._lock:
+                self._queries += 1
+                self._snapshot = snapshot
+        subscription = Subscription(snapshot)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def notify(self, review_update=None):
+        with self._lock:
+            if review_update is not None:
+                self._review_updates.setdefault(review_update['id'], {}).update(review_update)
+        self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _refresh(self):
+        # Only called from the worker thread: data_version is per connection, so it must always
+        # be read on the same one. Reading it before the stats means a commit racing with the
+        # query is seen as a change on the next poll rather than lost.
+        version = self.data_version() if self.data_version else None
+        snapshot = self.load_stats()
+        with self._lock:
+            self._queries += 1
+            self._snapshot = snapshot
+            self._version = version
+        return snapshot
+
+    def _changed_elsewhere(self):
+        if self.data_version is None:
+            return False
+        try:
+            return self.data_version() != self._version
+        except Exception as e:
+            logger.warning(f"{self.name}: data_version check failed: {str(e)}")
+            return False
+
+    def _run(self):
+        while True:
+            notified = self._wakeup.wait(timeout=self.poll_interval)
+            if not notified and not self._changed_elsewhere():
+                continue
+
+            # Let the rest of a burst arrive before querying
+            time.sleep(self.coalesce)
+            self._wakeup.clear()
+
+            with self._lock:
+                review_updates = list(self._review_updates.values())
+                self._review_updates.clear()
+                subscribers = list(self._subscribers)
+                previous = self._snapshot
+
+            if not subscribers:
+                # Nobody is watching; forget the snapshot so the next subscriber loads a fresh one
+                with self._lock:
+                    self._snapshot = None
+                try:
+                    self._version = self.data_version() if self.data_version else None
+                except Exception as e:
+                    logger.warning(f"{self.name}: data_version check failed: {str(e)}")
+                continue
+
+            try:
+                current = self._refresh()
+            except Exception as e:
+                logger.error(f"{self.name}: failed to load stats: {str(e)}")
+                continue
+
+            events = []
+            delta = stats_delta(previous, current)
+            if delta:
+                events.append(('delta', delta))
+            if review_updates:
+                events.append(('reviews', review_updates))
+
+            resyncs = 0
+            for event in events:
+                for subscription in subscribers:
+                    resyncs += not subscription.put(event, current)
+            with self._lock:
+                self._events += len(events)
+                self._resyncs += resyncs
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'stats_queries': self._queries,
+                'events_published': self._events,
+                'slow_subscriber_resyncs': self._resyncs
+            }
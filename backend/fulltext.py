@@ -0,0 +1,84 @@
+import logging
+import re
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# External-content FTS5 index over reviews.text. Triggers keep it in sync with the
+# reviews table, so it only stores the inverted index, not a second copy of the text.
+SCHEMA = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        text,
+        content='reviews',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF text ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+        INSERT INTO reviews_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    '''
+)
+
+TERM_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def ensure_schema(conn):
+    # Returns False when this SQLite build lacks FTS5; callers fall back to LIKE
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reviews_fts'"
+    ).fetchone()
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Full-text search unavailable, falling back to LIKE: {str(e)}")
+        return False
+    if not exists:
+        # Migration: index the rows that were stored before the FTS table existed
+        rebuild(conn)
+    return True
+
+
+def rebuild(conn):
+    conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('optimize')")
+
+
+def build_match_query(search):
+    # Turns free text into a safe FTS5 expression: "quoted phrases" stay phrases,
+    # word* is a prefix query, and every other word must match as a token (implicit AND).
+    # The last bare word is also treated as a prefix because the Reviews page searches
+    # as the user types.
+    terms = []
+    matches = list(TERM_PATTERN.finditer(search))
+    for position, match in enumerate(matches):
+        phrase, word = match.groups()
+        if phrase is not None:
+            tokens = WORD_PATTERN.findall(phrase)
+            if tokens:
+                terms.append('"' + ' '.join(tokens) + '"')
+            continue
+
+        tokens = WORD_PATTERN.findall(word)
+        if not tokens:
+            continue
+        prefix = word.endswith('*') or position == len(matches) - 1
+        terms.extend(f'"{token}"' for token in tokens[:-1])
+        terms.append(f'"{tokens[-1]}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
@@ -0,0 +1,24 @@
+import os
+
+# Production entry point: gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master with the models loaded but not warmed up, so
+# every worker shares the weights copy-on-write instead of loading its own copy. The
+# first forward pass (which starts torch's thread pools) happens in each worker after
+# fork, never in the master.
+os.environ.setdefault('MODEL_LOAD_MODE', 'preload')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+# Threaded workers so open /api/stats/stream connections don't starve other requests
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def post_fork(server, worker):
+    import app
+
+    if app.models_ready() and not app.warm_up_models():
+        server.log.error(f"Worker {worker.pid}: model warm-up failed")
@@ -0,0 +1,63 @@
+import hashlib
+
+# A counter that triggers bump on every insert, update and delete of reviews, so read
+# endpoints can derive an ETag from one primary-key lookup instead of hashing their
+# response. Unlike PRAGMA data_version it is shared by every connection and process.
+# It starts at a random value so a recreated database never reissues an old ETag.
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+    ''',
+    '''
+    INSERT INTO data_versions (name, version) VALUES ('reviews', abs(random() % 1000000000))
+    ON CONFLICT(name) DO NOTHING
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_version_insert AFTER INSERT ON reviews BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'reviews';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_version_update AFTER UPDATE ON reviews BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'reviews';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_version_delete AFTER DELETE ON reviews BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = 'reviews';
+    END
+    '''
+)
+
+
+def ensure_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+def read_version(conn, name='reviews'):
+    row = conn.execute('SELECT version FROM data_versions WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def make_etag(*parts):
+    # Weak: equivalent JSON whatever the serializer; callers add the content encoding to parts
+    digest = hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
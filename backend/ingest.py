@@ -0,0 +1,177 @@
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+import db
+import embeddings
+import model_registry
+
+logger = logging.getLogger('ingest')
+
+# Imported by main() once DATABASE_FILE points at --db: importing app initializes the database
+app = None
+
+INSERT_REVIEW_SQL = '''
+    INSERT INTO reviews (text, sentiment, sentiment_score, sentiment_probs, sarcasm_score, has_negation,
+                         star_rating, language, username, helpful_count, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+'''
+
+
+def read_records(path, fmt):
+    # Streams one record at a time so memory stays flat regardless of file size
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size):
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ensure_checkpoint_table(path):
+    with db.transaction(path) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                source TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+
+def load_checkpoint(path, source):
+    row = db.get_connection(path).execute('SELECT offset FROM ingest_checkpoints WHERE source = ?', (source,)).fetchone()
+    return row[0] if row else 0
+
+
+def as_int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def score_chunk(records, args):
+    # Records without text are skipped but still count towards the committed offset
+    records = [r for r in records if isinstance(r.get(args.text_field), str) and r[args.text_field].strip()]
+    texts = [r[args.text_field].strip() for r in records]
+    if not texts:
+        return [], []
+
+    languages = [record.get('language') for record in records]
+    scored = app.analyze_texts(texts, batch_size=args.batch_size, languages=languages, wait_for_models=True)
+
+    rows = []
+    vectors = []
+    for record, text, (sentiment_result, sarcasm_score, embedding) in zip(records, texts, scored):
+        adjusted = app.adjust_sentiment_for_sarcasm(sentiment_result.copy(), sarcasm_score)
+        vectors.append(embedding)
+        rows.append(app.review_row(text, adjusted, sarcasm_score)[:6] + (
+            as_int(record.get('star_rating')),
+            model_registry.language_name(record.get('language')),
+            record.get('username') or 'Anonymous',
+            as_int(record.get('helpful_count')),
+            record.get('created_at') or None
+        ))
+    return rows, vectors
+
+
+def open_embedding_index():
+    if not app.EMBEDDINGS:
+        return None
+    index = embeddings.EmbeddingIndex(app.EMBEDDINGS_FILE)
+    config = app.sentiment_model.config
+    return index if index.ensure(config.hidden_size, config._name_or_path) else None
+
+
+def ingest(args):
+    source = os.path.abspath(args.input)
+    fmt = args.format or ('jsonl' if source.endswith(('.jsonl', '.ndjson')) else 'csv')
+
+    ensure_checkpoint_table(args.db)
+    offset = 0 if args.restart else load_checkpoint(args.db, source)
+    if offset:
+        logger.info(f"Resuming {source} from record {offset}")
+
+    index = open_embedding_index()
+    records = itertools.islice(read_records(source, fmt), offset, None)
+    started = time.monotonic()
+    processed = stored = 0
+
+    for chunk in chunked(records, args.chunk_size):
+        rows, vectors = score_chunk(chunk, args)
+
+        # Rows and the new offset commit atomically, so a crash never double-inserts a chunk
+        with db.transaction(args.db) as conn:
+            conn.executemany(INSERT_REVIEW_SQL, rows)
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            conn.execute('''
+                INSERT INTO ingest_checkpoints (source, offset, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(source) DO UPDATE SET offset = excluded.offset, updated_at = excluded.updated_at
+            ''', (source, offset + len(chunk)))
+
+        pairs = [(review_id, vector) for review_id, vector in zip(range(last_id - len(rows) + 1, last_id + 1), vectors)
+                 if vector is not None]
+        if index is not None and pairs:
+            index.put([review_id for review_id, _ in pairs], [vector for _, vector in pairs])
+
+        offset += len(chunk)
+        processed += len(chunk)
+        stored += len(rows)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"offset={offset} stored={stored} "
+            f"throughput={processed / elapsed if elapsed else 0:.1f} records/s elapsed={elapsed:.1f}s"
+        )
+
+    logger.info(f"Finished {source}: {stored} reviews stored, {processed} records read this run")
+    return stored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score and bulk-load historical reviews into the reviews table.')
+    parser.add_argument('input', help='CSV or JSONL file with one review per record')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: inferred from extension)')
+    parser.add_argument('--text-field', default='text', help='Record field holding the review text')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_FILE', 'reviews.db'), help='SQLite database to write to')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Records per committed transaction')
+    parser.add_argument('--batch-size', type=int, help='Texts per model forward pass (default: BATCH_SIZE)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the saved checkpoint and start from the top')
+    args = parser.parse_args(argv)
+
+    global app
+    if os.path.abspath(args.db) != os.path.abspath(os.environ.get('DATABASE_FILE', 'reviews.db')):
+        # EMBEDDINGS_FILE names the configured database's index; another database gets its own
+        os.environ['EMBEDDINGS_FILE'] = embeddings.index_path(args.db)
+    os.environ['DATABASE_FILE'] = args.db
+    os.environ['SEED_SAMPLE_REVIEWS'] = '0'
+    # Offline tools need the models before doing anything; load them at import
+    os.environ.setdefault('MODEL_LOAD_MODE', 'eager')
+    import app
+
+    if app.sentiment_model is None or app.sarcasm_model is None:
+        logger.error("Models not loaded. Aborting.")
+        return 1
+
+    if args.batch_size is None:
+        args.batch_size = app.BATCH_SIZE
+    ingest(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
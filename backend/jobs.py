@@ -0,0 +1,332 @@
+import json
+import logging
+import threading
+import time
+
+import db
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {'low': 0, 'normal': 10, 'high': 20}
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        priority INTEGER NOT NULL DEFAULT 10,
+        total INTEGER NOT NULL,
+        processed INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        language TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS analysis_job_items (
+        job_id INTEGER NOT NULL REFERENCES analysis_jobs (id),
+        position INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        priority INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        claimed_at REAL,
+        result TEXT,
+        error TEXT,
+        PRIMARY KEY (job_id, position)
+    )
+    ''',
+    # Serves the claim query: highest priority first, then oldest job, then submission order
+    '''
+    CREATE INDEX IF NOT EXISTS idx_job_items_claim
+    ON analysis_job_items (status, priority DESC, job_id, position)
+    '''
+)
+
+
+def ensure_schema(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+def purge(conn, days):
+    # Deletes jobs that completed more than `days` days ago together with their items (and the
+    # submitted texts); the reviews they stored are kept. Returns (jobs, items) deleted
+    finished = "status = 'completed' AND finished_at < datetime('now', ?)"
+    cutoff = f'-{float(days)} days'
+    items = conn.execute(
+        f'DELETE FROM analysis_job_items WHERE job_id IN (SELECT id FROM analysis_jobs WHERE {finished})',
+        (cutoff,)
+    ).rowcount
+    jobs = conn.execute(f'DELETE FROM analysis_jobs WHERE {finished}', (cutoff,)).rowcount
+    return jobs, items
+
+
+def parse_priority(value):
+    # Accepts a name from PRIORITIES or an integer; higher runs first
+    if value is None:
+        return PRIORITIES['normal']
+    if isinstance(value, str) and value in PRIORITIES:
+        return PRIORITIES[value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"priority must be one of {', '.join(PRIORITIES)} or an integer")
+
+
+def public_result(result):
+    return {key: value for key, value in result.items() if not key.startswith('_')}
+
+
+def job_row_to_dict(row):
+    job_id, status, priority, total, processed, failed, language, error, created, started, finished = row
+    return {
+        'job_id': job_id,
+        'status': status,
+        'priority': priority,
+        'total': total,
+        'processed': processed,
+        'failed': failed,
+        'progress': round((processed + failed) / total, 4) if total else 1.0,
+        'language': language,
+        'error': error,
+        'created_at': created,
+        'started_at': started,
+        'finished_at': finished
+    }
+
+
+# Persistent job queue: submitted texts are rows in analysis_job_items, and worker threads
+# claim them in batches inside a BEGIN IMMEDIATE transaction, so several processes can
+# share one database. Claims are leases; items whose worker died (crash, restart) are
+# picked up again once lease_seconds have passed, unless they have used up max_attempts
+# (a text that keeps crashing or hanging its worker then fails). score_batch(texts,
+# languages) returns one result dict per text (languages come from each item's job), and
+# store_results(texts, results) runs inside the same transaction that marks the items
+# done; it may return a function, which is called once that transaction has committed.
+# Result keys starting with '_' reach store_results but are not saved with the item.
+class JobQueue:
+    def __init__(self, db_path, score_batch, store_results=None, ready=None, batch_size=64, workers=1,
+                 poll_interval=1.0, lease_seconds=300, max_attempts=3, name='analysis-jobs'):
+        self.db_path = db_path
+        self.score_batch = score_batch
+        self.store_results = store_results
+        self.ready = ready
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(0, int(workers))
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, int(max_attempts))
+        self.name = name
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._batches = 0
+        self._items = 0
+        self._failures = 0
+
+    def submit(self, texts, priority=PRIORITIES['normal'], language=None):
+        with db.transaction(self.db_path) as conn:
+            cursor = conn.execute(
+                'INSERT INTO analysis_jobs (priority, total, language) VALUES (?, ?, ?)',
+                (priority, len(texts), language)
+            )
+            job_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO analysis_job_items (job_id, position, text, priority) VALUES (?, ?, ?, ?)',
+                ((job_id, position, text, priority) for position, text in enumerate(texts))
+            )
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        row = db.get_connection(self.db_path).execute(
+            '''SELECT id, status, priority, total, processed, failed, language, error,
+                      created_at, started_at, finished_at
+               FROM analysis_jobs WHERE id = ?''',
+            (job_id,)
+        ).fetchone()
+        return job_row_to_dict(row) if row else None
+
+    def results(self, job_id, after=-1, limit=100):
+        rows = db.get_connection(self.db_path).execute(
+            '''SELECT position, text, status, result, error FROM analysis_job_items
+               WHERE job_id = ? AND position > ? AND status IN ('done', 'failed')
+               ORDER BY position LIMIT ?''',
+            (job_id, after, limit)
+        ).fetchall()
+        return [
+            {
+                'position': position,
+                'text': text,
+                'status': status,
+                **(json.loads(result) if result else {}),
+                **({'error': error} if error else {})
+            }
+            for position, text, status, result, error in rows
+        ]
+
+    def start(self):
+        # Started lazily (first submit, or once models are ready) so no thread exists before a fork
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def claim(self):
+        now = time.time()
+        with db.transaction(self.db_path) as conn:
+            # Expired leases belong to workers that died mid-batch; put them back in line, or
+            # fail them once every attempt has been used (attempts counts claims)
+            expired = conn.execute(
+                '''UPDATE analysis_job_items
+                   SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                       error = CASE WHEN attempts >= ? THEN 'Lease expired on every attempt' ELSE error END,
+                       claimed_at = NULL
+                   WHERE status = 'running' AND claimed_at < ?
+                   RETURNING job_id, status''',
+                (self.max_attempts, self.max_attempts, now - self.lease_seconds)
+            ).fetchall()
+            counts = {}
+            for job_id, status in expired:
+                if status == 'failed':
+                    counts.setdefault(job_id, [0, 0])[1] += 1
+            if counts:
+                failed = sum(failed for _, failed in counts.values())
+                logger.warning(f"{self.name}: {failed} item(s) failed, lease expired {self.max_attempts} times")
+                self._finish(conn, counts)
+            rows = conn.execute(
+                '''SELECT item.job_id, item.position, item.text, item.attempts, job.language
+                   FROM analysis_job_items AS item JOIN analysis_jobs AS job ON job.id = item.job_id
+                   WHERE item.status = 'pending'
+                   ORDER BY item.priority DESC, item.job_id, item.position LIMIT ?''',
+                (self.batch_size,)
+            ).fetchall()
+            if not rows:
+                return []
+            conn.executemany(
+                '''UPDATE analysis_job_items SET status = 'running', claimed_at = ?, attempts = attempts + 1
+                   WHERE job_id = ? AND position = ?''',
+                [(now, job_id, position) for job_id, position, _, _, _ in rows]
+            )
+            conn.executemany(
+                '''UPDATE analysis_jobs SET status = 'running', started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                   WHERE id = ? AND status = 'queued' ''',
+                [(job_id,) for job_id in {row[0] for row in rows}]
+            )
+        # claimed_at identifies this claim: a worker whose lease expired cannot overwrite a newer one
+        return [
+            (job_id, position, text, attempts, now, language)
+            for job_id, position, text, attempts, language in rows
+        ]
+
+    def _finish(self, conn, counts):
+        for job_id, (done, failed) in counts.items():
+            conn.execute(
+                '''UPDATE analysis_jobs SET processed = processed + ?, failed = failed + ?
+                   WHERE id = ?''',
+                (done, failed, job_id)
+            )
+            conn.execute(
+                '''UPDATE analysis_jobs SET status = 'completed', finished_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND processed + failed >= total''',
+                (job_id,)
+            )
+
+    def complete(self, rows, results):
+        counts = {}
+        stored_texts, stored_results = [], []
+        after_commit = None
+        with db.transaction(self.db_path) as conn:
+            for (job_id, position, text, _, claimed_at, _), result in zip(rows, results):
+                updated = conn.execute(
+                    '''UPDATE analysis_job_items SET status = 'done', result = ?, error = NULL, claimed_at = NULL
+                       WHERE job_id = ? AND position = ? AND status = 'running' AND claimed_at = ?''',
+                    (json.dumps(public_result(result)), job_id, position, claimed_at)
+                ).rowcount
+                if updated:
+                    counts.setdefault(job_id, [0, 0])[0] += 1
+                    stored_texts.append(text)
+                    stored_results.append(result)
+            if self.store_results and stored_texts:
+                after_commit = self.store_results(stored_texts, stored_results)
+            self._finish(conn, counts)
+        if after_commit is not None:
+            try:
+                after_commit()
+            except Exception as e:
+                # The items are done and stored; only the follow-up work is lost
+                logger.error(f"{self.name}: post-commit hook failed: {str(e)}")
+
+    def release(self, rows, error):
+        # Failed items go back to pending until they have used up max_attempts
+        counts = {}
+        with db.transaction(self.db_path) as conn:
+            for job_id, position, _, attempts, claimed_at, _ in rows:
+                status = 'failed' if attempts + 1 >= self.max_attempts else 'pending'
+                updated = conn.execute(
+                    '''UPDATE analysis_job_items SET status = ?, error = ?, claimed_at = NULL
+                       WHERE job_id = ? AND position = ? AND status = 'running' AND claimed_at = ?''',
+                    (status, error, job_id, position, claimed_at)
+                ).rowcount
+                if updated and status == 'failed':
+                    counts.setdefault(job_id, [0, 0])[1] += 1
+            self._finish(conn, counts)
+
+    def process_once(self):
+        # Claims and processes one batch; returns the number of items claimed
+        rows = self.claim()
+        if not rows:
+            return 0
+        try:
+            results = self.score_batch([row[2] for row in rows], [row[5] for row in rows])
+            self.complete(rows, results)
+            with self._lock:
+                self._batches += 1
+                self._items += len(rows)
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(rows)} items failed: {str(e)}")
+            with self._lock:
+                self._failures += 1
+            if len(rows) == 1:
+                self.release(rows, str(e))
+            else:
+                # Retry one by one so a single bad text cannot fail the rest of the batch
+                for row in rows:
+                    try:
+                        self.complete([row], self.score_batch([row[2]], [row[5]]))
+                        with self._lock:
+                            self._items += 1
+                    except Exception as item_error:
+                        self.release([row], str(item_error))
+        return len(rows)
+
+    def _run(self):
+        while True:
+            try:
+                if (self.ready is None or self.ready()) and self.process_once():
+                    continue
+            except Exception as e:
+                logger.error(f"{self.name}: worker error: {str(e)}")
+            self._wakeup.wait(timeout=self.poll_interval)
+            self._wakeup.clear()
+
+    def stats(self):
+        pending = dict(db.get_connection(self.db_path).execute(
+            "SELECT status, COUNT(*) FROM analysis_job_items WHERE status IN ('pending', 'running') GROUP BY status"
+        ).fetchall())
+        with self._lock:
+            return {
+                'workers': len([thread for thread in self._threads if thread.is_alive()]),
+                'batch_size': self.batch_size,
+                'pending_items': pending.get('pending', 0),
+                'running_items': pending.get('running', 0),
+                'batches': self._batches,
+                'items_processed': self._items,
+                'batch_failures': self._failures
+            }
@@ -0,0 +1,163 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cache
+import db
+import embeddings
+import fulltext
+import jobs
+import rescoring
+import review_stats
+import rollups
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('manage')
+
+
+def stats_command(args):
+    if args.action == 'verify':
+        found = review_stats.drift(db.get_connection(args.db))
+    else:
+        with db.transaction(args.db) as conn:
+            found = review_stats.rebuild(conn)
+
+    if not found:
+        logger.info("Review counters match the reviews table")
+        return 0
+
+    for sentiment, (stored, actual) in sorted(found.items()):
+        logger.warning(f"{sentiment!r}: counter={stored} actual={actual} drift={stored - actual:+d}")
+    # verify exits non-zero on drift so it can gate deploys; rebuild has already fixed it
+    return 1 if args.action == 'verify' else 0
+
+
+def rollups_command(args):
+    if args.action == 'verify':
+        found = rollups.drift(db.get_connection(args.db))
+    else:
+        with db.transaction(args.db) as conn:
+            found = rollups.rebuild(conn)
+
+    if not found:
+        logger.info("Review rollups match the reviews table")
+        return 0
+
+    for granularity, mismatched in sorted(found.items()):
+        logger.warning(f"{granularity} rollups: {mismatched} bucket(s) disagree with the reviews table")
+    return 1 if args.action == 'verify' else 0
+
+
+def search_command(args):
+    with db.transaction(args.db) as conn:
+        fulltext.rebuild(conn)
+    logger.info("Full-text index rebuilt")
+    return 0
+
+
+def cache_command(args):
+    # The persistent result cache lives in its own database (RESULT_CACHE_DB), not --db
+    with db.transaction(args.cache_db) as conn:
+        cache.ensure_schema(conn)
+        deleted = cache.trim(conn, args.max_entries)
+    logger.info(f"Trimmed {deleted} result cache entries from {args.cache_db} (cap {args.max_entries})")
+    return 0
+
+
+def jobs_command(args):
+    with db.transaction(args.db) as conn:
+        jobs.ensure_schema(conn)
+        purged_jobs, purged_items = jobs.purge(conn, args.days)
+    logger.info(f"Purged {purged_jobs} job(s) finished more than {args.days:g} days ago ({purged_items} items)")
+    return 0
+
+
+def rescore_command(args):
+    # Applies the current rescoring thresholds (env vars) to the stored model outputs
+    started = time.monotonic()
+    totals, transitions = rescoring.rescore(args.db, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    elapsed = time.monotonic() - started
+
+    for (old, new), count in transitions.most_common():
+        logger.info(f"{old!r} -> {new!r}: {count}")
+    verb = 'would change' if args.dry_run else 'changed'
+    logger.info(
+        f"Re-scored {totals['scanned']} reviews in {elapsed:.1f}s: {totals['changed']} {verb}, "
+        f"{totals['missing_outputs']} without stored model outputs"
+    )
+    if totals['missing_outputs']:
+        logger.warning("Reviews without stored outputs keep their labels until they are analyzed again")
+    return 0
+
+
+def embeddings_command(args):
+    # Needs the sentiment model, so the app (and its model loading) is only imported here
+    os.environ['DATABASE_FILE'] = args.db
+    os.environ.setdefault('MODEL_LOAD_MODE', 'eager')
+    import app
+
+    if not app.models_ready():
+        logger.error("Models not loaded. Aborting.")
+        return 1
+    config = app.sentiment_model.config
+    total = embeddings.rebuild(
+        args.db,
+        app.EMBEDDINGS_FILE,
+        lambda texts: app.embed_texts(texts, batch_size=args.batch_size),
+        config._name_or_path,
+        chunk_size=args.chunk_size
+    )
+    logger.info(f"Embedding index rebuilt: {total} reviews in {app.EMBEDDINGS_FILE}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintenance commands for the reviews database.')
+    parser.add_argument('--db', default='reviews.db', help='SQLite database to operate on')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stats = commands.add_parser('stats', help='Check or recompute the materialized review counters')
+    stats.add_argument('action', choices=['verify', 'rebuild'])
+    stats.set_defaults(handler=stats_command)
+
+    trends = commands.add_parser('rollups', help='Check or recompute the hourly/daily trend rollups')
+    trends.add_argument('action', choices=['verify', 'rebuild'])
+    trends.set_defaults(handler=rollups_command)
+
+    search = commands.add_parser('search', help='Maintain the FTS5 review search index')
+    search.add_argument('action', choices=['rebuild'])
+    search.set_defaults(handler=search_command)
+
+    cache_db = os.environ.get('RESULT_CACHE_DB')
+    results = commands.add_parser('cache', help='Delete the oldest persistent result cache entries beyond a cap')
+    results.add_argument('action', choices=['trim'])
+    results.add_argument('--cache-db', default=cache_db, required=not cache_db,
+                         help='Result cache database (default: RESULT_CACHE_DB)')
+    results.add_argument('--max-entries', type=int, default=int(os.environ.get('RESULT_CACHE_DB_MAX_ENTRIES', 100000)),
+                         help='Entries to keep (default: RESULT_CACHE_DB_MAX_ENTRIES)')
+    results.set_defaults(handler=cache_command)
+
+    queue = commands.add_parser('jobs', help='Delete finished background analysis jobs')
+    queue.add_argument('action', choices=['purge'])
+    queue.add_argument('--days', type=float, default=7, help='Keep jobs that finished within this many days')
+    queue.set_defaults(handler=jobs_command)
+
+    relabel = commands.add_parser('rescore', help='Re-label reviews from their stored model outputs')
+    relabel.add_argument('--chunk-size', type=int, default=50000, help='Reviews re-scored per transaction')
+    relabel.add_argument('--dry-run', action='store_true', help='Report the label changes without writing them')
+    relabel.set_defaults(handler=rescore_command)
+
+    vectors = commands.add_parser('embeddings', help='Recompute the similar-review embedding index')
+    vectors.add_argument('action', choices=['rebuild'])
+    vectors.add_argument('--chunk-size', type=int, default=1000, help='Reviews read per database fetch')
+    vectors.add_argument('--batch-size', type=int, default=32, help='Texts per model forward pass')
+    vectors.set_defaults(handler=embeddings_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
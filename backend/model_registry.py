@@ -0,0 +1,243 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Languages offered by /api/languages. Reviews store the name, API callers send the code.
+LANGUAGES = [
+    {'code': 'en', 'name': 'English'},
+    {'code': 'hi', 'name': 'Hindi'},
+    {'code': 'bn', 'name': 'Bengali'},
+    {'code': 'ta', 'name': 'Tamil'},
+    {'code': 'te', 'name': 'Telugu'},
+    {'code': 'mr', 'name': 'Marathi'},
+    {'code': 'gu', 'name': 'Gujarati'},
+    {'code': 'kn', 'name': 'Kannada'},
+    {'code': 'ml', 'name': 'Malayalam'},
+    {'code': 'pa', 'name': 'Punjabi'},
+    {'code': 'it', 'name': 'Italian'},
+    {'code': 'pt', 'name': 'Portuguese'},
+    {'code': 'nl', 'name': 'Dutch'},
+    {'code': 'pl', 'name': 'Polish'},
+    {'code': 'zh', 'name': 'Chinese'},
+    {'code': 'ja', 'name': 'Japanese'}
+]
+
+_CODES = {}
+for _language in LANGUAGES:
+    _CODES[_language['code']] = _language['code']
+    _CODES[_language['name'].lower()] = _language['code']
+
+
+def language_code(language):
+    # 'hi', 'HI', 'Hindi' -> 'hi'; None for anything unrecognized
+    if not isinstance(language, str):
+        return None
+    return _CODES.get(language.strip().lower())
+
+
+def language_name(language):
+    # Name stored on a review: 'hi', 'HI', 'Hindi' -> 'Hindi'; other strings are kept as
+    # given, and a missing language is the reviews table default, 'English'
+    if not isinstance(language, str) or not language.strip():
+        return 'English'
+    code = language_code(language)
+    if code is None:
+        return language.strip()
+    return next(entry['name'] for entry in LANGUAGES if entry['code'] == code)
+
+
+def parse_checkpoints(value):
+    # "hi=org/model-a,ta=org/model-b" -> {'hi': 'org/model-a', 'ta': 'org/model-b'}
+    checkpoints = {}
+    for entry in (value or '').split(','):
+        if '=' in entry:
+            language, checkpoint = entry.split('=', 1)
+            code = language_code(language) or language.strip().lower()
+            checkpoints[code] = checkpoint.strip()
+    return checkpoints
+
+
+def model_bytes(model):
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+# Sentiment classifiers for languages other than the default. Languages map to checkpoints
+# (several languages usually share one multilingual checkpoint, which is loaded once);
+# checkpoints load on first use and the least recently used ones are evicted while the
+# resident models exceed memory_budget bytes. Checkpoints of pinned languages are never
+# evicted. get() does not block on a load: a checkpoint that is not in memory is queued
+# for a background loader thread, and its languages are scored by the default model
+# (get() returns None) until it is ready. Languages without a checkpoint, and checkpoints
+# that failed to load within the last retry_seconds, also resolve to None.
+# loader(checkpoint) returns (tokenizer, model).
+class ModelRegistry:
+    def __init__(self, loader, checkpoints, memory_budget, pinned=(), retry_seconds=30, name='model-registry'):
+        self.loader = loader
+        self.checkpoints = dict(checkpoints)
+        self.memory_budget = max(0, int(memory_budget))
+        self.pinned = {self.checkpoints[code] for code in pinned if code in self.checkpoints}
+        self.retry_seconds = retry_seconds
+        self.name = name
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._resident = OrderedDict()  # checkpoint -> (tokenizer, model, bytes), least recently used first
+        self._failed_at = {}
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._loader_thread = None
+        self._fallbacks = 0
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+        self._load_failures = 0
+        self._load_seconds = 0.0
+
+    def checkpoint_for(self, language):
+        return self.checkpoints.get(language_code(language))
+
+    def resolve(self, language):
+        # The checkpoint that scores this language once it is resident, queueing its load if
+        # it is not; None for the default model (no checkpoint, or a recent load failure).
+        # Lets callers key cached results on the language's model before scoring anything.
+        checkpoint = self.checkpoint_for(language)
+        if checkpoint is None:
+            return None
+        with self._lock:
+            if checkpoint in self._resident:
+                return checkpoint
+            failed_at = self._failed_at.get(checkpoint)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+                return None
+            self._enqueue(checkpoint, language)
+        return checkpoint
+
+    def get(self, language, wait=False):
+        # Returns (checkpoint, tokenizer, model), or None to use the default model. With
+        # wait=True a missing checkpoint is loaded in the calling thread (offline tools).
+        checkpoint = self.checkpoint_for(language)
+        if checkpoint is None:
+            return None
+        with self._lock:
+            entry = self._resident.get(checkpoint)
+            if entry is not None:
+                self._resident.move_to_end(checkpoint)
+                self._hits += 1
+                return checkpoint, entry[0], entry[1]
+            failed_at = self._failed_at.get(checkpoint)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+                self._fallbacks += 1
+                return None
+            if not wait:
+                self._fallbacks += 1
+                self._enqueue(checkpoint, language)
+                return None
+            load_lock = self._load_locks.setdefault(checkpoint, threading.Lock())
+
+        # One loader per checkpoint; concurrent requests for it wait instead of loading twice
+        with load_lock:
+            with self._lock:
+                entry = self._resident.get(checkpoint)
+                if entry is not None:
+                    self._resident.move_to_end(checkpoint)
+                    self._hits += 1
+                    return checkpoint, entry[0], entry[1]
+            return self._load(checkpoint)
+
+    def preload(self, languages):
+        # Loads the checkpoints of these languages in the calling thread (e.g. pinned ones at startup)
+        for language in languages:
+            self.get(language, wait=True)
+
+    def _enqueue(self, checkpoint, language):
+        # Called with self._lock held
+        if checkpoint not in self._queued:
+            self._queued.add(checkpoint)
+            self._queue.put(checkpoint)
+            self._ensure_loader()
+            logger.info(f"{self.name}: {checkpoint} not loaded yet, scoring {language!r} with the default model")
+
+    def _ensure_loader(self):
+        # Called with self._lock held
+        if self._loader_thread is None or not self._loader_thread.is_alive():
+            self._loader_thread = threading.Thread(target=self._run_loader, name=f'{self.name}-loader', daemon=True)
+            self._loader_thread.start()
+
+    def _run_loader(self):
+        while True:
+            checkpoint = self._queue.get()
+            try:
+                language = next(code for code, name in self.checkpoints.items() if name == checkpoint)
+                self.get(language, wait=True)
+            finally:
+                with self._lock:
+                    self._queued.discard(checkpoint)
+
+    def _load(self, checkpoint):
+        logger.info(f"{self.name}: loading {checkpoint}")
+        started = time.monotonic()
+        try:
+            tokenizer, model = self.loader(checkpoint)
+        except Exception as e:
+            logger.error(f"{self.name}: failed to load {checkpoint}, using the default model: {str(e)}")
+            with self._lock:
+                self._load_failures += 1
+                self._failed_at[checkpoint] = time.monotonic()
+            return None
+
+        size = model_bytes(model)
+        with self._lock:
+            self._loads += 1
+            self._load_seconds += time.monotonic() - started
+            self._failed_at.pop(checkpoint, None)
+            self._evict(size)
+            self._resident[checkpoint] = (tokenizer, model, size)
+        return checkpoint, tokenizer, model
+
+    def _evict(self, incoming):
+        # Makes room for incoming bytes. Requests still using an evicted model keep their
+        # reference, so its memory is released when they finish.
+        used = sum(size for _, _, size in self._resident.values())
+        for checkpoint in list(self._resident):
+            if used + incoming <= self.memory_budget:
+                return
+            if checkpoint in self.pinned:
+                continue
+            _, _, size = self._resident.pop(checkpoint)
+            used -= size
+            self._evictions += 1
+            logger.info(f"{self.name}: evicted {checkpoint} ({size / 2 ** 20:.1f} MB)")
+        if used + incoming > self.memory_budget:
+            logger.warning(
+                f"{self.name}: resident models need {(used + incoming) / 2 ** 20:.0f} MB, "
+                f"over the {self.memory_budget / 2 ** 20:.0f} MB budget"
+            )
+
+    def stats(self):
+        with self._lock:
+            resident = [
+                {
+                    'checkpoint': checkpoint,
+                    'languages': sorted(code for code, name in self.checkpoints.items() if name == checkpoint),
+                    'mb': round(size / 2 ** 20, 1),
+                    'pinned': checkpoint in self.pinned
+                }
+                for checkpoint, (_, _, size) in reversed(self._resident.items())
+            ]
+            return {
+                'languages': dict(sorted(self.checkpoints.items())),
+                'memory_budget_mb': round(self.memory_budget / 2 ** 20, 1),
+                'resident_mb': round(sum(size for _, _, size in self._resident.values()) / 2 ** 20, 1),
+                'resident': resident,
+                'hits': self._hits,
+                'loads': self._loads,
+                'evictions': self._evictions,
+                'load_failures': self._load_failures,
+                'loading': sorted(self._queued),
+                'default_model_fallbacks': self._fallbacks,
+                'avg_load_seconds': round(self._load_seconds / self._loads, 3) if self._loads else 0.0
+            }
@@ -0,0 +1,135 @@
+import argparse
+import copy
+import io
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+# The reference run must be fp32; the int8 copies are made below
+os.environ['MODEL_QUANTIZATION'] = 'none'
+os.environ.setdefault('MODEL_LOAD_MODE', 'eager')
+
+import torch
+
+import app
+from ingest import read_records
+
+logger = logging.getLogger('quantization_parity')
+
+
+def model_size_mb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return round(buffer.tell() / (1024 * 1024), 2)
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def compare(records, args):
+    fp32 = (app.sentiment_model, app.sarcasm_model)
+    int8 = tuple(app.quantize_model(copy.deepcopy(model), mode='dynamic-int8') for model in fp32)
+    texts = [record[args.text_field].strip() for record in records]
+    gold = [str(record.get('label', '')).lower() or None for record in records]
+
+    outputs = {}
+    timings = {}
+    for name, (sentiment_model, sarcasm_model) in (('fp32', fp32), ('int8', int8)):
+        sentiment, sentiment_seconds = timed(
+            app.analyze_sentiment_batch, texts, model=sentiment_model, batch_size=args.batch_size
+        )
+        sarcasm, sarcasm_seconds = timed(
+            app.detect_sarcasm_batch, texts, model=sarcasm_model, batch_size=args.batch_size
+        )
+        final = [
+            app.adjust_sentiment_for_sarcasm(result.copy(), score)['label']
+            for result, score in zip(sentiment, sarcasm)
+        ]
+        outputs[name] = (sentiment, sarcasm, final)
+        timings[name] = {
+            'sentiment_ms_per_text': round(sentiment_seconds * 1000 / len(texts), 3),
+            'sarcasm_ms_per_text': round(sarcasm_seconds * 1000 / len(texts), 3),
+            'sentiment_model_mb': model_size_mb(sentiment_model),
+            'sarcasm_model_mb': model_size_mb(sarcasm_model)
+        }
+
+    (sentiment32, sarcasm32, final32), (sentiment8, sarcasm8, final8) = outputs['fp32'], outputs['int8']
+    distribution_diffs = [
+        abs(a['full_distribution'][label] - b['full_distribution'][label]) / 100
+        for a, b in zip(sentiment32, sentiment8) for label in app.sentiment_labels
+    ]
+    labelled = [i for i, label in enumerate(gold) if label in app.sentiment_labels]
+
+    report = {
+        'samples': len(texts),
+        'labelled_samples': len(labelled),
+        'sentiment': {
+            'label_agreement': round(mean([a['label'] == b['label'] for a, b in zip(sentiment32, sentiment8)]), 4),
+            'mean_abs_score_diff': round(mean([abs(a['score'] - b['score']) for a, b in zip(sentiment32, sentiment8)]), 5),
+            'max_abs_probability_diff': round(max(distribution_diffs, default=0.0), 5)
+        },
+        'sarcasm': {
+            'decision_agreement': round(mean([(a > 0.5) == (b > 0.5) for a, b in zip(sarcasm32, sarcasm8)]), 4),
+            'mean_abs_score_diff': round(mean([abs(a - b) for a, b in zip(sarcasm32, sarcasm8)]), 5),
+            'max_abs_score_diff': round(max((abs(a - b) for a, b in zip(sarcasm32, sarcasm8)), default=0.0), 5)
+        },
+        'final_label_agreement': round(mean([a == b for a, b in zip(final32, final8)]), 4),
+        'timings': timings,
+        'speedup': {
+            'sentiment': round(timings['fp32']['sentiment_ms_per_text'] / max(timings['int8']['sentiment_ms_per_text'], 1e-9), 2),
+            'sarcasm': round(timings['fp32']['sarcasm_ms_per_text'] / max(timings['int8']['sarcasm_ms_per_text'], 1e-9), 2)
+        }
+    }
+    if labelled:
+        report['sentiment']['accuracy'] = {
+            'fp32': round(mean([sentiment32[i]['label'] == gold[i] for i in labelled]), 4),
+            'int8': round(mean([sentiment8[i]['label'] == gold[i] for i in labelled]), 4)
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare dynamic int8 quantized models against fp32 on a labelled review sample.'
+    )
+    parser.add_argument('sample', help='CSV or JSONL with a text field and an optional label (negative/neutral/positive)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: inferred from extension)')
+    parser.add_argument('--text-field', default='text', help='Record field holding the review text')
+    parser.add_argument('--limit', type=int, default=1000, help='Maximum number of samples to score')
+    parser.add_argument('--batch-size', type=int, default=app.BATCH_SIZE, help='Texts per model forward pass')
+    parser.add_argument('--output', help='Write the JSON report to this file as well as stdout')
+    args = parser.parse_args(argv)
+
+    if app.sentiment_model is None or app.sarcasm_model is None:
+        logger.error("Models not loaded. Aborting.")
+        return 1
+
+    fmt = args.format or ('jsonl' if args.sample.endswith(('.jsonl', '.ndjson')) else 'csv')
+    records = [
+        record for record in itertools.islice(read_records(args.sample, fmt), args.limit)
+        if isinstance(record.get(args.text_field), str) and record[args.text_field].strip()
+    ]
+    if not records:
+        logger.error("No usable samples found")
+        return 1
+
+    report = compare(records, args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import logging
+import os
+from collections import Counter
+
+import numpy as np
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Post-processing applied to the raw model outputs. build_sentiment_result and
+# adjust_sentiment_for_sarcasm in app.py apply these rules to one result at a time;
+# relabel() applies them to arrays of stored outputs, so a changed threshold can be
+# re-applied to every review without loading either model (`manage.py rescore`).
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+SARCASTIC_POSITIVE = 'sarcastically positive (actually negative)'
+POTENTIALLY_NEGATIVE = 'potentially negative'
+LABELS = SENTIMENT_LABELS + (SARCASTIC_POSITIVE, POTENTIALLY_NEGATIVE)
+NEGATIVE, NEUTRAL, POSITIVE, SARCASTIC, HEDGED = range(len(LABELS))
+
+NEGATION_WORDS = ('never', 'no', 'nothing', 'nowhere', 'none', 'nobody', 'neither', 'nor')
+NEGATIVE_BOOST = float(os.environ.get('NEGATIVE_BOOST', 1.15))  # negative top class
+NEGATION_BOOST = float(os.environ.get('NEGATION_BOOST', 1.2))  # ... when the text has a negation word
+SARCASM_THRESHOLD = float(os.environ.get('SARCASM_THRESHOLD', 0.6))
+NEUTRAL_SARCASM_BOOST = 0.25
+WEAK_NEGATIVE_BELOW = float(os.environ.get('WEAK_NEGATIVE_BELOW', 0.7))
+WEAK_NEGATIVE_BOOST = 0.2
+MEDIUM_NEGATIVE_BELOW = float(os.environ.get('MEDIUM_NEGATIVE_BELOW', 0.85))
+MEDIUM_NEGATIVE_BOOST = 0.1
+
+# Stored per review: the sentiment softmax as 3 little-endian float32 (12 bytes), the
+# sarcasm probability (NULL when the cascade skipped it) and whether the text had a
+# negation word
+PROBS_DTYPE = np.dtype('<f4')
+PROBS_BYTES = PROBS_DTYPE.itemsize * len(SENTIMENT_LABELS)
+COLUMNS = (
+    ('sentiment_probs', 'BLOB'),
+    ('sarcasm_score', 'REAL'),
+    ('has_negation', 'INTEGER')
+)
+
+
+def pack_probs(probs):
+    return np.asarray(probs, dtype=PROBS_DTYPE).tobytes()
+
+
+def unpack_probs(blobs):
+    return np.frombuffer(b''.join(blobs), dtype=PROBS_DTYPE).reshape(len(blobs), len(SENTIMENT_LABELS))
+
+
+def has_negation(text):
+    return any(word in text for word in NEGATION_WORDS)
+
+
+def relabel(probs, negation, sarcasm):
+    # probs: (n, 3) float32 softmax outputs; negation: (n,) bool; sarcasm: (n,) float with NaN
+    # where the sarcasm pass was skipped. Returns (indices into LABELS, scores), matching the
+    # scalar path exactly: the boost is applied in float32 as torch does
+    probs = np.array(probs, dtype=np.float32)
+    rows = np.arange(len(probs))
+    boosted = probs.argmax(axis=1) == NEGATIVE
+    boost = np.where(negation, np.float32(NEGATION_BOOST), np.float32(NEGATIVE_BOOST))
+    probs[boosted, NEGATIVE] *= boost[boosted]
+
+    labels = probs.argmax(axis=1)
+    scores = np.round(probs[rows, labels].astype(np.float64), 4)
+
+    sarcastic = np.asarray(sarcasm, dtype=np.float64) > SARCASM_THRESHOLD  # NaN compares False
+    flipped = sarcastic & (labels == POSITIVE)
+    scores[flipped] = 1 - scores[flipped]
+    labels[flipped] = SARCASTIC
+    hedged = sarcastic & (labels == NEUTRAL)
+    scores[hedged] = np.minimum(scores[hedged] + NEUTRAL_SARCASM_BOOST, 1.0)
+    labels[hedged] = HEDGED
+
+    negative = labels == NEGATIVE
+    weak = negative & (scores < WEAK_NEGATIVE_BELOW)
+    medium = negative & ~weak & (scores < MEDIUM_NEGATIVE_BELOW)
+    scores[weak] = np.minimum(scores[weak] + WEAK_NEGATIVE_BOOST, 1.0)
+    scores[medium] = np.minimum(scores[medium] + MEDIUM_NEGATIVE_BOOST, 1.0)
+    return labels, scores
+
+
+def ensure_columns(conn):
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(reviews)')}
+    for name, definition in COLUMNS:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE reviews ADD COLUMN {name} {definition}')
+
+
+def rescore(path, chunk_size=50000, dry_run=False):
+    # Re-applies the rules above to every review with stored outputs, one id range per
+    # transaction, and rewrites only the rows whose label or score changed (the stats,
+    # rollup and version triggers follow). Reviews stored before the outputs were kept
+    # have to be re-analyzed instead and are only counted.
+    # Returns ({'scanned', 'changed', 'missing_outputs'}, Counter of (old, new) labels)
+    totals = {'scanned': 0, 'changed': 0, 'missing_outputs': 0}
+    transitions = Counter()
+    codes = {label: code for code, label in enumerate(LABELS)}
+    with db.transaction(path) as conn:
+        ensure_columns(conn)  # databases the app has not opened since the columns were added
+    last_id = 0
+    while True:
+        with db.transaction(path) as conn:
+            rows = conn.execute('''
+                SELECT id, sentiment, sentiment_score, sentiment_probs, sarcasm_score, has_negation
+                FROM reviews WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, chunk_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned = len(rows)
+            totals['scanned'] += scanned
+            rows = [row for row in rows if row[3] is not None and len(row[3]) == PROBS_BYTES]
+            totals['missing_outputs'] += scanned - len(rows)
+            if not rows:
+                continue
+            ids, old_labels, old_scores, blobs, sarcasm, negation = zip(*rows)
+            labels, scores = relabel(
+                unpack_probs(blobs),
+                np.array([bool(flag) for flag in negation]),
+                np.array(sarcasm, dtype=np.float64)  # None -> NaN
+            )
+            old_codes = np.array([codes.get(label, -1) for label in old_labels])
+            changed = np.flatnonzero((labels != old_codes) | (scores != np.array(old_scores, dtype=np.float64)))
+            totals['changed'] += len(changed)
+            transitions.update((old_labels[i], LABELS[labels[i]]) for i in changed)
+            if not dry_run and len(changed):
+                conn.executemany(
+                    'UPDATE reviews SET sentiment = ?, sentiment_score = ? WHERE id = ?',
+                    [(LABELS[labels[i]], float(scores[i]), ids[i]) for i in changed]
+                )
+        logger.info(f"rescore: scanned={totals['scanned']} changed={totals['changed']} through id {last_id}")
+    return totals, transitions
@@ -0,0 +1,80 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-sentiment review counters maintained by triggers on every insert, delete and
+# sentiment change, so reading the stats costs one tiny table scan instead of
+# aggregating the whole reviews table.
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS review_counts (
+        sentiment TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_counts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO review_counts (sentiment, count) VALUES (NEW.sentiment, 1)
+        ON CONFLICT(sentiment) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_counts_delete AFTER DELETE ON reviews BEGIN
+        UPDATE review_counts SET count = count - 1 WHERE sentiment = OLD.sentiment;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_counts_update AFTER UPDATE OF sentiment ON reviews
+    WHEN OLD.sentiment IS NOT NEW.sentiment BEGIN
+        UPDATE review_counts SET count = count - 1 WHERE sentiment = OLD.sentiment;
+        INSERT INTO review_counts (sentiment, count) VALUES (NEW.sentiment, 1)
+        ON CONFLICT(sentiment) DO UPDATE SET count = count + 1;
+    END
+    '''
+)
+
+
+def ensure_schema(conn):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_counts'"
+    ).fetchone()
+    for statement in SCHEMA:
+        conn.execute(statement)
+    if not exists:
+        # First run against an existing database: seed the counters from the current rows
+        rebuild(conn)
+
+
+def read(conn):
+    rows = conn.execute(
+        'SELECT sentiment, count FROM review_counts WHERE count > 0 ORDER BY sentiment'
+    ).fetchall()
+    distribution = dict(rows)
+    return {
+        'total_reviews': sum(distribution.values()),
+        'sentiment_distribution': distribution
+    }
+
+
+def recompute(conn):
+    return dict(conn.execute('SELECT sentiment, COUNT(*) FROM reviews GROUP BY sentiment').fetchall())
+
+
+def drift(conn):
+    # Returns {sentiment: (stored, actual)} for every counter that disagrees with the table
+    stored = dict(conn.execute('SELECT sentiment, count FROM review_counts').fetchall())
+    actual = recompute(conn)
+    return {
+        sentiment: (stored.get(sentiment, 0), actual.get(sentiment, 0))
+        for sentiment in set(stored) | set(actual)
+        if stored.get(sentiment, 0) != actual.get(sentiment, 0)
+    }
+
+
+def rebuild(conn):
+    found = drift(conn)
+    conn.execute('DELETE FROM review_counts')
+    conn.execute('INSERT INTO review_counts (sentiment, count) SELECT sentiment, COUNT(*) FROM reviews GROUP BY sentiment')
+    if found:
+        logger.info(f"Rebuilt review counters, corrected drift: {found}")
+    return found
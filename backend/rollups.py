@@ -0,0 +1,162 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Review counts per time bucket, sentiment, language and star rating, kept current by
+# triggers on every insert, delete and update of a bucketed column. Trend charts read
+# these few hundred rows instead of grouping the whole reviews table.
+# Buckets are UTC timestamps truncated to the hour/day, as text so they sort and compare.
+GRANULARITIES = {
+    'hour': ('review_rollups_hourly', "strftime('%Y-%m-%d %H:00:00', {row}.created_at)"),
+    'day': ('review_rollups_daily', "date({row}.created_at)")
+}
+
+DIMENSIONS = ('sentiment', 'language', 'star_rating')
+
+
+def _key(granularity, row):
+    # (bucket, sentiment, language, star_rating) of a reviews row; NULLs map to fixed values
+    # because NULLs never conflict in a primary key, which would break the upserts below
+    _, bucket = GRANULARITIES[granularity]
+    return (
+        f"COALESCE({bucket.format(row=row)}, '')",
+        f'{row}.sentiment',
+        f"COALESCE({row}.language, '')",
+        f'COALESCE({row}.star_rating, 0)'
+    )
+
+
+def _add(granularity, row):
+    table, _ = GRANULARITIES[granularity]
+    return f'''
+        INSERT INTO {table} (bucket, sentiment, language, star_rating, count, score_sum)
+        VALUES ({', '.join(_key(granularity, row))}, 1, COALESCE({row}.sentiment_score, 0))
+        ON CONFLICT(bucket, sentiment, language, star_rating) DO UPDATE
+        SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+    '''
+
+
+def _remove(granularity, row):
+    table, _ = GRANULARITIES[granularity]
+    bucket, sentiment, language, star_rating = _key(granularity, row)
+    return f'''
+        UPDATE {table} SET count = count - 1, score_sum = score_sum - COALESCE({row}.sentiment_score, 0)
+        WHERE bucket = {bucket} AND sentiment = {sentiment} AND language = {language} AND star_rating = {star_rating};
+    '''
+
+
+def _schema():
+    statements = []
+    for table, _ in GRANULARITIES.values():
+        statements.append(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                language TEXT NOT NULL,
+                star_rating INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, sentiment, language, star_rating)
+            )
+        ''')
+    statements.append(
+        'CREATE TRIGGER IF NOT EXISTS reviews_rollups_insert AFTER INSERT ON reviews BEGIN'
+        + ''.join(_add(granularity, 'NEW') for granularity in GRANULARITIES) + 'END'
+    )
+    statements.append(
+        'CREATE TRIGGER IF NOT EXISTS reviews_rollups_delete AFTER DELETE ON reviews BEGIN'
+        + ''.join(_remove(granularity, 'OLD') for granularity in GRANULARITIES) + 'END'
+    )
+    # Covers rate_review (star_rating) as well as re-scoring and backfills
+    statements.append(
+        '''CREATE TRIGGER IF NOT EXISTS reviews_rollups_update
+           AFTER UPDATE OF sentiment, sentiment_score, language, star_rating, created_at ON reviews
+           WHEN OLD.sentiment IS NOT NEW.sentiment OR OLD.sentiment_score IS NOT NEW.sentiment_score
+             OR OLD.language IS NOT NEW.language OR OLD.star_rating IS NOT NEW.star_rating
+             OR OLD.created_at IS NOT NEW.created_at
+           BEGIN'''
+        + ''.join(_remove(granularity, 'OLD') + _add(granularity, 'NEW') for granularity in GRANULARITIES)
+        + 'END'
+    )
+    return tuple(statements)
+
+
+SCHEMA = _schema()
+
+
+def ensure_schema(conn):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_rollups_daily'"
+    ).fetchone()
+    for statement in SCHEMA:
+        conn.execute(statement)
+    if not exists:
+        # First run against an existing database: seed the rollups from the current rows
+        rebuild(conn)
+
+
+def _recompute_sql(granularity):
+    bucket, sentiment, language, star_rating = _key(granularity, 'reviews')
+    return f'''
+        SELECT {bucket}, {sentiment}, {language}, {star_rating}, COUNT(*), COALESCE(SUM(sentiment_score), 0)
+        FROM reviews GROUP BY 1, 2, 3, 4
+    '''
+
+
+def drift(conn):
+    # Returns {granularity: number of rollup rows that disagree with the reviews table}
+    found = {}
+    for granularity, (table, _) in GRANULARITIES.items():
+        stored = {
+            row[:4]: row[4]
+            for row in conn.execute(f'SELECT bucket, sentiment, language, star_rating, count FROM {table} WHERE count != 0')
+        }
+        actual = {row[:4]: row[4] for row in conn.execute(_recompute_sql(granularity))}
+        mismatched = sum(1 for key in set(stored) | set(actual) if stored.get(key, 0) != actual.get(key, 0))
+        if mismatched:
+            found[granularity] = mismatched
+    return found
+
+
+def rebuild(conn):
+    found = drift(conn)
+    for granularity, (table, _) in GRANULARITIES.items():
+        conn.execute(f'DELETE FROM {table}')
+        conn.execute(
+            f'INSERT INTO {table} (bucket, sentiment, language, star_rating, count, score_sum) '
+            + _recompute_sql(granularity)
+        )
+    if found:
+        logger.info(f"Rebuilt review rollups, corrected drift: {found}")
+    return found
+
+
+def read(conn, granularity, start, end, group_by=DIMENSIONS, filters=None, minimums=None):
+    # One row per bucket and combination of the group_by dimensions, oldest bucket first.
+    # start/end are bucket strings (inclusive); filters maps a dimension to a required value,
+    # minimums to a lower bound (e.g. star_rating, as /api/reviews filters it).
+    table, _ = GRANULARITIES[granularity]
+    columns = [dimension for dimension in DIMENSIONS if dimension in group_by]
+    query = f'''
+        SELECT bucket{''.join(', ' + column for column in columns)}, SUM(count), SUM(score_sum)
+        FROM {table} WHERE bucket >= ? AND bucket <= ?
+    '''
+    params = [start, end]
+    for dimension, value in (filters or {}).items():
+        if dimension in DIMENSIONS:
+            query += f' AND {dimension} = ?'
+            params.append(value)
+    for dimension, value in (minimums or {}).items():
+        if dimension in DIMENSIONS:
+            query += f' AND {dimension} >= ?'
+            params.append(value)
+    query += f" GROUP BY bucket{''.join(', ' + column for column in columns)} HAVING SUM(count) > 0 ORDER BY bucket"
+
+    points = []
+    for row in conn.execute(query, params):
+        count, score_sum = row[-2], row[-1]
+        point = {'bucket': row[0], **dict(zip(columns, row[1:-2]))}
+        point['count'] = count
+        point['avg_score'] = round(score_sum / count, 4)
+        points.append(point)
+    return points
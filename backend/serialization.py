@@ -0,0 +1,68 @@
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/csv', 'text/plain', 'text/html')
+
+
+# Flask JSON provider backed by orjson, several times faster than the stdlib encoder on
+# large row lists. Keys stay sorted and output compact (indented in debug mode) as with
+# the default provider; non-ASCII text is sent as UTF-8 rather than \u escapes. Types
+# orjson does not know go through Flask's own default().
+class OrjsonProvider(DefaultJSONProvider):
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # Skips the bytes -> str -> bytes round trip of dumps()
+        body = orjson.dumps(obj, default=self.default, option=option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encoding):
+    # Brotli when the client takes it and the module is installed, else gzip, else None
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        quality = params.replace(' ', '')
+        try:
+            if quality.startswith('q=') and float(quality[2:]) == 0:
+                continue  # explicitly refused
+        except ValueError:
+            pass
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        # Brotli quality runs 0-11; scale the gzip-style 1-9 level onto it
+        return brotli.compress(data, quality=min(11, max(0, round(level * 11 / 9))))
+    return gzip.compress(data, compresslevel=level, mtime=0)
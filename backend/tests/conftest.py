@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# app reads its configuration at import time: point it at a scratch database, keep it from
+# loading Hugging Face checkpoints and starting background threads. The stub models from
+# benchmarks/stub_models.py stand in for the real ones.
+WORK_DIR = tempfile.mkdtemp(prefix='sentiment-tests-')
+os.environ.update({
+    'DATABASE_FILE': os.path.join(WORK_DIR, 'reviews.db'),
+    'MODEL_LOAD_MODE': 'off',
+    'SEED_SAMPLE_REVIEWS': '0',
+    'MULTILINGUAL_SENTIMENT_MODEL_NAME': '',
+    'SENTIMENT_LANGUAGE_MODELS': '',
+    'MICRO_BATCHING': '0',
+    'WRITE_BEHIND': '0',
+    'JOB_WORKERS': '0',
+    'RESULT_CACHE_DB': ''
+})
+
+import embeddings  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    import app as app_module
+    import stub_models
+
+    stub_models.install(app_module)
+    return app_module
+
+
+@pytest.fixture
+def database(app, tmp_path, monkeypatch):
+    # A fresh, empty reviews database and embedding index for each test
+    path = str(tmp_path / 'reviews.db')
+    monkeypatch.setattr(app, 'DATABASE_FILE', path)
+    if app.embedding_index is not None:
+        monkeypatch.setattr(app, 'embedding_index', embeddings.EmbeddingIndex(embeddings.index_path(path)))
+    app.init_db()
+    app.prepare_embedding_index()
+    app.result_cache.clear()
+    return path
+
+
+@pytest.fixture
+def client(app, database):
+    return app.app.test_client()
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionRejected, TokenBudget
+
+
+def test_requests_within_the_budget_run_concurrently():
+    budget = TokenBudget(10, max_queue=0)
+    first = budget.acquire(4)
+    second = budget.acquire(6)
+
+    assert budget.stats()['tokens_in_flight'] == 10
+    budget.release(first)
+    budget.release(second)
+    assert budget.stats()['tokens_in_flight'] == 0
+
+
+def test_full_queue_is_rejected_with_a_retry_hint():
+    budget = TokenBudget(10, max_queue=0)
+    with budget.admit(10):
+        with pytest.raises(AdmissionRejected) as rejected:
+            budget.acquire(1)
+
+    assert rejected.value.reason == 'queue_full'
+    assert rejected.value.retry_after >= 1
+    assert budget.stats()['rejected'] == {'queue_full': 1, 'timeout': 0}
+
+
+def test_queued_request_times_out():
+    budget = TokenBudget(10, max_queue=1, max_wait=0.05)
+    with budget.admit(10):
+        with pytest.raises(AdmissionRejected) as rejected:
+            budget.acquire(1)
+
+    assert rejected.value.reason == 'timeout'
+    stats = budget.stats()
+    assert (stats['queue_depth'], stats['tokens_in_flight']) == (0, 0)
+
+
+def test_queued_request_runs_once_tokens_are_released():
+    budget = TokenBudget(10, max_queue=1, max_wait=5)
+    held = budget.acquire(8)
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(budget.acquire(5)))
+    waiter.start()
+
+    time.sleep(0.05)
+    assert not admitted and budget.stats()['queue_depth'] == 1
+    budget.release(held)
+    waiter.join(timeout=5)
+
+    assert admitted == [5]
+    assert budget.stats()['queued'] == 1
+
+
+def test_queue_is_first_in_first_out():
+    # A small request behind a large one waits, even though it would fit right away
+    budget = TokenBudget(10, max_queue=2, max_wait=5)
+    held = budget.acquire(6)
+    order = []
+
+    def take(cost):
+        charged = budget.acquire(cost)
+        order.append(cost)
+        budget.release(charged)
+
+    large = threading.Thread(target=take, args=(10,))
+    large.start()
+    time.sleep(0.05)
+    small = threading.Thread(target=take, args=(2,))
+    small.start()
+    time.sleep(0.05)
+
+    assert order == []
+    budget.release(held)
+    large.join(timeout=5)
+    small.join(timeout=5)
+    assert order == [10, 2]
+
+
+def test_oversized_request_is_charged_the_whole_budget():
+    budget = TokenBudget(10, max_queue=0)
+    with budget.admit(500) as charged:
+        assert charged == 10
+    assert budget.stats()['tokens_in_flight'] == 0
+
+
+def test_busy_server_answers_429_but_serves_cached_results(app, client, monkeypatch):
+    budget = TokenBudget(1, max_queue=0)
+    monkeypatch.setattr(app, 'admission_budget', budget)
+    assert client.post('/api/analyze', json={'text': 'cached review'}).status_code == 200
+
+    held = budget.acquire(1)
+    try:
+        rejected = client.post('/api/analyze', json={'text': 'new review'})
+        assert rejected.status_code == 429
+        assert int(rejected.headers['Retry-After']) >= 1
+
+        # Results already in the cache never reach the models, so they are not charged
+        assert client.post('/api/analyze', json={'text': 'cached review'}).status_code == 200
+        batch = client.post('/api/analyze/batch', json={'texts': ['cached review', 'cached review']})
+        assert batch.status_code == 200
+        assert client.post('/api/analyze/batch', json={'texts': ['cached review', 'new review']}).status_code == 429
+    finally:
+        budget.release(held)
@@ -0,0 +1,42 @@
+import db
+
+
+def stored_reviews(app):
+    return db.get_connection(app.DATABASE_FILE).execute(
+        'SELECT text, sentiment, sentiment_score FROM reviews ORDER BY id'
+    ).fetchall()
+
+
+def test_ready_with_stub_models(client):
+    response = client.get('/api/health/ready')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+
+
+def test_analyze_stores_the_review(app, client):
+    response = client.post('/api/analyze', json={'text': 'Works well, would buy again'})
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['success'] is True
+    sentiment = body['data']['sentiment']
+    assert not any(key.startswith('_') for key in sentiment)
+    assert stored_reviews(app) == [('Works well, would buy again', sentiment['label'], sentiment['score'])]
+    assert body['data']['stats']['total_reviews'] == 1
+
+
+def test_batch_matches_single_analysis(app, client):
+    texts = ['Great value', 'Broke after a week', 'It is a phone']
+    singles = [client.post('/api/analyze', json={'text': text}).get_json()['data']['sentiment'] for text in texts]
+
+    batch = client.post('/api/analyze/batch', json={'texts': texts}).get_json()
+
+    assert batch['success'] is True
+    assert [result['sentiment'] for result in batch['data']['results']] == singles
+    assert len(stored_reviews(app)) == 2 * len(texts)
+
+
+def test_analyze_rejects_empty_text(client):
+    response = client.post('/api/analyze', json={'text': '   '})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from batcher import MicroBatcher
+
+
+def submit_all(batcher, items):
+    return [batcher.submit(item) for item in items]
+
+
+def test_results_follow_their_items():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_batch_size=4, max_wait_ms=20)
+    futures = submit_all(batcher, range(10))
+    assert [future.result(timeout=5) for future in futures] == [item * 2 for item in range(10)]
+
+
+def test_concurrent_submissions_share_batches():
+    sizes = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)  # hold the first batch so the rest queue up behind it
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+    first = batcher.submit(0)
+    rest = submit_all(batcher, range(1, 17))
+    release.set()
+
+    assert first.result(timeout=5) == 0
+    assert [future.result(timeout=5) for future in rest] == list(range(1, 17))
+    assert max(sizes) <= 8
+    assert len(sizes) < 17
+    assert batcher.stats()['items'] == 17
+
+
+def test_exception_fails_every_future():
+    def process(items):
+        raise ValueError('model exploded')
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20)
+    for future in submit_all(batcher, range(3)):
+        with pytest.raises(ValueError, match='model exploded'):
+            future.result(timeout=5)
+
+
+def test_short_result_list_fails_the_batch_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=4, max_wait_ms=50)
+    for future in submit_all(batcher, range(3)):
+        with pytest.raises(RuntimeError, match='results for'):
+            future.result(timeout=5)
+
+    # The worker survives and keeps resolving later submissions
+    assert isinstance(batcher.submit(7).exception(timeout=5), RuntimeError)
+
+
+def test_cancelled_futures_are_skipped():
+    seen = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)
+        seen.extend(items)
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait_ms=0)
+    blocker = batcher.submit('blocker')
+    cancelled = batcher.submit('cancelled')
+    assert cancelled.cancel()
+    release.set()
+
+    assert blocker.result(timeout=5) == 'blocker'
+    assert batcher.submit('after').result(timeout=5) == 'after'
+    assert 'cancelled' not in seen
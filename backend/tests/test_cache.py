@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+import cache
+import db
+
+
+@pytest.fixture
+def cache_db(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+def persistent_rows(path):
+    return db.get_connection(path).execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+
+
+def test_normalized_text_shares_an_entry():
+    results = cache.ResultCache(max_entries=10)
+    results.set_fingerprint('model-a')
+    results.put('Great   product\n', {'label': 'positive'})
+
+    assert results.get('Great product') == {'label': 'positive'}
+    assert results.get('Great product', namespace='hi') is None
+
+
+def test_fingerprint_change_invalidates_both_tiers(cache_db):
+    results = cache.ResultCache(max_entries=10, db_path=cache_db)
+    results.set_fingerprint('model-a')
+    results.put('text', {'label': 'neutral'})
+
+    results.set_fingerprint('model-b')
+
+    assert results.get('text') is None
+    assert persistent_rows(cache_db) == 0
+
+
+def test_memory_tier_evicts_least_recently_used():
+    results = cache.ResultCache(max_entries=2)
+    results.put('a', 1)
+    results.put('b', 2)
+    results.get('a')
+    results.put('c', 3)
+
+    assert results.get('b') is None
+    assert results.get('a') == 1
+    assert results.stats()['evictions'] == 1
+
+
+def test_persistent_tier_survives_a_new_instance(cache_db):
+    first = cache.ResultCache(max_entries=10, db_path=cache_db)
+    first.set_fingerprint('model-a')
+    first.put('text', {'label': 'negative'})
+
+    second = cache.ResultCache(max_entries=10, db_path=cache_db)
+    second.set_fingerprint('model-a')
+
+    assert second.get('text') == {'label': 'negative'}
+    assert second.get('text') == {'label': 'negative'}
+    stats = second.stats()
+    assert (stats['persistent_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 0)
+
+
+def test_persistent_tier_is_trimmed_oldest_first(cache_db):
+    results = cache.ResultCache(max_entries=0, db_path=cache_db, max_persistent_entries=10)
+    for i in range(25):
+        results.put(f'text {i}', i)
+
+    assert persistent_rows(cache_db) <= 10
+    assert results.get('text 24') == 24
+    assert results.get('text 0') is None
+    assert results.stats()['persistent_evictions'] == 25 - persistent_rows(cache_db)
+
+
+def test_trim_keeps_the_newest_entries(cache_db):
+    results = cache.ResultCache(max_entries=0, db_path=cache_db, max_persistent_entries=100)
+    for i in range(5):
+        results.put(f'text {i}', i)
+        time.sleep(0.001)
+
+    with db.transaction(cache_db) as conn:
+        assert cache.trim(conn, 2) == 3
+    assert [results.get(f'text {i}') for i in range(5)] == [None, None, None, 3, 4]
+
+
+def test_memory_hits_do_not_wait_for_a_slow_persistent_read(cache_db, monkeypatch):
+    results = cache.ResultCache(max_entries=10, db_path=cache_db)
+    results.put('hot', 'cached')
+    connect = db.get_connection
+    reading = threading.Event()
+
+    class SlowConnection:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def execute(self, *args):
+            reading.set()
+            time.sleep(0.5)
+            return self.conn.execute(*args)
+
+    monkeypatch.setattr(db, 'get_connection', lambda path: SlowConnection(connect(path)))
+    miss = threading.Thread(target=results.get, args=('cold',))
+    miss.start()
+    assert reading.wait(5)
+
+    started = time.monotonic()
+    assert results.get('hot') == 'cached'
+    assert time.monotonic() - started < 0.25
+    miss.join()
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import db
+import embeddings
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = embeddings.EmbeddingIndex(str(tmp_path / 'reviews.embeddings.f16'))
+    assert index.ensure(3, 'test-model')
+    return index
+
+
+def test_vectors_are_stored_unit_length_by_review_id(index):
+    index.put([1, 2], [[3, 0, 0], [0, 2, 0]])
+    index.put([5], [[0, 0, 4]])  # leaves a gap at ids 3 and 4
+
+    assert np.allclose(index.get(1), [1, 0, 0], atol=1e-3)
+    assert np.allclose(index.get(5), [0, 0, 1], atol=1e-3)
+    assert index.get(0) is None
+    assert index.get(3) is None
+    assert index.get(99) is None
+    assert index.stats()['rows'] == 6
+
+
+def test_non_consecutive_ids_are_written_in_place(index):
+    index.put([4, 1, 7], [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+
+    assert np.allclose(index.get(4), [1, 0, 0], atol=1e-3)
+    assert np.allclose(index.get(1), [0, 1, 0], atol=1e-3)
+    assert np.allclose(index.get(7), [0, 0, 1], atol=1e-3)
+
+
+def test_similar_ranks_by_cosine_and_skips_the_query_and_gaps(index):
+    index.put([1, 2, 3, 5], [[1, 0, 0], [1, 0.1, 0], [0.1, 1, 0], [1, 1, 0]])
+
+    matches = index.similar(1, k=10)
+    assert [review_id for review_id, _ in matches] == [2, 5, 3]
+    assert matches[0][1] == pytest.approx(0.995, abs=1e-3)
+    assert [review_id for review_id, _ in index.similar(1, k=1)] == [2]
+    assert [review_id for review_id, _ in index.similar(1, min_score=0.5)] == [2, 5]
+    assert index.similar(4) is None
+
+
+def test_another_reader_sees_appended_rows(index):
+    reader = embeddings.EmbeddingIndex(index.path)
+    index.put([1], [[1, 0, 0]])
+    assert reader.get(1) is not None
+
+    index.put([2], [[0, 1, 0]])
+    assert reader.get(2) is not None
+
+
+def test_index_for_another_model_is_refused(index):
+    other = embeddings.EmbeddingIndex(index.path)
+    assert other.ensure(3, 'test-model')
+    assert not other.ensure(3, 'another-model')
+    assert not other.ensure(4, 'test-model')
+
+
+def test_rebuild_swaps_in_a_fresh_index(app, database):
+    with db.transaction(database) as conn:
+        conn.executemany('INSERT INTO reviews (text, sentiment) VALUES (?, ?)', [('a', 'positive'), ('b', 'negative')])
+    path = embeddings.index_path(database) + '.test'
+
+    total = embeddings.rebuild(database, path, lambda texts: [[len(text), 1, 0] for text in texts], 'test-model')
+
+    rebuilt = embeddings.EmbeddingIndex(path)
+    assert total == 2
+    assert (rebuilt.dim, rebuilt.model) == (3, 'test-model')
+    assert rebuilt.get(1) is not None and rebuilt.get(2) is not None
+
+
+def test_analyzed_reviews_can_be_searched_by_similarity(app, client):
+    if not app.embedding_index_ok:
+        pytest.skip('embeddings are disabled')
+    for text in ['battery lasts all day', 'battery lasts all week', 'screen cracked quickly']:
+        client.post('/api/analyze', json={'text': text})
+
+    body = client.get('/api/reviews/1/similar', query_string={'k': 2}).get_json()
+
+    assert body['success'] is True
+    assert [review['id'] for review in body['similar']] == [2, 3]
+    assert body['similar'][0]['similarity'] > body['similar'][1]['similarity']
+    assert client.get('/api/reviews/9/similar').status_code == 404
@@ -0,0 +1,79 @@
+import queue
+
+from events import StatsBroadcaster, Subscription, stats_delta
+
+
+def stats(total, **distribution):
+    return {'total_reviews': total, 'sentiment_distribution': distribution}
+
+
+def drain(subscription):
+    events = []
+    while True:
+        try:
+            events.append(subscription.get(timeout=0.01))
+        except queue.Empty:
+            return events
+
+
+def test_delta_carries_only_changed_keys():
+    old = stats(3, positive=2, negative=1)
+    assert stats_delta(old, stats(3, positive=2, negative=1)) == {}
+    assert stats_delta(old, stats(4, positive=3, negative=1)) == {
+        'total_reviews': 4,
+        'sentiment_distribution': {'positive': 3}
+    }
+    assert stats_delta(old, stats(2, positive=2)) == {'total_reviews': 2, 'sentiment_distribution': {'negative': 0}}
+
+
+def test_full_queue_is_replaced_by_a_snapshot():
+    subscription = Subscription(stats(0), max_pending=2)
+    previous = stats(0)
+    for total in range(1, 5):
+        current = stats(total, positive=total)
+        subscription.put(('delta', stats_delta(previous, current)), current)
+        previous = current
+
+    # Applying what the client receives must land on the latest stats
+    state = None
+    for event, payload in drain(subscription):
+        if event == 'snapshot':
+            state = payload
+        else:
+            state = {
+                'total_reviews': payload.get('total_reviews', state['total_reviews']),
+                'sentiment_distribution': {**state['sentiment_distribution'], **payload.get('sentiment_distribution', {})}
+            }
+    assert state == stats(4, positive=4)
+
+
+def test_notifications_are_coalesced_into_one_delta():
+    current = {'stats': stats(0)}
+    loads = []
+
+    def load_stats():
+        loads.append(1)
+        return current['stats']
+
+    broadcaster = StatsBroadcaster(load_stats, coalesce_ms=50, poll_interval=0.05)
+    subscription = broadcaster.subscribe()
+    assert subscription.snapshot == stats(0)
+
+    current['stats'] = stats(3, positive=3)
+    for _ in range(3):
+        broadcaster.notify()
+    event = subscription.get(timeout=5)
+
+    assert event == ('delta', {'total_reviews': 3, 'sentiment_distribution': {'positive': 3}})
+    assert len(loads) == 2
+    broadcaster.unsubscribe(subscription)
+
+
+def test_review_updates_are_merged_per_review():
+    broadcaster = StatsBroadcaster(lambda: stats(0), coalesce_ms=100, poll_interval=0.05)
+    subscription = broadcaster.subscribe()
+
+    broadcaster.notify({'id': 1, 'star_rating': 4})
+    broadcaster.notify({'id': 1, 'helpful_count': 2})
+
+    assert subscription.get(timeout=5) == ('reviews', [{'id': 1, 'star_rating': 4, 'helpful_count': 2}])
@@ -0,0 +1,58 @@
+import pytest
+
+import db
+import fulltext
+
+
+@pytest.mark.parametrize('search, expected', [
+    ('battery', '"battery"*'),
+    ('battery life', '"battery" "life"*'),
+    ('"battery life" poor', '"battery life" "poor"*'),
+    ('batt* great', '"batt"* "great"*'),
+    ('great batt', '"great" "batt"*'),
+    ('don\'t', '"don" "t"*'),
+    ('AND OR NOT', '"AND" "OR" "NOT"*'),
+    ('"unterminated', '"unterminated"*'),
+    ('*** ""', ''),
+    ('col:value', '"col" "value"*'),
+])
+def test_build_match_query(search, expected):
+    assert fulltext.build_match_query(search) == expected
+
+
+def search_ids(client, search, **params):
+    body = client.get('/api/reviews', query_string={'search': search, 'fields': 'id', **params}).get_json()
+    return sorted(review['id'] for review in body['reviews'])
+
+
+def test_index_follows_review_writes(app, client, database):
+    if not app.fulltext_available:
+        pytest.skip('SQLite built without FTS5')
+    with db.transaction(database) as conn:
+        conn.executemany('INSERT INTO reviews (text, sentiment) VALUES (?, ?)', [
+            ('Battery life is excellent', 'positive'),
+            ('Terrible battery, returned it', 'negative'),
+            ('Screen is café quality', 'positive')
+        ])
+
+    assert search_ids(client, 'battery') == [1, 2]
+    assert search_ids(client, 'batt') == [1, 2]  # the last word is a prefix
+    assert search_ids(client, '"battery life"') == [1]
+    assert search_ids(client, 'cafe') == [3]  # diacritics are folded
+    assert search_ids(client, 'battery', sentiment='negative') == [2]
+
+    with db.transaction(database) as conn:
+        conn.execute("UPDATE reviews SET text = 'Charger is fine' WHERE id = 1")
+        conn.execute('DELETE FROM reviews WHERE id = 2')
+
+    assert search_ids(client, 'battery') == []
+    assert search_ids(client, 'charger') == [1]
+
+
+def test_operator_characters_are_not_a_syntax_error(client, database):
+    with db.transaction(database) as conn:
+        conn.execute("INSERT INTO reviews (text, sentiment) VALUES ('NEAR perfect (really)', 'positive')")
+
+    response = client.get('/api/reviews', query_string={'search': 'NEAR( perfect) -"'})
+    assert response.status_code == 200
+    assert [review['id'] for review in response.get_json()['reviews']] == [1]
@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+
+import db
+import http_cache
+
+
+@pytest.mark.parametrize('if_none_match, matches', [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"other", W/"abc"', True),
+    ('*', True),
+    ('"other"', False),
+    ('', False),
+    (None, False),
+])
+def test_etag_matching_is_weak(if_none_match, matches):
+    assert http_cache.etag_matches(if_none_match, 'W/"abc"') is matches
+
+
+def test_triggers_bump_the_data_version(database):
+    conn = db.get_connection(database)
+    before = http_cache.read_version(conn)
+    with db.transaction(database) as write:
+        write.execute("INSERT INTO reviews (text, sentiment) VALUES ('a', 'positive')")
+        write.execute("UPDATE reviews SET helpful_count = 1 WHERE id = 1")
+        write.execute('DELETE FROM reviews WHERE id = 1')
+
+    assert http_cache.read_version(conn) == before + 3
+
+
+def insert(path):
+    with db.transaction(path) as conn:
+        conn.execute("INSERT INTO reviews (text, sentiment) VALUES ('fine', 'positive')")
+
+
+def test_unchanged_data_is_answered_with_304(client, database):
+    first = client.get('/api/stats')
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    cached = client.get('/api/stats', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+    assert 'Accept-Encoding' in cached.headers['Vary']
+
+    insert(database)
+    changed = client.get('/api/stats', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['total_reviews'] == 1
+
+
+def test_etags_differ_by_query_and_encoding(app, client, database):
+    if not app.COMPRESSION:
+        pytest.skip('compression is disabled')
+    plain = client.get('/api/reviews').headers['ETag']
+    gzipped = client.get('/api/reviews', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    limited = client.get('/api/reviews', query_string={'limit': 1}).headers['ETag']
+
+    assert len({plain, gzipped, limited}) == 3
+    assert client.get('/api/reviews', headers={'If-None-Match': gzipped}).status_code == 200
+
+
+def test_large_responses_are_compressed(app, client, database, monkeypatch):
+    if not app.COMPRESSION:
+        pytest.skip('compression is disabled')
+    monkeypatch.setattr(app, 'COMPRESS_MIN_BYTES', 64)
+    for _ in range(5):
+        insert(database)
+
+    response = client.get('/api/reviews', headers={'Accept-Encoding': 'gzip'})
+    small = client.get('/api/stats', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'"fine"' in gzip.decompress(response.data)
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
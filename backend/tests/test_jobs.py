@@ -0,0 +1,201 @@
+import json
+
+import pytest
+
+import db
+import jobs
+
+
+@pytest.fixture
+def queue_db(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    with db.transaction(path) as conn:
+        jobs.ensure_schema(conn)
+    return path
+
+
+def make_queue(path, score_batch=None, **options):
+    # workers=0: tests drive the queue with process_once() instead of background threads
+    score_batch = score_batch or (lambda texts, languages: [{'length': len(text)} for text in texts])
+    return jobs.JobQueue(path, score_batch, workers=0, **options)
+
+
+def item_states(path, job_id):
+    return db.get_connection(path).execute(
+        'SELECT position, status, attempts FROM analysis_job_items WHERE job_id = ? ORDER BY position', (job_id,)
+    ).fetchall()
+
+
+def expire_leases(path):
+    with db.transaction(path) as conn:
+        conn.execute("UPDATE analysis_job_items SET claimed_at = 0 WHERE status = 'running'")
+
+
+def test_job_runs_to_completion(queue_db):
+    queue = make_queue(queue_db, batch_size=2)
+    job_id = queue.submit(['a', 'bb', 'ccc'])
+
+    while queue.process_once():
+        pass
+
+    job = queue.get(job_id)
+    assert (job['status'], job['processed'], job['failed'], job['progress']) == ('completed', 3, 0, 1.0)
+    assert [(r['position'], r['length']) for r in queue.results(job_id)] == [(0, 1), (1, 2), (2, 3)]
+    assert [r['position'] for r in queue.results(job_id, after=0, limit=1)] == [1]
+
+
+def test_higher_priority_items_are_claimed_first(queue_db):
+    queue = make_queue(queue_db, batch_size=2)
+    low = queue.submit(['l1', 'l2'], priority=jobs.PRIORITIES['low'])
+    high = queue.submit(['h1'], priority=jobs.PRIORITIES['high'])
+
+    rows = queue.claim()
+
+    assert [(row[0], row[2]) for row in rows] == [(high, 'h1'), (low, 'l1')]
+
+
+def test_one_bad_text_does_not_fail_its_batch(queue_db):
+    def score(texts, languages):
+        if 'bad' in texts:
+            raise ValueError('cannot score')
+        return [{'ok': True} for _ in texts]
+
+    queue = make_queue(queue_db, score, batch_size=10, max_attempts=2)
+    job_id = queue.submit(['fine', 'bad', 'also fine'])
+
+    queue.process_once()
+    assert item_states(queue_db, job_id) == [(0, 'done', 1), (1, 'pending', 1), (2, 'done', 1)]
+
+    queue.process_once()
+    assert item_states(queue_db, job_id)[1] == (1, 'failed', 2)
+    job = queue.get(job_id)
+    assert (job['status'], job['processed'], job['failed']) == ('completed', 2, 1)
+    assert queue.results(job_id)[1]['error'] == 'cannot score'
+
+
+def test_expired_leases_are_retried_then_failed(queue_db):
+    queue = make_queue(queue_db, max_attempts=2, lease_seconds=60)
+    job_id = queue.submit(['crashes its worker'])
+
+    # Two workers claim the item and die without completing or releasing it
+    for attempt in (1, 2):
+        assert len(queue.claim()) == 1
+        assert item_states(queue_db, job_id) == [(0, 'running', attempt)]
+        expire_leases(queue_db)
+
+    assert queue.claim() == []
+    assert item_states(queue_db, job_id) == [(0, 'failed', 2)]
+    job = queue.get(job_id)
+    assert (job['status'], job['failed']) == ('completed', 1)
+
+
+def test_live_leases_are_not_reclaimed(queue_db):
+    queue = make_queue(queue_db, lease_seconds=60)
+    queue.submit(['slow'])
+
+    assert len(queue.claim()) == 1
+    assert queue.claim() == []
+
+
+def test_stale_worker_cannot_overwrite_a_newer_claim(queue_db):
+    queue = make_queue(queue_db, lease_seconds=60)
+    job_id = queue.submit(['text'])
+    stale = queue.claim()
+    expire_leases(queue_db)
+    fresh = queue.claim()
+
+    queue.complete(stale, [{'worker': 'stale'}])
+    assert item_states(queue_db, job_id) == [(0, 'running', 2)]
+
+    queue.complete(fresh, [{'worker': 'fresh'}])
+    assert queue.results(job_id)[0]['worker'] == 'fresh'
+
+
+def test_private_result_keys_are_not_saved_with_the_item(queue_db):
+    queue = make_queue(queue_db, lambda texts, languages: [{'label': 'x', '_row': object()} for _ in texts])
+    job_id = queue.submit(['text'])
+    queue.process_once()
+
+    saved = db.get_connection(queue_db).execute(
+        'SELECT result FROM analysis_job_items WHERE job_id = ?', (job_id,)
+    ).fetchone()[0]
+    assert json.loads(saved) == {'label': 'x'}
+
+
+def test_post_commit_hook_runs_only_after_a_commit(queue_db):
+    calls = []
+
+    def store(texts, results):
+        conn = db.get_connection(queue_db)
+        conn.execute('CREATE TABLE IF NOT EXISTS stored (text TEXT)')
+        conn.executemany('INSERT INTO stored VALUES (?)', [(text,) for text in texts])
+        return lambda: calls.append((list(texts), conn.in_transaction))
+
+    queue = make_queue(queue_db, store_results=store)
+    queue.submit(['kept'])
+    queue.process_once()
+    assert calls == [(['kept'], False)]
+
+    finish = queue._finish
+
+    def fail_completion(conn, counts):
+        # Roll back the transaction that stored the results; releasing the items still works
+        if any(done for done, _ in counts.values()):
+            raise RuntimeError('commit fails')
+        finish(conn, counts)
+
+    queue._finish = fail_completion
+    queue.submit(['rolled back'])
+    queue.process_once()
+
+    assert calls == [(['kept'], False)]
+    assert db.get_connection(queue_db).execute('SELECT text FROM stored').fetchall() == [('kept',)]
+
+
+def test_purge_deletes_old_finished_jobs_only(queue_db):
+    queue = make_queue(queue_db)
+    old = queue.submit(['old'])
+    recent = queue.submit(['recent'])
+    unfinished = queue.submit(['unfinished'])
+    queue.process_once()
+    with db.transaction(queue_db) as conn:
+        conn.execute(
+            "UPDATE analysis_jobs SET status = 'completed', finished_at = datetime('now', '-10 days') WHERE id IN (?, ?)",
+            (old, unfinished)
+        )
+        conn.execute("UPDATE analysis_job_items SET status = 'pending' WHERE job_id = ?", (unfinished,))
+        conn.execute("UPDATE analysis_jobs SET status = 'queued' WHERE id = ?", (unfinished,))
+
+    with db.transaction(queue_db) as conn:
+        assert jobs.purge(conn, 7) == (1, 1)
+
+    assert queue.get(old) is None
+    assert queue.get(recent)['status'] == 'completed'
+    assert queue.get(unfinished)['status'] == 'queued'
+    assert item_states(queue_db, old) == []
+
+
+def test_jobs_store_reviews_with_language_and_embeddings(app, database):
+    queue = jobs.JobQueue(database, app.score_job_batch, store_results=app.store_job_results, workers=0)
+    job_id = queue.submit(['first review', 'second review'], language='hi')
+    queue.process_once()
+
+    rows = db.get_connection(database).execute('SELECT id, text, language FROM reviews ORDER BY id').fetchall()
+    assert [(text, language) for _, text, language in rows] == [('first review', 'Hindi'), ('second review', 'Hindi')]
+    assert queue.get(job_id)['status'] == 'completed'
+    if app.EMBEDDINGS:
+        assert all(app.embedding_index.get(review_id) is not None for review_id, _, _ in rows)
+
+
+def test_event_stream_ends_when_the_job_disappears(app, client, database, monkeypatch):
+    monkeypatch.setattr(app, 'JOB_STREAM_INTERVAL', 0.01)
+    job_id = app.job_queue.submit(['never processed'])
+    response = client.get(f'/api/jobs/{job_id}/events')
+    stream = iter(response.response)
+
+    assert next(stream).startswith(b'event: progress')
+    with db.transaction(app.job_queue.db_path) as conn:
+        conn.execute('DELETE FROM analysis_job_items WHERE job_id = ?', (job_id,))
+        conn.execute('DELETE FROM analysis_jobs WHERE id = ?', (job_id,))
+
+    assert list(stream)[-1].startswith(b'event: error')
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+import db
+import model_registry
+from model_registry import ModelRegistry
+from stub_models import StubClassifier, StubTokenizer
+
+MB = 2 ** 20
+
+
+def stub_loader(loaded=None, failing=()):
+    def load(checkpoint):
+        if checkpoint in failing:
+            raise OSError(f'{checkpoint} is unavailable')
+        if loaded is not None:
+            loaded.append(checkpoint)
+        return StubTokenizer(), StubClassifier(3, checkpoint, seed=7).eval()
+    return load
+
+
+def wait_until_resident(registry, checkpoint, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if any(entry['checkpoint'] == checkpoint for entry in registry.stats()['resident']):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f'{checkpoint} was never loaded')
+
+
+@pytest.mark.parametrize('language, code, name', [
+    ('hi', 'hi', 'Hindi'),
+    (' HI ', 'hi', 'Hindi'),
+    ('Hindi', 'hi', 'Hindi'),
+    ('Klingon', None, 'Klingon'),
+    ('', None, 'English'),
+    (None, None, 'English'),
+])
+def test_language_code_and_name(language, code, name):
+    assert model_registry.language_code(language) == code
+    assert model_registry.language_name(language) == name
+
+
+def test_parse_checkpoints():
+    assert model_registry.parse_checkpoints('Hindi=org/hi-model, ta = org/ta-model,junk') == {
+        'hi': 'org/hi-model', 'ta': 'org/ta-model'
+    }
+
+
+def test_unknown_languages_use_the_default_model():
+    registry = ModelRegistry(stub_loader(), {'hi': 'hi-model'}, memory_budget=100 * MB)
+    assert registry.resolve('ta') is None
+    assert registry.get('ta') is None
+    assert registry.stats()['loading'] == []
+
+
+def test_first_request_falls_back_while_the_checkpoint_loads():
+    loaded = []
+    registry = ModelRegistry(stub_loader(loaded), {'hi': 'shared', 'bn': 'shared'}, memory_budget=100 * MB)
+
+    assert registry.resolve('hi') == 'shared'
+    assert registry.get('bn') is None
+    wait_until_resident(registry, 'shared')
+
+    checkpoint, _, model = registry.get('bn')
+    assert checkpoint == 'shared' and model.config._name_or_path == 'shared'
+    assert loaded == ['shared']  # languages sharing a checkpoint load it once
+
+
+def test_least_recently_used_unpinned_checkpoint_is_evicted():
+    size = model_registry.model_bytes(StubClassifier(3, 'probe'))
+    registry = ModelRegistry(
+        stub_loader(), {'hi': 'hi-model', 'ta': 'ta-model', 'bn': 'bn-model'},
+        memory_budget=2 * size, pinned=('hi',)
+    )
+    registry.preload(['hi', 'ta'])
+    registry.preload(['bn'])
+
+    resident = [entry['checkpoint'] for entry in registry.stats()['resident']]
+    assert sorted(resident) == ['bn-model', 'hi-model']
+    assert registry.stats()['evictions'] == 1
+
+
+def test_failed_loads_fall_back_until_the_retry_interval_passes():
+    registry = ModelRegistry(stub_loader(failing={'hi-model'}), {'hi': 'hi-model'}, memory_budget=100 * MB)
+
+    assert registry.get('hi', wait=True) is None
+    assert registry.resolve('hi') is None
+    assert registry.stats()['load_failures'] == 1
+
+    registry.retry_seconds = 0
+    registry.loader = stub_loader()
+    assert registry.get('hi', wait=True)[0] == 'hi-model'
+
+
+def test_language_reviews_use_their_checkpoint_once_loaded(app, client, monkeypatch):
+    registry = ModelRegistry(stub_loader(), {'hi': 'hi-model'}, memory_budget=100 * MB)
+    monkeypatch.setattr(app, 'sentiment_models', registry)
+
+    fallback = client.post('/api/analyze', json={'text': 'bahut accha phone', 'language': 'hi'}).get_json()
+    wait_until_resident(registry, 'hi-model')
+    scored = client.post('/api/analyze', json={'text': 'bahut accha phone', 'language': 'hi'}).get_json()
+
+    assert fallback['success'] and scored['success']
+    # The fallback result was not cached under the Hindi model, so the second request
+    # reached the Hindi checkpoint
+    assert registry.stats()['hits'] == 1
+    languages = db.get_connection(app.DATABASE_FILE).execute('SELECT language FROM reviews').fetchall()
+    assert languages == [('Hindi',), ('Hindi',)]
@@ -0,0 +1,73 @@
+import db
+
+
+def insert_reviews(path, count, created_at=None):
+    # created_at defaults to a few distinct timestamps so pages cross ties on created_at
+    with db.transaction(path) as conn:
+        conn.executemany(
+            'INSERT INTO reviews (text, sentiment, star_rating, created_at) VALUES (?, ?, ?, ?)',
+            [
+                (f'review {i}', 'positive' if i % 2 else 'negative', i % 5 + 1,
+                 created_at or f'2026-01-0{1 + i % 3} 12:00:00')
+                for i in range(count)
+            ]
+        )
+
+
+def all_pages(client, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        body = client.get('/api/reviews', query_string=query).get_json()
+        pages.append(body['reviews'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip(app):
+    position = {'created_at': '2026-01-01 12:00:00', 'id': 42}
+    assert app.decode_cursor(app.encode_cursor(position)) == position
+
+
+def test_pages_cover_every_review_once_in_order(client, database):
+    insert_reviews(database, 23)
+
+    pages = all_pages(client, limit=5, fields='id,created_at')
+    reviews = [review for page in pages for review in page]
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    keys = [(review['created_at'], review['id']) for review in reviews]
+    assert keys == sorted(keys, reverse=True)
+    assert sorted(review['id'] for review in reviews) == list(range(1, 24))
+
+
+def test_pages_stay_stable_when_reviews_are_added(client, database):
+    insert_reviews(database, 6, created_at='2026-01-01 12:00:00')
+    first = client.get('/api/reviews', query_string={'limit': 3, 'fields': 'id'}).get_json()
+
+    insert_reviews(database, 2, created_at='2026-01-01 12:00:00')  # newer ids, same timestamp
+    second = client.get(
+        '/api/reviews', query_string={'limit': 3, 'fields': 'id', 'cursor': first['next_cursor']}
+    ).get_json()
+
+    assert [review['id'] for review in first['reviews']] == [6, 5, 4]
+    assert [review['id'] for review in second['reviews']] == [3, 2, 1]
+
+
+def test_filters_apply_across_pages(client, database):
+    insert_reviews(database, 20)
+
+    pages = all_pages(client, limit=4, sentiment='positive', rating=3, fields='id,sentiment,star_rating')
+    reviews = [review for page in pages for review in page]
+
+    assert reviews
+    assert all(review['sentiment'] == 'positive' and review['star_rating'] >= 3 for review in reviews)
+    assert set(reviews[0]) == {'id', 'sentiment', 'star_rating'}
+
+
+def test_invalid_cursor_and_fields_are_rejected(app, client):
+    assert client.get('/api/reviews', query_string={'cursor': 'not-base64!'}).status_code == 400
+    missing_id = app.encode_cursor({'created_at': '2026-01-01 12:00:00'})
+    assert client.get('/api/reviews', query_string={'cursor': missing_id}).status_code == 400
+    assert client.get('/api/reviews', query_string={'fields': 'id,password'}).status_code == 400
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import db
+import rescoring
+import review_stats
+import rollups
+
+
+def scalar_labels(app, probs, negation, sarcasm):
+    # The request path: one result at a time through app.py
+    results = []
+    for row, negated, sarcasm_score in zip(probs, negation, sarcasm):
+        result = app.sentiment_from_outputs(row.tolist(), bool(negated))
+        sarcasm_score = None if np.isnan(sarcasm_score) else float(sarcasm_score)
+        result = app.adjust_sentiment_for_sarcasm(result, sarcasm_score)
+        results.append((result['label'], result['score']))
+    return results
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_relabel_matches_the_request_path(app, seed):
+    rng = np.random.default_rng(seed)
+    logits = rng.normal(scale=2.0, size=(2000, 3))
+    probs = (np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)).astype(np.float32)
+    negation = rng.random(2000) < 0.3
+    sarcasm = rng.random(2000)
+    sarcasm[rng.random(2000) < 0.4] = np.nan
+
+    labels, scores = rescoring.relabel(probs, negation, sarcasm)
+
+    assert [(rescoring.LABELS[label], score) for label, score in zip(labels, scores)] == \
+        scalar_labels(app, probs, negation, sarcasm)
+
+
+def test_probs_round_trip_through_their_blob():
+    probs = [[0.1, 0.2, 0.7], [0.5, 0.25, 0.25]]
+    blobs = [rescoring.pack_probs(row) for row in probs]
+
+    assert all(len(blob) == rescoring.PROBS_BYTES for blob in blobs)
+    assert np.allclose(rescoring.unpack_probs(blobs), probs)
+
+
+def stored(path):
+    return db.get_connection(path).execute('SELECT id, sentiment, sentiment_score FROM reviews ORDER BY id').fetchall()
+
+
+def test_rescore_rewrites_only_changed_rows(client, database):
+    texts = ['Loved it', 'Never buying again', 'It is a phone', 'Great, it broke in a day', 'Fine I guess']
+    client.post('/api/analyze/batch', json={'texts': texts})
+    with db.transaction(database) as conn:
+        conn.execute("INSERT INTO reviews (text, sentiment, sentiment_score) VALUES ('legacy', 'positive', 0.9)")
+    analyzed = stored(database)
+
+    with db.transaction(database) as conn:
+        conn.execute("UPDATE reviews SET sentiment = 'neutral', sentiment_score = 0.1 WHERE id IN (1, 3)")
+
+    totals, _ = rescoring.rescore(database, chunk_size=2, dry_run=True)
+    assert totals == {'scanned': 6, 'changed': 2, 'missing_outputs': 1}
+    assert stored(database) != analyzed
+
+    totals, transitions = rescoring.rescore(database, chunk_size=2)
+    assert totals['changed'] == 2
+    assert sum(transitions.values()) == 2
+    assert stored(database) == analyzed
+
+    # The counters and rollups followed the rewrites through their triggers
+    conn = db.get_connection(database)
+    assert review_stats.drift(conn) == {}
+    assert rollups.drift(conn) == {}
+    assert rescoring.rescore(database)[0]['changed'] == 0
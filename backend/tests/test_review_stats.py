@@ -0,0 +1,61 @@
+import db
+import review_stats
+
+
+def insert(path, *sentiments):
+    with db.transaction(path) as conn:
+        conn.executemany(
+            'INSERT INTO reviews (text, sentiment, sentiment_score) VALUES (?, ?, 0.5)',
+            [(f'review {i}', sentiment) for i, sentiment in enumerate(sentiments)]
+        )
+
+
+def counters(path):
+    return review_stats.read(db.get_connection(path))
+
+
+def test_triggers_follow_inserts_updates_and_deletes(database):
+    insert(database, 'positive', 'positive', 'negative')
+    assert counters(database) == {
+        'total_reviews': 3,
+        'sentiment_distribution': {'negative': 1, 'positive': 2}
+    }
+
+    with db.transaction(database) as conn:
+        conn.execute("UPDATE reviews SET sentiment = 'neutral' WHERE id = 1")
+        conn.execute("UPDATE reviews SET sentiment_score = 0.9 WHERE id = 2")  # not a sentiment change
+        conn.execute('DELETE FROM reviews WHERE id = 3')
+
+    assert counters(database) == {'total_reviews': 2, 'sentiment_distribution': {'neutral': 1, 'positive': 1}}
+    assert review_stats.drift(db.get_connection(database)) == {}
+
+
+def test_rolled_back_writes_leave_the_counters_alone(database):
+    insert(database, 'positive')
+    try:
+        with db.transaction(database) as conn:
+            conn.execute("INSERT INTO reviews (text, sentiment) VALUES ('x', 'negative')")
+            raise RuntimeError('abort')
+    except RuntimeError:
+        pass
+
+    assert counters(database)['sentiment_distribution'] == {'positive': 1}
+
+
+def test_drift_is_reported_and_rebuilt(database):
+    insert(database, 'positive', 'negative')
+    with db.transaction(database) as conn:
+        conn.execute("UPDATE review_counts SET count = 7 WHERE sentiment = 'positive'")
+
+    assert review_stats.drift(db.get_connection(database)) == {'positive': (7, 1)}
+    with db.transaction(database) as conn:
+        assert review_stats.rebuild(conn) == {'positive': (7, 1)}
+    assert review_stats.drift(db.get_connection(database)) == {}
+
+
+def test_stats_endpoint_reads_the_counters(client, database):
+    insert(database, 'negative', 'negative')
+    assert client.get('/api/stats').get_json() == {
+        'total_reviews': 2,
+        'sentiment_distribution': {'negative': 2}
+    }
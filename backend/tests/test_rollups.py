@@ -0,0 +1,109 @@
+import db
+import rollups
+
+
+def insert(path, *reviews):
+    # reviews are (created_at, sentiment, language, star_rating, sentiment_score)
+    with db.transaction(path) as conn:
+        conn.executemany(
+            'INSERT INTO reviews (text, created_at, sentiment, language, star_rating, sentiment_score) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [(f'review {i}', *review) for i, review in enumerate(reviews)]
+        )
+
+
+def daily(path, **options):
+    return rollups.read(db.get_connection(path), 'day', '2026-01-01', '2026-01-31', **options)
+
+
+def test_triggers_follow_inserts_updates_and_deletes(database):
+    insert(
+        database,
+        ('2026-01-01 09:00:00', 'positive', 'English', 5, 0.9),
+        ('2026-01-01 18:00:00', 'positive', None, None, 0.7),
+        ('2026-01-02 10:00:00', 'negative', 'English', 1, 0.6)
+    )
+    assert daily(database, group_by=('sentiment',)) == [
+        {'bucket': '2026-01-01', 'sentiment': 'positive', 'count': 2, 'avg_score': 0.8},
+        {'bucket': '2026-01-02', 'sentiment': 'negative', 'count': 1, 'avg_score': 0.6}
+    ]
+
+    with db.transaction(database) as conn:
+        conn.execute("UPDATE reviews SET sentiment = 'negative', sentiment_score = 0.5 WHERE id = 1")
+        conn.execute("UPDATE reviews SET created_at = '2026-01-03 08:00:00' WHERE id = 2")
+        conn.execute('DELETE FROM reviews WHERE id = 3')
+
+    assert daily(database, group_by=('sentiment',)) == [
+        {'bucket': '2026-01-01', 'sentiment': 'negative', 'count': 1, 'avg_score': 0.5},
+        {'bucket': '2026-01-03', 'sentiment': 'positive', 'count': 1, 'avg_score': 0.7}
+    ]
+    assert rollups.drift(db.get_connection(database)) == {}
+
+
+def test_hourly_buckets(database):
+    insert(
+        database,
+        ('2026-01-01 09:15:00', 'positive', 'English', 5, 0.9),
+        ('2026-01-01 09:45:00', 'positive', 'English', 4, 0.7),
+        ('2026-01-01 10:05:00', 'neutral', 'English', 3, 0.5)
+    )
+    points = rollups.read(
+        db.get_connection(database), 'hour', '2026-01-01 00:00:00', '2026-01-01 23:00:00', group_by=()
+    )
+    assert [(point['bucket'], point['count']) for point in points] == [
+        ('2026-01-01 09:00:00', 2), ('2026-01-01 10:00:00', 1)
+    ]
+
+
+def test_filters_minimums_and_window(database):
+    insert(
+        database,
+        ('2026-01-05 09:00:00', 'positive', 'English', 5, 0.9),
+        ('2026-01-05 10:00:00', 'positive', 'Hindi', 4, 0.8),
+        ('2026-01-05 11:00:00', 'negative', 'English', 2, 0.7),
+        ('2026-02-05 11:00:00', 'negative', 'English', 2, 0.7)  # outside the window
+    )
+
+    assert daily(database, group_by=('language',), filters={'sentiment': 'positive'}) == [
+        {'bucket': '2026-01-05', 'language': 'English', 'count': 1, 'avg_score': 0.9},
+        {'bucket': '2026-01-05', 'language': 'Hindi', 'count': 1, 'avg_score': 0.8}
+    ]
+    assert daily(database, group_by=(), minimums={'star_rating': 4}) == [
+        {'bucket': '2026-01-05', 'count': 2, 'avg_score': 0.85}
+    ]
+    # Unknown dimensions are ignored rather than interpolated into the SQL
+    assert daily(database, group_by=(), filters={'text; DROP TABLE reviews': 'x'})[0]['count'] == 3
+
+
+def test_drift_is_reported_and_rebuilt(database):
+    insert(database, ('2026-01-01 09:00:00', 'positive', 'English', 5, 0.9))
+    with db.transaction(database) as conn:
+        conn.execute('UPDATE review_rollups_daily SET count = 4')
+
+    assert rollups.drift(db.get_connection(database)) == {'day': 1}
+    with db.transaction(database) as conn:
+        assert rollups.rebuild(conn) == {'day': 1}
+    assert rollups.drift(db.get_connection(database)) == {}
+    assert daily(database, group_by=())[0]['count'] == 1
+
+
+def test_trends_endpoint(client, database):
+    insert(
+        database,
+        ('2026-01-10 09:00:00', 'positive', 'English', 5, 0.9),
+        ('2026-01-11 09:00:00', 'negative', 'English', 1, 0.6)
+    )
+
+    body = client.get('/api/trends', query_string={'end': '2026-01-11', 'days': 7}).get_json()
+    assert body['success'] is True
+    assert body['data']['start'] == '2026-01-04'
+    assert [(point['bucket'], point['sentiment']) for point in body['data']['points']] == [
+        ('2026-01-10', 'positive'), ('2026-01-11', 'negative')
+    ]
+
+    rated = client.get('/api/trends', query_string={'end': '2026-01-11', 'rating': 4, 'group_by': ''}).get_json()
+    assert [point['count'] for point in rated['data']['points']] == [1]
+
+    assert client.get('/api/trends', query_string={'granularity': 'week'}).status_code == 400
+    assert client.get('/api/trends', query_string={'group_by': 'text'}).status_code == 400
+    assert client.get('/api/trends', query_string={'days': 100000}).status_code == 400
@@ -71,7 +71,7 @@ function Analysis() {
           label: 'Analysis Results',
           data: [
             parseFloat((result.sentiment.score * 100).toFixed(2)),
-            parseFloat((result.sarcasm.score * 100).toFixed(2))
+            result.sarcasm.skipped ? 0 : parseFloat((result.sarcasm.score * 100).toFixed(2))
           ],
           backgroundColor: [
             'rgba(54, 162, 235, 0.6)',
@@ -151,7 +151,8 @@ function Analysis() {
                 <strong>Confidence:</strong> {(result.sentiment.score * 100).toFixed(2)}%
               </Typography>
               <Typography variant="body1" gutterBottom>
-                <strong>Sarcasm Probability:</strong> {(result.sarcasm.score * 100).toFixed(2)}%
+                <strong>Sarcasm Probability:</strong>{' '}
+                {result.sarcasm.skipped ? 'not checked' : `${(result.sarcasm.score * 100).toFixed(2)}%`}
               </Typography>
               <Box sx={{ mt: 2 }}>
                 <Typography variant="body1" gutterBottom>
@@ -1,6 +1,5 @@
 import { useState, useEffect } from 'react';
 import { Container, Paper, Typography, Box, Grid } from '@mui/material';
-import axios from 'axios';
 import { Bar, Doughnut } from 'react-chartjs-2';
 import ChatBubbleOutlineIcon from '@mui/icons-material/ChatBubbleOutline';
 import ThumbUpAltIcon from '@mui/icons-material/ThumbUpAlt';
@@ -16,33 +15,48 @@ function Dashboard() {
   });
 
   useEffect(() => {
-    const fetchStats = async () => {
-      try {
-        const response = await axios.get('http://localhost:5000/api/stats');
-        const { total_reviews, sentiment_distribution } = response.data;
-        
-        const positive = sentiment_distribution['positive'] || 0;
-        const negative = sentiment_distribution['negative'] || 0;
-        const neutral = sentiment_distribution['neutral'] || 0;
-        
-        const positivePercentage = Math.round((positive / total_reviews) * 100) || 0;
-        const negativePercentage = Math.round((negative / total_reviews) * 100) || 0;
-        
-        setMetrics({
-          totalReviews: total_reviews,
-          positivePercentage,
-          negativePercentage,
-          averageRating: ((positive * 5 + neutral * 3 + negative * 1) / total_reviews).toFixed(1) || 0
-        });
-      } catch (error) {
-        console.error('Error fetching stats:', error);
-      }
+    let stats = null;
+
+    const applyStats = ({ total_reviews, sentiment_distribution }) => {
+      const positive = sentiment_distribution['positive'] || 0;
+      const negative = sentiment_distribution['negative'] || 0;
+      const neutral = sentiment_distribution['neutral'] || 0;
+      
+      const positivePercentage = Math.round((positive / total_reviews) * 100) || 0;
+      const negativePercentage = Math.round((negative / total_reviews) * 100) || 0;
+      
+      setMetrics({
+        totalReviews: total_reviews,
+        positivePercentage,
+        negativePercentage,
+        averageRating: ((positive * 5 + neutral * 3 + negative * 1) / total_reviews).toFixed(1) || 0
+      });
     };
 
-    fetchStats();
-    const interval = setInterval(fetchStats, 5000); // Refresh every 5 seconds
+    // The server pushes a full snapshot on connect and only the changed counts afterwards.
+    // EventSource reconnects on its own and each reconnect starts with a fresh snapshot.
+    const source = new EventSource('http://localhost:5000/api/stats/stream');
+
+    source.addEventListener('snapshot', (event) => {
+      stats = JSON.parse(event.data);
+      applyStats(stats);
+    });
+
+    source.addEventListener('delta', (event) => {
+      if (!stats) return;
+      const delta = JSON.parse(event.data);
+      stats = {
+        total_reviews: delta.total_reviews ?? stats.total_reviews,
+        sentiment_distribution: { ...stats.sentiment_distribution, ...delta.sentiment_distribution }
+      };
+      applyStats(stats);
+    });
+
+    source.onerror = (error) => {
+      console.error('Stats stream error:', error);
+    };
 
-    return () => clearInterval(interval);
+    return () => source.close();
   }, []);
 
   const [sentimentTrend, setSentimentTrend] = useState({
@@ -2,9 +2,13 @@ import { useState, useEffect } from 'react';
 import { FaThumbsUp, FaThumbsDown, FaStar } from 'react-icons/fa';
 import Slider from '@mui/material/Slider';
 
+const PAGE_SIZE = 50;
+
 const Reviews = () => {
   const [reviews, setReviews] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [error, setError] = useState(null);
   const [filters, setFilters] = useState({
     search: '',
@@ -18,11 +22,18 @@ const Reviews = () => {
   }, [filters]);
 
 
-  const fetchReviews = async () => {
-    setLoading(true);
+  // Loads the first page, or appends the page after `cursor` when one is given
+  const fetchReviews = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     setError(null);
     try {
       const queryParams = new URLSearchParams();
+      queryParams.append('limit', PAGE_SIZE);
+      if (cursor) queryParams.append('cursor', cursor);
       if (filters.sentiments.length > 0) queryParams.append('sentiments', filters.sentiments.join(','));
       if (filters.rating) {
         queryParams.append('rating_min', filters.rating[0]);
@@ -37,21 +48,27 @@ const Reviews = () => {
       }
       const data = await response.json();
       if (data.success && Array.isArray(data.reviews)) {
-        setReviews(data.reviews.map(review => ({
+        const page = data.reviews.map(review => ({
           ...review,
           star_rating: Number(review.star_rating) || 0,
           helpful_count: Number(review.helpful_count) || 0,
           created_at: review.created_at || new Date().toISOString()
-        })));
+        }));
+        setReviews(prev => (cursor ? [...prev, ...page] : page));
+        setNextCursor(data.next_cursor || null);
       } else {
         throw new Error(data.error || 'Failed to fetch reviews');
       }
     } catch (error) {
       console.error('Error fetching reviews:', error);
       setError('Unable to load reviews. Please try again later.');
-      setReviews([]);
+      if (!cursor) {
+        setReviews([]);
+        setNextCursor(null);
+      }
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -232,6 +249,18 @@ const Reviews = () => {
               </div>
             ))}
           </div>
+
+          {nextCursor && !loading && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={() => fetchReviews(nextCursor)}
+                disabled={loadingMore}
+                className="px-6 py-2 text-sm font-medium text-white bg-blue-500 rounded-lg hover:bg-blue-600 disabled:opacity-50 transition-all duration-300"
+              >
+                {loadingMore ? 'Loading...' : 'Load more reviews'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>